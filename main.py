@@ -1,10 +1,11 @@
 import argparse
-import pandas as pd
-from src.data.loader import fetch_data
-from src.analysis.indicators import add_indicators
-from src.analysis.signals import generate_signals
-from src.engine.backtester import Backtester
-from src.visualization.dashboard import create_dashboard
+from src.analysis.indicators import BACKENDS
+from src.engine.backtester import Backtester, ENGINES
+from src.utils.profiling import profiler, stage
+
+# The data, cache, signal and dashboard modules are imported inside run():
+# their dependencies (yfinance, pyarrow, plotly, ...) are only loaded by the
+# modes that use them, and `--help` stays fast.
 
 def main():
     parser = argparse.ArgumentParser(description="Trinity Quantitative Backtest Engine")
@@ -13,9 +14,47 @@ def main():
     parser.add_argument("--period", type=str, default="1mo", help="Data Period (default: 1mo)")
     parser.add_argument("--tp", type=float, default=2.0, help="ATR Take Profit Multiplier (default: 2.0)")
     parser.add_argument("--sl", type=float, default=2.0, help="ATR Stop Loss Multiplier (default: 2.0)")
-    parser.add_argument("--bandwidth", type=float, default=None, help="Bandwidth Threshold (default: median of data)")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Bandwidth Threshold (default: --bw-quantile of data)")
+    parser.add_argument("--bw-quantile", type=float, default=0.5, help="Bandwidth quantile used as threshold when --bandwidth is not set (default: 0.5)")
+    parser.add_argument("--bw-window", type=int, default=0, help="Rolling window (bars) of the bandwidth quantile, 0 = whole period (default: 0)")
+    parser.add_argument("--engine", type=str, default="array", choices=ENGINES, help="Execution Engine (default: array)")
+    parser.add_argument("--indicators", type=str, default="pandas_ta", choices=BACKENDS, help="Indicator Backend (default: pandas_ta)")
+    parser.add_argument("--indicator-dtype", type=str, default="float64", choices=("float64", "float32"), help="Dtype of the signal-only indicator columns; ATR stays float64 (default: float64)")
+    parser.add_argument("--signal-dtype", type=str, default="uint8", choices=("uint8", "bool", "int64"), help="Signal column dtype (default: uint8)")
+    parser.add_argument("--replay", action="store_true", help="Replay the data bar by bar through the streaming runtime")
+    parser.add_argument("--tickers", type=str, default=None, help="Comma-separated tickers, or a file with one per line (universe mode)")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker processes for universe mode and Monte Carlo, 0 = all cores (default: 0)")
+    parser.add_argument("--monte-carlo", type=int, default=0, help="Monte Carlo paths per resampling method over the trade log, 0 = off (default: 0)")
+    parser.add_argument("--no-dashboard", action="store_true", help="Skip building and writing the HTML dashboard")
+    parser.add_argument("--max-points", type=int, default=None, help="Dashboard bucket budget per trace, 0 = plot every bar (default: auto)")
+    parser.add_argument("--sidecar", action="store_true", help="Write dashboard data to a binary .bin file next to the HTML")
+    parser.add_argument("--profile", type=str, nargs="?", const="profile.json", default=None, help="Record per-stage timings and write them to this JSON file (default: profile.json)")
+    parser.add_argument("--cprofile", type=str, default=None, help="Also write a cProfile/pstats dump to this file")
+    parser.add_argument("--no-profile-memory", action="store_true", help="Skip tracemalloc peak memory while profiling (it slows allocation-heavy stages)")
     
     args = parser.parse_args()
+    if args.replay and args.bw_window and args.bandwidth is None:
+        parser.error("--replay needs a fixed threshold: use --bandwidth or --bw-window 0")
+    
+    if args.profile or args.cprofile:
+        profiler.enable(memory=not args.no_profile_memory, cprofile=bool(args.cprofile))
+        try:
+            run(args)
+        finally:
+            profiler.finish(args.profile, args.cprofile)
+    else:
+        run(args)
+
+def run(args):
+    """Runs the single-ticker pipeline (or universe mode) for parsed CLI arguments."""
+    if args.tickers:
+        run_universe(args)
+        return
+    
+    from src.data.loader import fetch_data
+    from src.analysis.cache import cached_indicators
+    from src.analysis.signals import generate_signals, squeeze_threshold
+    from src.engine.metrics import trade_log_metrics
     
     print(f"--- Starting Trinity Backtest for {args.ticker} ---")
     
@@ -28,46 +67,115 @@ def main():
 
     # 2. Feature Engineering
     print("Calculating Indicators...")
-    df = add_indicators(df)
+    bars = df
+    df = cached_indicators(df, backend=args.indicators, dtype=args.indicator_dtype)
     
     # 3. Signal Generation
     print("Generating Signals...")
     # Determine bandwidth threshold
     bw_threshold = args.bandwidth
-    if bw_threshold is None:
-        bw_threshold = df['Bandwidth'].median()
-        print(f"Using Median Bandwidth as Threshold: {bw_threshold:.4f}")
+    if bw_threshold is None and args.bw_window:
+        bw_threshold = squeeze_threshold(df['Bandwidth'], args.bw_quantile, args.bw_window)
+        print(f"Using Rolling {args.bw_window}-bar Bandwidth q{args.bw_quantile:g} as Threshold")
+    elif bw_threshold is None:
+        bw_threshold = squeeze_threshold(df['Bandwidth'], args.bw_quantile)
+        label = "Median Bandwidth" if args.bw_quantile == 0.5 else f"Bandwidth q{args.bw_quantile:g}"
+        print(f"Using {label} as Threshold: {bw_threshold:.4f}")
     
-    df = generate_signals(df, bandwidth_threshold=bw_threshold)
+    df = generate_signals(df, bandwidth_threshold=bw_threshold, dtype=args.signal_dtype)
     
     num_signals = df['Signal'].sum()
     print(f"Total Signals Generated: {num_signals}")
     
     # 4. Backtest Simulation
-    print("Running Backtest...")
-    engine = Backtester(atr_multiplier_tp=args.tp, atr_multiplier_sl=args.sl)
-    trades = engine.run(df, verbose=True)
+    if args.replay:
+        from src.live.runtime import replay
+        print("Running Streaming Replay...")
+        runtime = replay(bars, bandwidth_threshold=bw_threshold, atr_multiplier_tp=args.tp,
+                         atr_multiplier_sl=args.sl, verbose=True)
+        trades = runtime.trade_log()
+        print("\n--- Decision Latency (us) ---")
+        print(runtime.latency_report().to_string())
+    else:
+        print("Running Backtest...")
+        engine = Backtester(atr_multiplier_tp=args.tp, atr_multiplier_sl=args.sl, engine=args.engine)
+        trades = engine.run(df, verbose=True)
     
     if not trades.empty:
-        total_pnl = trades['PnL'].sum()
-        win_rate = len(trades[trades['PnL'] > 0]) / len(trades)
+        m = trade_log_metrics(df, trades).iloc[0]
         print("\n--- Backtest Results ---")
         print(f"Total Trades: {len(trades)}")
-        print(f"Total PnL: {total_pnl*100:.2f}%")
-        print(f"Win Rate: {win_rate*100:.1f}%")
+        print(f"Total PnL: {m['Total_PnL']*100:.2f}% (compounded: {m['Total_Return']*100:.2f}%)")
+        print(f"Win Rate: {m['Win_Rate']*100:.1f}%")
+        print(f"Expectancy: {m['Expectancy']*100:.3f}% per trade (avg win {m['Avg_Win']*100:.3f}%, avg loss {m['Avg_Loss']*100:.3f}%)")
+        print(f"Profit Factor: {m['Profit_Factor']:.2f}")
+        print(f"Max Drawdown: {m['Max_Drawdown']*100:.2f}% ({m['Max_DD_Bars']} bars under water)")
+        print(f"Sharpe: {m['Sharpe']:.2f} | Sortino: {m['Sortino']:.2f} (annualized, bar returns)")
+        print(f"Exposure: {m['Exposure']*100:.1f}% of bars")
+        by_signal = trade_log_metrics(df, trades, by_signal=True)
+        print("\n--- By Signal Type ---")
+        print(by_signal[['Trades', 'Win_Rate', 'Total_PnL', 'Expectancy', 'Profit_Factor', 'Max_Drawdown']].to_string())
         print(trades[['Entry Time', 'Entry Price', 'Exit Time', 'Exit Price', 'PnL', 'Reason']].to_string())
+        if args.monte_carlo:
+            print_monte_carlo({args.ticker: trades}, args)
     else:
         print("\nNo trades executed.")
     
     # 5. Visualization
+    if args.no_dashboard:
+        print("Done.")
+        return
+    from src.visualization.dashboard import create_dashboard, write_dashboard
     print("\nGenerating Dashboard...")
-    fig = create_dashboard(df, trades)
+    fig = create_dashboard(df, trades, max_points=args.max_points)
     output_file = f"dashboard_{args.ticker}.html"
-    fig.write_html(output_file)
-    print(f"Dashboard saved to {output_file}")
+    with stage("write_dashboard"):
+        written = write_dashboard(fig, output_file, sidecar=args.sidecar)
+    print(f"Dashboard saved to {', '.join(written)}")
     
     print("Done.")
 
+def run_universe(args):
+    """Backtests every ticker in --tickers and prints per-symbol and portfolio results."""
+    from src.engine.universe import UniverseBacktester
+    universe = UniverseBacktester(
+        args.tickers,
+        interval=args.interval,
+        period=args.period,
+        atr_multiplier_sl=args.sl,
+        atr_multiplier_tp=args.tp,
+        bandwidth_threshold=args.bandwidth,
+        bw_quantile=args.bw_quantile,
+        bw_window=args.bw_window,
+        indicator_backend=args.indicators,
+        n_jobs=args.jobs
+    )
+    print(f"--- Starting Trinity Universe Backtest ({len(universe.tickers)} symbols) ---")
+    results = universe.run()
+    
+    print("\n--- Per-Symbol Results ---")
+    print(results.to_string(index=False))
+    
+    summary = universe.portfolio_summary()
+    print("\n--- Portfolio Results (equal weight) ---")
+    print(f"Symbols Traded: {summary['Symbols_Traded']}/{summary['Symbols']}")
+    print(f"Total Trades: {summary['Trades']}")
+    print(f"Total PnL: {summary['Total_PnL']*100:.2f}%")
+    print(f"Win Rate: {summary['Win_Rate']*100:.1f}%")
+    print(f"Throughput: {summary['Symbols_Per_Sec']:.1f} symbols/sec")
+    
+    if args.monte_carlo and not universe.trades.empty:
+        print_monte_carlo(dict(tuple(universe.trades.groupby('Ticker', sort=False))), args)
+
+def print_monte_carlo(logs, args):
+    """Runs and prints the Monte Carlo robustness test of one or more trade logs."""
+    from src.engine.montecarlo import MonteCarlo
+    mc = MonteCarlo(n_sims=args.monte_carlo, n_jobs=args.jobs or None)
+    with stage("monte_carlo"):
+        results = mc.run_many(logs)
+    print(f"\n--- Monte Carlo ({args.monte_carlo:,} paths per method, {mc.elapsed:.2f}s) ---")
+    print(results.rename(columns={'Log': 'Ticker'}).to_string(index=False))
+
 if __name__ == "__main__":
     main()
 
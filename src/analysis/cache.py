@@ -0,0 +1,134 @@
+import os
+import json
+import hashlib
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from src.analysis.indicators import INDICATOR_PARAMS, add_indicators
+from src.utils.profiling import profiled
+
+# Bump when the indicator code changes in a way that alters its output
+INDICATOR_VERSION = 3
+
+KEY_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def _library_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("pandas-ta")
+    except Exception:
+        return "unknown"
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Hash of the timestamps and OHLCV values of a frame.
+
+    Any change to the bars (new rows, revised prices) changes the fingerprint.
+    """
+    h = hashlib.sha256()
+    h.update(pd.DatetimeIndex(df.index).asi8.tobytes())  # Ticks of the index's own unit
+    for col in KEY_COLUMNS:
+        if col in df.columns:
+            h.update(col.encode())
+            h.update(np.ascontiguousarray(df[col].to_numpy()).tobytes())
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Content-addressed, size-bounded cache of `add_indicators` results.
+
+    Entries are keyed by the data fingerprint, the indicator parameters and the
+    indicator/library versions, and stored as uncompressed Arrow IPC (Feather)
+    files that load memory-mapped. When the cache grows past `max_bytes`, the
+    least recently used entries are evicted (file mtime is the access time).
+
+    Several processes may share one cache (universe mode): writes go through a
+    per-writer temporary file and an atomic rename, and an entry evicted by
+    another process between lookup and read is treated as a miss.
+    """
+    def __init__(self, root: str = "data/indicators", max_bytes: int = 1 << 30):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, df: pd.DataFrame, params: dict, backend: str = "pandas_ta") -> str:
+        payload = json.dumps({
+            'data': data_fingerprint(df),
+            'params': params,
+            'backend': backend,
+            'version': INDICATOR_VERSION,
+            'library': _library_version() if backend == 'pandas_ta' else None
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.feather")
+
+    def get(self, key: str):
+        """Returns the cached frame for `key`, or None."""
+        path = self._path(key)
+        try:
+            df = feather.read_table(path, memory_map=True).to_pandas()
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            # Never written, or evicted by another process meanwhile
+            return None
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        feather.write_feather(pa.Table.from_pandas(df, preserve_index=True), tmp, compression='uncompressed')
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(".feather"):
+                path = os.path.join(self.root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Evicted by another process
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        # Oldest first; always keep the newest entry even if it alone exceeds the budget
+        for _, size, path in sorted(entries)[:-1]:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Already evicted by another process
+            total -= size
+
+    def add_indicators(self, df: pd.DataFrame, backend: str = "pandas_ta", **params) -> pd.DataFrame:
+        """
+        Cached `add_indicators`: returns the stored result when the same bars,
+        parameters and backend were computed before, otherwise computes and stores it.
+        """
+        params = {**INDICATOR_PARAMS, 'dtype': 'float64', **params}
+        key = self.key(df, params, backend)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        result = add_indicators(df, backend=backend, **params)
+        self.put(key, result)
+        return result
+
+
+@profiled("cached_indicators")
+def cached_indicators(df: pd.DataFrame, data_dir: str = "data", backend: str = "pandas_ta", **params) -> pd.DataFrame:
+    """`add_indicators` through the default on-disk cache under `data_dir`."""
+    return IndicatorCache(os.path.join(data_dir, "indicators")).add_indicators(df, backend=backend, **params)
@@ -1,23 +1,71 @@
 import pandas as pd
-import pandas_ta as ta
+from src.utils.profiling import profiled
 
-def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+# Default indicator settings. Keyword names match add_indicators and StreamingIndicators.
+INDICATOR_PARAMS = {
+    'bb_length': 20,
+    'bb_std': 2.0,
+    'rsi_length': 14,
+    'macd_fast': 12,
+    'macd_slow': 26,
+    'macd_signal': 9,
+    'adx_length': 14,
+    'atr_length': 14,
+}
+
+# Indicator backends:
+#   'pandas_ta' - pandas-ta implementations (reference).
+#   'native'    - NumPy kernels in src/analysis/native.py, numba-compiled if available.
+BACKENDS = ('pandas_ta', 'native')
+
+@profiled("add_indicators")
+def add_indicators(df: pd.DataFrame, bb_length: int = 20, bb_std: float = 2.0, rsi_length: int = 14,
+                   macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                   adx_length: int = 14, atr_length: int = 14, backend: str = "pandas_ta",
+                   dtype: str = "float64") -> pd.DataFrame:
     """
-    Adds technical indicators to the DataFrame using pandas-ta.
+    Adds technical indicators to the DataFrame using pandas-ta (or the native backend).
     
     Indicators:
     1. Bollinger Bands (20, 2) -> BBL, BBM, BBU, Bandwidth
     2. RSI (14) -> RSI
     3. MACD (12, 26, 9) -> MACD, MACDs, MACDh
+    4. ADX (14) -> ADX, DMP, DMN
+    5. ATR (14) -> ATR
     
     Args:
         df: DataFrame with OHLCV data.
+        bb_length, bb_std: Bollinger Band window and standard deviation multiplier.
+        rsi_length: RSI window.
+        macd_fast, macd_slow, macd_signal: MACD EMA lengths.
+        adx_length: ADX window.
+        atr_length: ATR window.
+        backend: 'pandas_ta' (default) or 'native'. The native backend does not
+                 import pandas-ta.
+        dtype: Dtype of the indicators that only feed signals. 'float32' halves
+               their memory; signal thresholds are then compared at float32
+               precision. ATR (which sets stops and targets) and the input
+               OHLCV columns are never narrowed, so execution stays float64.
         
     Returns:
-        pd.DataFrame: DataFrame with added indicator columns.
+        pd.DataFrame: The input columns (not copied) plus the standard indicator
+                      columns; intermediate pandas-ta columns are dropped.
     """
-    # Ensure we are working on a copy to avoid SettingWithCopy warnings
-    df = df.copy()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown indicator backend '{backend}'. Expected one of {BACKENDS}")
+    params = dict(bb_length=bb_length, bb_std=bb_std, rsi_length=rsi_length, macd_fast=macd_fast,
+                  macd_slow=macd_slow, macd_signal=macd_signal, adx_length=adx_length, atr_length=atr_length)
+    if backend == 'native':
+        from src.analysis.native import add_native_indicators
+        return add_native_indicators(df, dtype=dtype, **params)
+
+    # Importing pandas-ta registers the df.ta accessor. It is slow to import,
+    # so only pay for it when this backend is used.
+    import pandas_ta  # noqa: F401
+
+    # New frame object for pandas-ta to append to; the input columns are shared, not copied
+    source_columns = list(df.columns)
+    df = df.copy(deep=False)
 
     # pandas-ta requires 'close' column to be lowercase usually, or we specify it.
     # checking column names from yfinance (usually Capitalized 'Close')
@@ -26,46 +74,47 @@ def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
     
     # 1. Bollinger Bands
     # Using direct call instead of Strategy class to avoid potential import issues
-    df.ta.bbands(length=20, std=2.0, append=True)
+    df.ta.bbands(length=bb_length, std=bb_std, append=True)
     
     # 2. RSI
-    df.ta.rsi(length=14, append=True)
+    df.ta.rsi(length=rsi_length, append=True)
     
     # 3. MACD
-    df.ta.macd(fast=12, slow=26, signal=9, append=True)
+    df.ta.macd(fast=macd_fast, slow=macd_slow, signal=macd_signal, append=True)
 
     # 4. ADX (Trend Strength)
-    df.ta.adx(length=14, append=True)
+    df.ta.adx(length=adx_length, append=True)
 
     # 5. ATR (Volatility)
-    df.ta.atr(length=14, append=True)
+    df.ta.atr(length=atr_length, append=True)
 
     # Rename columns to standard names
     # We inspect columns to find the generated names
     # Expected pattern: BBL_20_2.0, RSI_14, MACD_12_26_9 etc.
     # But names might vary slightly (e.g. BBL_20_2.0_2.0)
     
-    # Helper to find column starting with prefix
+    # Helper to find column named prefix or prefix followed by more '_' parts
+    # (so 'BBL_2' does not pick up 'BBL_20_2.0')
     def find_col(prefix):
         for c in df.columns:
-            if c.startswith(prefix):
+            if c == prefix or c.startswith(prefix + '_'):
                 return c
         return None
 
     # Mapping based on prefixes which are more stable
     col_map = {
-        find_col('BBL_20'): 'BBL',
-        find_col('BBM_20'): 'BBM',
-        find_col('BBU_20'): 'BBU',
-        find_col('BBB_20'): 'Bandwidth', # Bandwidth from pandas-ta if available
-        find_col('RSI_14'): 'RSI',
-        find_col('MACD_12'): 'MACD',
-        find_col('MACDs_12'): 'MACDs',
-        find_col('MACDh_12'): 'MACDh',
-        find_col('ADX_14'): 'ADX',
-        find_col('DMP_14'): 'DMP',
-        find_col('DMN_14'): 'DMN',
-        find_col('ATRr_14'): 'ATR'
+        find_col(f'BBL_{bb_length}'): 'BBL',
+        find_col(f'BBM_{bb_length}'): 'BBM',
+        find_col(f'BBU_{bb_length}'): 'BBU',
+        find_col(f'BBB_{bb_length}'): 'Bandwidth', # Bandwidth from pandas-ta if available
+        find_col(f'RSI_{rsi_length}'): 'RSI',
+        find_col(f'MACD_{macd_fast}'): 'MACD',
+        find_col(f'MACDs_{macd_fast}'): 'MACDs',
+        find_col(f'MACDh_{macd_fast}'): 'MACDh',
+        find_col(f'ADX_{adx_length}'): 'ADX',
+        find_col(f'DMP_{adx_length}'): 'DMP',
+        find_col(f'DMN_{adx_length}'): 'DMN',
+        find_col(f'ATRr_{atr_length}'): 'ATR'
     }
     
     # Remove None keys
@@ -77,6 +126,13 @@ def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
     if 'Bandwidth' not in df.columns and 'BBU' in df.columns and 'BBL' in df.columns and 'BBM' in df.columns:
          df['Bandwidth'] = (df['BBU'] - df['BBL']) / df['BBM']
     
+    # Keep only what later stages read: the input columns and the standard indicators
+    from src.analysis.native import EXECUTION_INDICATORS, NATIVE_COLUMNS
+    indicators = [c for c in NATIVE_COLUMNS if c in df.columns]
+    df = df[source_columns + indicators]
+    if dtype != 'float64':
+        df = df.astype({c: dtype for c in indicators if c not in EXECUTION_INDICATORS})
+    
     return df
 
 if __name__ == "__main__":
@@ -0,0 +1,293 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from src.utils.jit import HAS_NUMBA, jit
+
+# Output columns of the native backend, same names add_indicators produces
+NATIVE_COLUMNS = ['BBL', 'BBM', 'BBU', 'Bandwidth', 'RSI', 'MACD', 'MACDs', 'MACDh',
+                  'ADX', 'DMP', 'DMN', 'ATR']
+
+# Indicators the execution engines read (SL/TP levels); kept float64 whatever the dtype
+EXECUTION_INDICATORS = ('ATR',)
+
+# Rows per chunk for the NumPy rolling fallback (bounds the window temporaries)
+_CHUNK = 1 << 16
+
+
+@jit
+def _rma_kernel(x, length):
+    # pandas ewm(alpha=1/length, adjust=True, min_periods=length) recurrence
+    n = len(x)
+    out = np.empty(n)
+    alpha = 1.0 / length
+    weighted = np.nan
+    old_wt = 1.0
+    nobs = 0
+    for i in range(n):
+        cur = x[i]
+        is_obs = cur == cur
+        if is_obs:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= 1.0 - alpha
+            if is_obs:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + cur) / (old_wt + 1.0)
+                old_wt += 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted if nobs >= length else np.nan
+    return out
+
+
+@jit
+def _ema_kernel(x, start, length):
+    # SMA seed over x[start:start+length], then ewm(span=length, adjust=False)
+    n = len(x)
+    out = np.full(n, np.nan)
+    seed_end = start + length - 1
+    if seed_end >= n:
+        return out
+    alpha = 2.0 / (length + 1)
+    old_wt = 1.0 - alpha
+    value = x[start:seed_end + 1].sum() / length
+    out[seed_end] = value
+    for i in range(seed_end + 1, n):
+        cur = x[i]
+        if cur == cur:
+            value = (old_wt * value + alpha * cur) / (old_wt + alpha)
+        out[i] = value
+    return out
+
+
+@jit
+def _rolling_mean_std_kernel(x, length):
+    # Welford add/remove over a fixed window, population std (ddof=0). Like pandas'
+    # rolling(length, min_periods=length), NaN is skipped and a window holding one is NaN
+    n = len(x)
+    mean_out = np.full(n, np.nan)
+    std_out = np.full(n, np.nan)
+    mean = 0.0
+    ssqdm = 0.0
+    nobs = 0
+    for i in range(n):
+        cur = x[i]
+        if cur == cur:
+            nobs += 1
+            delta = cur - mean
+            mean += delta / nobs
+            ssqdm += (nobs - 1) * delta * delta / nobs
+        if i >= length:
+            old = x[i - length]
+            if old == old:
+                nobs -= 1
+                if nobs > 0:
+                    delta = old - mean
+                    mean -= delta / nobs
+                    ssqdm -= (nobs + 1) * delta * delta / nobs
+                else:
+                    mean = 0.0
+                    ssqdm = 0.0
+        if nobs >= length:
+            mean_out[i] = mean
+            std_out[i] = np.sqrt(max(ssqdm / length, 0.0))
+    return mean_out, std_out
+
+
+def rma(x: np.ndarray, length: int) -> np.ndarray:
+    """Wilder's moving average (pandas-ta rma)."""
+    if HAS_NUMBA:
+        return _rma_kernel(x, length)
+    return pd.Series(x).ewm(alpha=1.0 / length, min_periods=length).mean().to_numpy()
+
+
+def ema(x: np.ndarray, length: int) -> np.ndarray:
+    """SMA-seeded EMA starting at the first valid value (pandas-ta ema)."""
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return np.full(len(x), np.nan)
+    start = int(valid[0])
+    if HAS_NUMBA:
+        return _ema_kernel(x, start, length)
+
+    out = np.full(len(x), np.nan)
+    seed_end = start + length - 1
+    if seed_end >= len(x):
+        return out
+    seeded = x[seed_end:].copy()
+    seeded[0] = x[start:seed_end + 1].sum() / length
+    out[seed_end:] = pd.Series(seeded).ewm(span=length, adjust=False).mean().to_numpy()
+    return out
+
+
+def rolling_mean_std(x: np.ndarray, length: int):
+    """Rolling mean and population standard deviation over `length` bars (NaN where a window holds NaN)."""
+    if HAS_NUMBA:
+        return _rolling_mean_std_kernel(x, length)
+
+    n = len(x)
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if n < length:
+        return mean, std
+    windows = sliding_window_view(x, length)
+    for lo in range(0, len(windows), _CHUNK):
+        w = windows[lo:lo + _CHUNK]
+        mean[lo + length - 1:lo + length - 1 + len(w)] = w.mean(axis=1)
+        std[lo + length - 1:lo + length - 1 + len(w)] = w.std(axis=1)
+    return mean, std
+
+
+def native_indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray, bb_length: int = 20,
+                      bb_std: float = 2.0, rsi_length: int = 14, macd_fast: int = 12, macd_slow: int = 26,
+                      macd_signal: int = 9, adx_length: int = 14, atr_length: int = 14,
+                      dtype: str = "float64") -> dict:
+    """
+    Computes the Trinity indicator set directly on float64 arrays.
+
+    Follows the pandas-ta definitions used by the default backend (Wilder RMA
+    smoothing, SMA-seeded EMAs, population std for the bands). Computation is
+    always float64; outputs are cast to `dtype` as they are produced, so a
+    float32 result never holds the full float64 set in memory. The
+    EXECUTION_INDICATORS stay float64 so stops and targets are exact.
+
+    Returns:
+        dict: Column name -> np.ndarray, for every name in NATIVE_COLUMNS.
+    """
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    out = dict.fromkeys(NATIVE_COLUMNS)
+
+    def put(name, values):
+        out[name] = values if name in EXECUTION_INDICATORS else values.astype(dtype, copy=False)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 1. Bollinger Bands
+        mid, std = rolling_mean_std(close, bb_length)
+        lower = mid - std * bb_std
+        upper = mid + std * bb_std
+        put('Bandwidth', 100 * (upper - lower) / mid)
+        put('BBL', lower)
+        put('BBM', mid)
+        put('BBU', upper)
+        del mid, std, lower, upper
+
+        # 2. RSI
+        diff = np.empty_like(close)
+        diff[0] = np.nan
+        np.subtract(close[1:], close[:-1], out=diff[1:])
+        up_avg = rma(np.where(diff < 0, 0.0, diff), rsi_length)
+        dn_avg = rma(np.where(diff > 0, 0.0, diff), rsi_length)
+        put('RSI', 100 * up_avg / (up_avg + np.abs(dn_avg)))
+        del diff, up_avg, dn_avg
+
+        # 3. MACD
+        macd = ema(close, macd_fast) - ema(close, macd_slow)
+        signal = ema(macd, macd_signal)
+        put('MACDh', macd - signal)
+        put('MACD', macd)
+        put('MACDs', signal)
+        del macd, signal
+
+        # 4. ATR / ADX: True Range and directional movement
+        prev_close = np.empty_like(close)
+        prev_close[0] = np.nan
+        prev_close[1:] = close[:-1]
+        tr = np.fmax(np.abs(high - low), np.fmax(np.abs(high - prev_close), np.abs(prev_close - low)))
+        tr[0] = np.nan
+
+        up = np.empty_like(high)
+        dn = np.empty_like(low)
+        up[0] = dn[0] = np.nan
+        np.subtract(high[1:], high[:-1], out=up[1:])
+        np.subtract(low[:-1], low[1:], out=dn[1:])
+        pos = np.where((up > dn) & (up > 0), up, 0.0)
+        neg = np.where((dn > up) & (dn > 0), dn, 0.0)
+        pos[0] = neg[0] = np.nan
+
+        atr_adx = rma(tr, adx_length)
+        k = 100 / atr_adx
+        dmp = k * rma(pos, adx_length)
+        dmn = k * rma(neg, adx_length)
+        dx = 100 * np.abs(dmp - dmn) / (dmp + dmn)
+        put('ADX', rma(dx, adx_length))
+        put('DMP', dmp)
+        put('DMN', dmn)
+
+        # 5. ATR
+        put('ATR', atr_adx if atr_length == adx_length else rma(tr, atr_length))
+
+    return out
+
+
+def add_native_indicators(df: pd.DataFrame, dtype: str = "float64", **params) -> pd.DataFrame:
+    """
+    Native-backend counterpart of `add_indicators`.
+
+    Adds only the standard indicator columns (no intermediate pandas-ta columns).
+    The input columns are not copied: under copy-on-write the result shares
+    their buffers with `df`.
+    """
+    cols = native_indicators(
+        df['High'].to_numpy(dtype=np.float64),
+        df['Low'].to_numpy(dtype=np.float64),
+        df['Close'].to_numpy(dtype=np.float64),
+        dtype=dtype,
+        **params
+    )
+    return pd.concat([df, pd.DataFrame(cols, index=df.index, copy=False)], axis=1)
+
+
+def check_parity(df: pd.DataFrame, rtol: float = 1e-6, **params) -> pd.DataFrame:
+    """
+    Compares the native backend against pandas-ta on the same bars.
+
+    Returns:
+        pd.DataFrame: Per-column NaN-mask agreement, max absolute and relative
+                      difference, and whether the column is within `rtol`.
+    """
+    from src.analysis.indicators import add_indicators
+    reference = add_indicators(df, backend='pandas_ta', **params)
+    native = add_native_indicators(df, **params)
+
+    rows = []
+    for col in NATIVE_COLUMNS:
+        a = reference[col].to_numpy(dtype=np.float64)
+        b = native[col].to_numpy(dtype=np.float64)
+        both = ~np.isnan(a) & ~np.isnan(b)
+        abs_diff = np.abs(a[both] - b[both])
+        rel_diff = abs_diff / np.maximum(np.abs(a[both]), 1e-12)
+        max_rel = rel_diff.max() if len(rel_diff) else 0.0
+        rows.append({
+            'Column': col,
+            'NaN_Match': bool((np.isnan(a) == np.isnan(b)).all()),
+            'Max_Abs_Diff': abs_diff.max() if len(abs_diff) else 0.0,
+            'Max_Rel_Diff': max_rel,
+            'OK': bool((np.isnan(a) == np.isnan(b)).all() and max_rel <= rtol)
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # Offline parity checks on synthetic bars
+    from importlib.util import find_spec
+    from src.data.synthetic import synthetic_bars
+
+    df = synthetic_bars(50_000, seed=0)
+
+    # Rolling mean/std against pandas, with gaps in the input
+    close = df['Close'].to_numpy(dtype=np.float64).copy()
+    close[[100, 101, 5_000, 20_000]] = np.nan
+    mean, std = rolling_mean_std(close, 20)
+    rolling = pd.Series(close).rolling(20, min_periods=20)
+    ok = (np.allclose(mean, rolling.mean(), rtol=1e-9, equal_nan=True)
+          and np.allclose(std, rolling.std(ddof=0), rtol=1e-6, equal_nan=True))
+    print("Rolling mean/std match pandas (with NaN):", bool(ok))
+
+    if find_spec("pandas_ta") is None:
+        print("pandas-ta is not installed, skipping the pandas-ta parity check")
+    else:
+        report = check_parity(df)
+        print(report.to_string(index=False))
+        print("All columns within tolerance:", bool(report['OK'].all()))
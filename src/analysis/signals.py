@@ -1,6 +1,108 @@
+import numpy as np
 import pandas as pd
+from src.analysis.rolling import rolling_quantile
+from src.utils.profiling import profiled
 
-def generate_signals(df: pd.DataFrame, bandwidth_threshold: float = 0.02, adx_threshold: float = 25.0, rsi_lower_thresh: float = 30.0, rsi_upper_thresh: float = 70.0) -> pd.DataFrame:
+# Indicator columns the Trinity rules read
+SIGNAL_COLUMNS = ['Close', 'BBL', 'BBU', 'RSI', 'MACD', 'MACDs', 'MACDh', 'Bandwidth', 'ADX']
+
+def signal_conditions(df: pd.DataFrame) -> dict:
+    """
+    Threshold-independent parts of the Trinity rules, as NumPy arrays.
+    
+    Band breaks and the MACD conditions do not depend on any tunable threshold,
+    so they are evaluated once per indicator frame and shared by every
+    threshold combination passed to `signal_masks`.
+    
+    Returns:
+        dict: Boolean condition arrays plus the RSI, ADX and Bandwidth values.
+    """
+    # Ensure required columns exist
+    missing = [c for c in SIGNAL_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns for signal generation: {missing}")
+    
+    return {
+        # Price < LowerBB (Rumble Strip)
+        'below_lower': (df['Close'] < df['BBL']).to_numpy(),
+        # MACD Histogram Rising (Momentum turning up): current vs previous hist
+        'hist_rising': (df['MACDh'] > df['MACDh'].shift(1)).to_numpy(),
+        # Price > UpperBB
+        'above_upper': (df['Close'] > df['BBU']).to_numpy(),
+        # MACD Bullish
+        'macd_bullish': (df['MACD'] > df['MACDs']).to_numpy(),
+        'RSI': df['RSI'].to_numpy(),
+        'ADX': df['ADX'].to_numpy(),
+        'Bandwidth': df['Bandwidth'].to_numpy()
+    }
+
+def squeeze_threshold(bandwidth, quantile: float = 0.5, window: int = 0):
+    """
+    Squeeze threshold from the Bandwidth column.
+    
+    With `window` 0 this is the `quantile` of the whole period (the median by
+    default), a single scalar that looks ahead over the bars it is applied to.
+    With a window it is the rolling `quantile` of the last `window` bars at
+    each bar, which only uses past data and follows volatility regimes; it is
+    NaN (no squeeze) until the window has filled.
+    
+    Args:
+        bandwidth: Bandwidth values (Series or array).
+        quantile: Quantile in [0, 1]. Default 0.5.
+        window: Rolling window in bars, 0 for the whole period. Default 0.
+        
+    Returns:
+        float or np.ndarray: Scalar threshold, or one threshold per bar.
+    """
+    if window:
+        return rolling_quantile(np.asarray(bandwidth, dtype=np.float64), window, quantile)
+    bandwidth = pd.Series(bandwidth, copy=False)
+    return bandwidth.median() if quantile == 0.5 else bandwidth.quantile(quantile)
+
+def dynamic_squeeze(conditions: dict, threshold: np.ndarray) -> dict:
+    """
+    `signal_conditions` with Bandwidth measured against a per-bar threshold.
+    
+    Bandwidth is replaced by its distance to `threshold`, so a bandwidth
+    threshold of 0 applies the per-bar one. This lets `signal_tensor` and
+    `SignalBitsets`, which take one scalar threshold per parameter set, work
+    with rolling thresholds unchanged.
+    """
+    return {**conditions, 'Bandwidth': conditions['Bandwidth'] - threshold}
+
+def signal_masks(conditions: dict, bandwidth_threshold: float = 0.02, adx_threshold: float = 25.0,
+                 rsi_lower_thresh: float = 30.0, rsi_upper_thresh: float = 70.0):
+    """
+    Applies the thresholds to precomputed `signal_conditions`.
+    
+    Returns:
+        tuple: (mean_reversion, breakout) boolean arrays.
+    """
+    # --- Regime Filter ---
+    # ADX > Threshold -> Trending
+    # ADX < Threshold -> Ranging
+    is_trending = conditions['ADX'] > adx_threshold
+    is_ranging = conditions['ADX'] < adx_threshold
+    
+    # --- Signal A: Mean Reversion ---
+    # Buy the dip in Ranging Market: band break, oversold RSI (< rsi_lower_thresh),
+    # rising histogram
+    mean_rev = conditions['below_lower'] & (conditions['RSI'] < rsi_lower_thresh) & conditions['hist_rising'] & is_ranging
+    
+    # --- Signal B: Squeeze Breakout ---
+    # Buy the explosion in Trending Market: band break, strong RSI (> rsi_upper_thresh),
+    # bullish MACD and a squeeze.
+    # Note: If price breaks out, bandwidth might start expanding immediately.
+    # We check if it IS low (indicating the move is starting from a squeeze).
+    is_squeeze = conditions['Bandwidth'] < bandwidth_threshold
+    breakout = (conditions['above_upper'] & (conditions['RSI'] > rsi_upper_thresh) & conditions['macd_bullish']
+                & is_squeeze & is_trending)
+    
+    return mean_rev, breakout
+
+@profiled("generate_signals")
+def generate_signals(df: pd.DataFrame, bandwidth_threshold: float = 0.02, adx_threshold: float = 25.0, rsi_lower_thresh: float = 30.0, rsi_upper_thresh: float = 70.0,
+                     dtype: str = "uint8") -> pd.DataFrame:
     """
     Generates trading signals based on Trinity Strategy.
     
@@ -20,78 +122,151 @@ def generate_signals(df: pd.DataFrame, bandwidth_threshold: float = 0.02, adx_th
        
     Args:
         df: DataFrame with indicators (BBL, BBU, RSI, MACD, MACDs, MACDh, Bandwidth, ADX).
-        bandwidth_threshold: Threshold for Bandwidth to consider it a squeeze. 
+        bandwidth_threshold: Threshold for Bandwidth to consider it a squeeze, a scalar or one
+                             value per bar (see `squeeze_threshold`).
                              Default 0.02 (2%) might be tight for intraday, adjust as needed.
         adx_threshold: Threshold for ADX to distinguish between Trending and Ranging regimes.
                              Default 25.0.
         rsi_lower_thresh: RSI lower threshold for Mean Reversion (Oversold). Default 30.0.
         rsi_upper_thresh: RSI upper threshold for Breakout (Strong Momentum). Default 70.0.
+        dtype: Signal column dtype, 'uint8' (default), 'bool' or 'int64'.
                              
     Returns:
         pd.DataFrame: DataFrame with 'Signal' column (1 for Buy, 0 for None).
                       Also adds 'Signal_MeanRev' and 'Signal_Breakout' for debugging.
+                      The input columns are shared with `df`, not copied.
     """
-    df = df.copy()
-    
-    # Ensure required columns exist
-    required_cols = ['Close', 'BBL', 'BBU', 'RSI', 'MACD', 'MACDs', 'MACDh', 'Bandwidth', 'ADX']
-    missing = [c for c in required_cols if c not in df.columns]
-    if missing:
-        raise ValueError(f"Missing columns for signal generation: {missing}")
-    
-    # --- Regime Filter ---
-    # ADX > Threshold -> Trending
-    # ADX < Threshold -> Ranging
-    is_trending = df['ADX'] > adx_threshold
-    is_ranging = df['ADX'] < adx_threshold
-    
-    # --- Signal A: Mean Reversion ---
-    # Buy the dip in Ranging Market
-    # Condition 1: Price < LowerBB (Rumble Strip)
-    cond_a_1 = df['Close'] < df['BBL']
-    
-    # Condition 2: RSI < rsi_lower_thresh (Oversold)
-    cond_a_2 = df['RSI'] < rsi_lower_thresh
+    mean_rev, breakout = signal_masks(
+        signal_conditions(df),
+        bandwidth_threshold=bandwidth_threshold,
+        adx_threshold=adx_threshold,
+        rsi_lower_thresh=rsi_lower_thresh,
+        rsi_upper_thresh=rsi_upper_thresh
+    )
+    signals = pd.DataFrame({
+        'Signal_MeanRev': mean_rev.astype(dtype),
+        'Signal_Breakout': breakout.astype(dtype),
+        # --- Combined Signal ---
+        # Priority: If both true (rare), we buy. 
+        # 1 = Buy, 0 = Hold/None
+        'Signal': (mean_rev | breakout).astype(dtype)
+    }, index=df.index, copy=False)
     
-    # Condition 3: MACD Histogram Rising (Momentum turning up)
-    # We compare current hist with previous hist
-    cond_a_3 = df['MACDh'] > df['MACDh'].shift(1)
+    # Column-wise concat: under copy-on-write the indicator columns are not copied
+    return pd.concat([df.drop(columns=signals.columns, errors='ignore'), signals], axis=1)
+
+# Upper bound on bars x parameter sets evaluated at once by signal_tensor
+TENSOR_CHUNK = 1 << 25
+
+def _threshold_sets(*thresholds):
+    """Broadcasts scalar/array thresholds to 1-D float64 arrays of a common length."""
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(t, dtype=np.float64)) for t in thresholds))
+    return [a.ravel() for a in arrays]
+
+def signal_tensor(conditions: dict, bandwidth_thresholds, adx_thresholds, rsi_lower_threshs,
+                  rsi_upper_threshs) -> np.ndarray:
+    """
+    Evaluates many threshold combinations in one broadcast.
     
-    # Combine with Regime
-    df['Signal_MeanRev'] = (cond_a_1 & cond_a_2 & cond_a_3 & is_ranging).astype(int)
+    The threshold arrays are broadcast against each other into P parameter
+    sets. Each distinct threshold value is compared against its indicator
+    once (a sweep with thousands of combinations usually has only a handful
+    of distinct values per parameter); the resulting rows are then combined
+    with the threshold-free conditions for all parameter sets at once, in
+    chunks that bound the temporary boolean arrays.
     
-    # --- Signal B: Squeeze Breakout ---
-    # Buy the explosion in Trending Market
-    # Condition 1: Price > UpperBB
-    cond_b_1 = df['Close'] > df['BBU']
+    Args:
+        conditions: Output of `signal_conditions`.
+        bandwidth_thresholds, adx_thresholds, rsi_lower_threshs, rsi_upper_threshs:
+            Scalars or arrays of thresholds, broadcast to a common length P.
+            
+    Returns:
+        np.ndarray: Packed combined Signal, uint8 of shape (P, ceil(bars / 8)).
+                    Row k unpacks with `unpack_signal(tensor[k], bars)`.
+    """
+    bw, adx, rsi_lo, rsi_hi = _threshold_sets(bandwidth_thresholds, adx_thresholds, rsi_lower_threshs,
+                                              rsi_upper_threshs)
+    n = len(conditions['RSI'])
+    p = len(bw)
     
-    # Condition 2: RSI > rsi_upper_thresh (Strong Momentum)
-    cond_b_2 = df['RSI'] > rsi_upper_thresh
+    def distinct(values, thresholds, op):
+        # One comparison row per distinct threshold, plus each set's row number
+        uniq, inverse = np.unique(thresholds, return_inverse=True)
+        return op(values[None, :], uniq[:, None]), inverse
     
-    # Condition 3: MACD Bullish
-    cond_b_3 = df['MACD'] > df['MACDs']
+    is_ranging, adx_row = distinct(conditions['ADX'], adx, np.less)
+    is_trending, _ = distinct(conditions['ADX'], adx, np.greater)
+    oversold, rsi_lo_row = distinct(conditions['RSI'], rsi_lo, np.less)
+    strong, rsi_hi_row = distinct(conditions['RSI'], rsi_hi, np.greater)
+    is_squeeze, bw_row = distinct(conditions['Bandwidth'], bw, np.less)
     
-    # Condition 4: Bandwidth was low (Squeeze)
-    # Note: If price breaks out, bandwidth might start expanding immediately.
-    # We can check current bandwidth or previous bandwidth. 
-    # Let's check if it IS low (indicating the move is starting from a squeeze).
-    cond_b_4 = df['Bandwidth'] < bandwidth_threshold
+    # Threshold-free parts of each rule
+    base_mean_rev = conditions['below_lower'] & conditions['hist_rising']
+    base_breakout = conditions['above_upper'] & conditions['macd_bullish']
     
-    df['Signal_Breakout'] = (cond_b_1 & cond_b_2 & cond_b_3 & cond_b_4 & is_trending).astype(int)
+    out = np.empty((p, -(-n // 8)), dtype=np.uint8)
+    step = max(1, TENSOR_CHUNK // max(n, 1))
+    for lo in range(0, p, step):
+        rows = slice(lo, min(lo + step, p))
+        mean_rev = base_mean_rev & oversold[rsi_lo_row[rows]] & is_ranging[adx_row[rows]]
+        breakout = base_breakout & strong[rsi_hi_row[rows]] & is_squeeze[bw_row[rows]] & is_trending[adx_row[rows]]
+        out[rows] = np.packbits(mean_rev | breakout, axis=1)
+    return out
+
+class SignalBitsets:
+    """
+    Memoized signal sets for one indicator frame.
     
-    # --- Combined Signal ---
-    # Priority: If both true (rare), we buy. 
-    # 1 = Buy, 0 = Hold/None
-    df['Signal'] = (df['Signal_MeanRev'] | df['Signal_Breakout']).astype(int)
+    `signal_conditions` is evaluated once; each distinct threshold combination
+    is then evaluated once and kept as a packed bitset (1 bit per bar) instead
+    of a copied DataFrame. `computed` counts the evaluations.
     
-    return df
+    `conditions` overrides the evaluated ones, e.g. `dynamic_squeeze` output
+    for a rolling bandwidth threshold (then queried with a threshold of 0).
+    """
+    def __init__(self, df: pd.DataFrame, conditions: dict = None):
+        self.n_bars = len(df)
+        self.conditions = conditions if conditions is not None else signal_conditions(df)
+        self.sets = {}
+        self.computed = 0
+        
+    def get(self, bandwidth_threshold: float, adx_threshold: float, rsi_lower_thresh: float,
+            rsi_upper_thresh: float) -> np.ndarray:
+        """Returns the packed combined Signal for these thresholds (see `unpack_signal`)."""
+        key = (float(bandwidth_threshold), float(adx_threshold), float(rsi_lower_thresh), float(rsi_upper_thresh))
+        bits = self.sets.get(key)
+        if bits is None:
+            mean_rev, breakout = signal_masks(self.conditions, *key)
+            bits = np.packbits(mean_rev | breakout)
+            self.sets[key] = bits
+            self.computed += 1
+        return bits
+        
+    def get_many(self, bandwidth_thresholds, adx_thresholds, rsi_lower_threshs, rsi_upper_threshs) -> list:
+        """
+        Batch form of `get`: the combinations not seen yet are evaluated together
+        with `signal_tensor`. Returns one packed signal per combination.
+        """
+        keys = list(zip(*(a.tolist() for a in _threshold_sets(
+            bandwidth_thresholds, adx_thresholds, rsi_lower_threshs, rsi_upper_threshs))))
+        missing = list(dict.fromkeys(k for k in keys if k not in self.sets))
+        if missing:
+            tensor = signal_tensor(self.conditions, *zip(*missing))
+            for key, bits in zip(missing, tensor):
+                self.sets[key] = bits
+            self.computed += len(missing)
+        return [self.sets[k] for k in keys]
+
+def unpack_signal(bits: np.ndarray, n_bars: int) -> np.ndarray:
+    """Expands a packed signal bitset into a 0/1 uint8 array of length `n_bars`."""
+    return np.unpackbits(bits, count=n_bars)
 
 if __name__ == "__main__":
     from src.data.loader import fetch_data
-    from src.analysis.indicators import add_indicators
+    from src.analysis.cache import cached_indicators
     
     df = fetch_data("NVDA")
-    df = add_indicators(df)
+    df = cached_indicators(df)
     
     # Inspect Bandwidth to set a reasonable threshold for testing
     print("Bandwidth Stats:")
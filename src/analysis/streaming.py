@@ -0,0 +1,264 @@
+import math
+from collections import deque
+import pandas as pd
+
+NAN = float('nan')
+
+
+def _div(a: float, b: float) -> float:
+    """a / b with NumPy semantics for a zero denominator (inf or NaN, never an exception)."""
+    if b == 0:
+        return NAN if (a == 0 or a != a) else math.copysign(math.inf, a)
+    return a / b
+
+
+class _RMA:
+    """
+    Wilder's moving average, one value at a time.
+
+    Mirrors pandas-ta's rma, i.e. `x.ewm(alpha=1/length, min_periods=length).mean()`
+    (adjust=True), using the same recurrence as pandas' ewm kernel.
+    """
+    __slots__ = ('alpha', 'min_periods', 'weighted', 'old_wt', 'nobs')
+
+    def __init__(self, length: int):
+        self.alpha = 1.0 / length
+        self.min_periods = length
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        is_obs = x == x
+        if is_obs:
+            self.nobs += 1
+        if self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+            if is_obs:
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + x) / (self.old_wt + 1.0)
+                self.old_wt += 1.0
+        elif is_obs:
+            self.weighted = x
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+
+class _EMA:
+    """
+    Exponential moving average seeded with the SMA of the first `length` values.
+
+    Mirrors pandas-ta's ema (sma=True, adjust=False). Leading NaNs are skipped,
+    matching how the MACD signal line is computed from the first valid MACD value.
+    """
+    __slots__ = ('length', 'alpha', 'seed', 'value')
+
+    def __init__(self, length: int):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.seed = []
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if self.seed is not None:
+            if x != x:
+                return NAN
+            self.seed.append(x)
+            if len(self.seed) < self.length:
+                return NAN
+            self.value = math.fsum(self.seed) / self.length
+            self.seed = None
+            return self.value
+        if x == x:
+            old_wt = 1.0 - self.alpha
+            self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        return self.value
+
+
+class _RollingMeanStd:
+    """Rolling mean and population standard deviation (ddof=0) over a fixed window."""
+    __slots__ = ('length', 'window', 'mean', 'ssqdm')
+
+    def __init__(self, length: int):
+        self.length = length
+        self.window = deque()
+        self.mean = 0.0
+        self.ssqdm = 0.0
+
+    def update(self, x: float):
+        # Welford add/remove, the same online updates pandas' rolling var uses
+        self.window.append(x)
+        nobs = len(self.window)
+        delta = x - self.mean
+        self.mean += delta / nobs
+        self.ssqdm += (nobs - 1) * delta * delta / nobs
+
+        if nobs > self.length:
+            old = self.window.popleft()
+            nobs -= 1
+            delta = old - self.mean
+            self.mean -= delta / nobs
+            self.ssqdm -= (nobs + 1) * delta * delta / nobs
+
+        if nobs < self.length:
+            return NAN, NAN
+        return self.mean, math.sqrt(max(self.ssqdm / nobs, 0.0))
+
+
+class StreamingIndicators:
+    """
+    Stateful, incremental version of `add_indicators`.
+
+    Each `update(bar)` costs O(1) per indicator: a rolling window for the
+    Bollinger Bands, Wilder smoothing for RSI/ADX/ATR and EMA state for MACD.
+    Outputs use the same column names as `add_indicators` and agree with it
+    to floating point tolerance.
+    """
+    COLUMNS = ['BBL', 'BBM', 'BBU', 'Bandwidth', 'RSI', 'MACD', 'MACDs', 'MACDh',
+               'ADX', 'DMP', 'DMN', 'ATR']
+
+    def __init__(self, bb_length=20, bb_std=2.0, rsi_length=14, macd_fast=12, macd_slow=26,
+                 macd_signal=9, adx_length=14, atr_length=14):
+        self.bb_std = bb_std
+        self._bb = _RollingMeanStd(bb_length)
+        self._rsi_up = _RMA(rsi_length)
+        self._rsi_dn = _RMA(rsi_length)
+        self._ema_fast = _EMA(macd_fast)
+        self._ema_slow = _EMA(macd_slow)
+        self._ema_signal = _EMA(macd_signal)
+        self._atr = _RMA(atr_length)
+        self._adx_atr = _RMA(adx_length)
+        self._dm_pos = _RMA(adx_length)
+        self._dm_neg = _RMA(adx_length)
+        self._adx = _RMA(adx_length)
+        self._prev = None  # (high, low, close) of the previous bar
+        self.bars = 0
+
+    def update(self, bar) -> dict:
+        """
+        Consumes one bar and returns the indicator values at that bar.
+
+        Args:
+            bar: Mapping (dict, Series, namedtuple._asdict()) with 'High', 'Low' and 'Close'.
+
+        Returns:
+            dict: Indicator values keyed by column name (NaN during warm-up).
+        """
+        high = float(bar['High'])
+        low = float(bar['Low'])
+        close = float(bar['Close'])
+        out = {}
+
+        # 1. Bollinger Bands
+        mid, std = self._bb.update(close)
+        out['BBL'] = mid - std * self.bb_std
+        out['BBM'] = mid
+        out['BBU'] = mid + std * self.bb_std
+        out['Bandwidth'] = _div(100 * (out['BBU'] - out['BBL']), mid)
+
+        # 2. RSI
+        if self._prev is None:
+            up = dn = NAN
+        else:
+            diff = close - self._prev[2]
+            up = diff if diff > 0 else 0.0
+            dn = diff if diff < 0 else 0.0
+        up_avg = self._rsi_up.update(up)
+        dn_avg = self._rsi_dn.update(dn)
+        out['RSI'] = _div(100 * up_avg, up_avg + abs(dn_avg))
+
+        # 3. MACD
+        macd = self._ema_fast.update(close) - self._ema_slow.update(close)
+        signal = self._ema_signal.update(macd)
+        out['MACD'] = macd
+        out['MACDs'] = signal
+        out['MACDh'] = macd - signal
+
+        # 4. ADX & 5. ATR
+        if self._prev is None:
+            tr = pos = neg = NAN
+        else:
+            prev_high, prev_low, prev_close = self._prev
+            tr = max(abs(high - low), abs(high - prev_close), abs(prev_close - low))
+            move_up = high - prev_high
+            move_dn = prev_low - low
+            pos = move_up if (move_up > move_dn and move_up > 0) else 0.0
+            neg = move_dn if (move_dn > move_up and move_dn > 0) else 0.0
+
+        out['ATR'] = self._atr.update(tr)
+        k = _div(100, self._adx_atr.update(tr))
+        dmp = k * self._dm_pos.update(pos)
+        dmn = k * self._dm_neg.update(neg)
+        dx = _div(100 * abs(dmp - dmn), dmp + dmn)
+        out['ADX'] = self._adx.update(dx)
+        out['DMP'] = dmp
+        out['DMN'] = dmn
+
+        self._prev = (high, low, close)
+        self.bars += 1
+        return out
+
+    def update_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Feeds every row of `df` through `update`.
+
+        Returns:
+            pd.DataFrame: `df` with the indicator columns added, like `add_indicators`.
+        """
+        rows = [self.update(bar) for bar in df[['High', 'Low', 'Close']].to_dict('records')]
+        ind = pd.DataFrame(rows, index=df.index, columns=self.COLUMNS)
+        return pd.concat([df, ind], axis=1)
+
+
+class StreamingSignals:
+    """
+    Incremental version of `generate_signals`: evaluates the Trinity conditions
+    for one bar of indicator values, keeping only the previous MACD histogram.
+    """
+    def __init__(self, bandwidth_threshold: float = 0.02, adx_threshold: float = 25.0,
+                 rsi_lower_thresh: float = 30.0, rsi_upper_thresh: float = 70.0):
+        self.bandwidth_threshold = bandwidth_threshold
+        self.adx_threshold = adx_threshold
+        self.rsi_lower_thresh = rsi_lower_thresh
+        self.rsi_upper_thresh = rsi_upper_thresh
+        self._prev_macdh = NAN
+
+    def update(self, close: float, ind: dict) -> dict:
+        """
+        Args:
+            close: Close of the bar.
+            ind: Indicator values of the bar (as returned by StreamingIndicators.update).
+
+        Returns:
+            dict: 'Signal_MeanRev', 'Signal_Breakout' and 'Signal' (1 or 0).
+        """
+        adx = ind['ADX']
+        macdh = ind['MACDh']
+
+        # NaN compares False, exactly like the pandas masks in generate_signals
+        mean_rev = (close < ind['BBL'] and ind['RSI'] < self.rsi_lower_thresh
+                    and macdh > self._prev_macdh and adx < self.adx_threshold)
+        breakout = (close > ind['BBU'] and ind['RSI'] > self.rsi_upper_thresh
+                    and ind['MACD'] > ind['MACDs'] and ind['Bandwidth'] < self.bandwidth_threshold
+                    and adx > self.adx_threshold)
+        self._prev_macdh = macdh
+
+        return {
+            'Signal_MeanRev': int(mean_rev),
+            'Signal_Breakout': int(breakout),
+            'Signal': int(mean_rev or breakout)
+        }
+
+
+if __name__ == "__main__":
+    # Parity check against the batch indicators
+    import numpy as np
+    from src.data.loader import fetch_data
+    from src.analysis.cache import cached_indicators
+
+    df = fetch_data("NVDA")
+    batch = cached_indicators(df)
+    stream = StreamingIndicators().update_frame(df)
+
+    for col in StreamingIndicators.COLUMNS:
+        diff = np.nanmax(np.abs(batch[col].to_numpy() - stream[col].to_numpy()))
+        print(f"{col:<10} max abs diff: {diff:.3e}")
@@ -0,0 +1,369 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from src.data.synthetic import synthetic_bars
+
+STAGES = ('fetch', 'indicators', 'signals', 'backtest', 'optimizer', 'dashboard')
+
+# Largest bar count each stage runs at by default. The grid search is
+# impractical beyond this (--no-limits lifts it).
+STAGE_LIMITS = {'optimizer': 1_000_000}
+
+# Differences below this many seconds are treated as timing noise
+MIN_REGRESSION_S = 0.005
+
+# Startup budget for `import main` (seconds, best of a few fresh interpreters)
+IMPORT_BUDGET_S = 1.0
+
+# Heavy optional backends `import main` must leave to first use
+LAZY_MODULES = ('yfinance', 'pandas_ta', 'plotly', 'numba')
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000, '250000' -> 250000."""
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+
+def measure(func, repeat: int = 1, memory: bool = True):
+    """
+    Times `func` and measures its peak traced memory.
+
+    Timing runs `repeat` times and keeps the best wall time. Peak memory comes
+    from one extra run under tracemalloc (NumPy buffers are traced too), so
+    the tracing overhead never leaks into the timings.
+
+    Returns:
+        tuple: (result of the last call, best wall time in seconds, peak MB or None)
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return result, best, peak_mb
+
+
+class BenchmarkSuite:
+    """
+    Times every pipeline stage on synthetic bars, offline.
+
+    For each size the bars are written to a temporary bar store and pushed
+    through the same calls `main.py` and the optimizer make: `fetch_data`
+    (store hit), `add_indicators`, `generate_signals`, `Backtester.run`,
+    `Optimizer.run_grid_search` and `create_dashboard` (including the HTML
+    export). Each stage reports its best wall time and peak memory.
+    """
+    def __init__(self, sizes=(10_000, 100_000), interval="5m", stages=STAGES, engine="array",
+                 optimizer_engine="batch", indicator_backend="pandas_ta", repeat=3, memory=True,
+                 limits=True, seed=0):
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages {sorted(unknown)}. Expected some of {STAGES}")
+        self.sizes = list(sizes)
+        self.interval = interval
+        self.stages = [s for s in STAGES if s in stages]
+        self.engine = engine
+        self.optimizer_engine = optimizer_engine
+        self.indicator_backend = indicator_backend
+        self.repeat = repeat
+        self.memory = memory
+        self.limits = limits
+        self.seed = seed
+        self.results = []
+
+    def run(self) -> dict:
+        """
+        Runs every stage at every size.
+
+        Returns:
+            dict: 'meta' (environment and settings) and 'results' (one row per stage and size).
+        """
+        self.results = []
+        for n_bars in self.sizes:
+            print(f"--- {n_bars:,} bars ({self.interval}) ---")
+            self._run_size(n_bars)
+        return self.report()
+
+    def report(self) -> dict:
+        return {'meta': self._meta(), 'results': self.results}
+
+    def _run_size(self, n_bars: int):
+        # Imported here so the synthetic generator stays usable without the full stack
+        from src.data.loader import fetch_data
+        from src.data.store import BarStore
+        from src.analysis.indicators import add_indicators
+        from src.analysis.signals import generate_signals
+        from src.engine.backtester import Backtester
+
+        bars = synthetic_bars(n_bars, interval=self.interval, seed=self.seed)
+        data_dir = tempfile.mkdtemp(prefix="trinity_bench_")
+        try:
+            store = BarStore(os.path.join(data_dir, "bars"))
+            store.append("SYNTH", self.interval, bars)
+            store.mark_covered("SYNTH", self.interval, None, bars.index[-1])
+
+            df = self._stage('fetch', n_bars, lambda: fetch_data(
+                "SYNTH", interval=self.interval, period="max", data_dir=data_dir))
+            df_ind = self._stage('indicators', n_bars, lambda: add_indicators(df, backend=self.indicator_backend),
+                                 requires=df)
+            bw_threshold = df_ind['Bandwidth'].median() if df_ind is not None else None
+            df_sig = self._stage('signals', n_bars, lambda: generate_signals(df_ind, bandwidth_threshold=bw_threshold),
+                                 requires=df_ind)
+            trades = self._stage('backtest', n_bars, lambda: Backtester(engine=self.engine).run(df_sig),
+                                 requires=df_sig)
+            self._stage('optimizer', n_bars, lambda: self._grid_search(df_ind), requires=df_ind)
+            self._stage('dashboard', n_bars, lambda: self._dashboard(df_sig, trades), requires=trades)
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    def _stage(self, stage: str, n_bars: int, func, requires=True):
+        """Measures one stage and records it. Returns the stage output, or None if it did not run."""
+        if stage not in self.stages and stage not in ('fetch', 'indicators', 'signals', 'backtest'):
+            return None
+        if requires is None:
+            return None
+        if self.limits and n_bars > STAGE_LIMITS.get(stage, n_bars):
+            print(f"  {stage:<11} skipped (above {STAGE_LIMITS[stage]:,} bars)")
+            return None
+
+        measured = stage in self.stages
+        try:
+            # Upstream stages still run (untimed) when only later stages were selected
+            with contextlib.redirect_stdout(io.StringIO()):
+                if not measured:
+                    return func()
+                result, wall, peak_mb = measure(func, repeat=self.repeat, memory=self.memory)
+        except Exception as e:
+            if measured:
+                self.results.append({'stage': stage, 'bars': n_bars, 'wall_s': None, 'peak_mb': None,
+                                     'error': f"{type(e).__name__}: {e}"})
+            print(f"  {stage:<11} failed: {type(e).__name__}: {e}")
+            return None
+
+        row = {'stage': stage, 'bars': n_bars, 'wall_s': wall, 'peak_mb': peak_mb, 'error': None}
+        if stage == 'dashboard':
+            row['html_mb'] = result
+        self.results.append(row)
+        mem = f"{peak_mb:9.1f} MB" if peak_mb is not None else ""
+        print(f"  {stage:<11} {wall:10.4f} s {mem}  ({n_bars / wall:,.0f} bars/s)")
+        return result
+
+    def _grid_search(self, df_ind: pd.DataFrame):
+        from src.optimization.optimizer import Optimizer
+        optimizer = Optimizer(ticker="SYNTH", interval=self.interval, engine=self.optimizer_engine, n_jobs=1,
+                              indicator_backend=self.indicator_backend, results_path=None)
+        optimizer.df = df_ind
+        optimizer.run_grid_search()
+        return optimizer.results
+
+    def _dashboard(self, df_sig: pd.DataFrame, trades: pd.DataFrame) -> float:
+        """Builds the dashboard and renders it to HTML, as main.py does. Returns the HTML size in MB."""
+        from src.visualization.dashboard import create_dashboard
+        fig = create_dashboard(df_sig, trades)
+        return len(fig.to_html()) / 2**20
+
+    def _meta(self) -> dict:
+        from src.utils.jit import HAS_NUMBA
+        return {
+            'created': pd.Timestamp.now(tz='UTC').isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'numba': HAS_NUMBA,
+            'interval': self.interval,
+            'engine': self.engine,
+            'optimizer_engine': self.optimizer_engine,
+            'indicator_backend': self.indicator_backend,
+            'repeat': self.repeat,
+            'seed': self.seed
+        }
+
+
+def import_profile(module: str = "main", repeat: int = 3, top: int = 10) -> dict:
+    """
+    Measures the startup cost of importing `module` with `python -X importtime`.
+
+    Each run is a fresh interpreter, so nothing is already imported; the best
+    of `repeat` runs is kept. Imports done by `site` before the module are not
+    counted.
+
+    Returns:
+        dict: 'module', 'import_s' (cumulative import time), 'slowest' (the
+              `top` slowest direct imports as [name, seconds]) and 'lazy_loaded'
+              (any LAZY_MODULES that were imported eagerly).
+    """
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              capture_output=True, text=True, check=True)
+        # Lines: "import time: self [us] | cumulative | <indent>name"; a module's
+        # children are logged before it, one indent level deeper
+        entries = []
+        for line in proc.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            name = parts[2]
+            entries.append((len(name) - len(name.lstrip()), name.strip(), int(parts[1]) / 1e6))
+        end = max(i for i, e in enumerate(entries) if e[0] == 1 and e[1] == module)
+        begin = end
+        while begin > 0 and entries[begin - 1][0] > 1:
+            begin -= 1
+        children = [(name, sec) for depth, name, sec in entries[begin:end] if depth == 3]
+        loaded = {name.split(".")[0] for _, name, _ in entries[begin:end]}
+        run = {
+            'module': module,
+            'import_s': entries[end][2],
+            'slowest': [list(c) for c in sorted(children, key=lambda c: -c[1])[:top]],
+            'lazy_loaded': sorted(loaded & set(LAZY_MODULES))
+        }
+        if best is None or run['import_s'] < best['import_s']:
+            best = run
+    return best
+
+
+def check_imports(profile: dict, budget: float = IMPORT_BUDGET_S) -> list:
+    """Returns the import-time problems of an `import_profile` result (empty if within budget)."""
+    problems = []
+    if profile['import_s'] > budget:
+        problems.append(f"import {profile['module']} took {profile['import_s']:.3f}s (budget {budget:.3f}s)")
+    for name in profile['lazy_loaded']:
+        problems.append(f"import {profile['module']} loaded {name} eagerly")
+    return problems
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25) -> pd.DataFrame:
+    """
+    Compares a benchmark report against a baseline report.
+
+    A stage/size counts as a regression when its wall time or peak memory
+    exceeds the baseline by more than `tolerance` (0.25 = 25%). Tiny absolute
+    time differences (< MIN_REGRESSION_S) are ignored as noise.
+
+    Returns:
+        pd.DataFrame: One row per stage/size present in both reports, with the
+                      ratios to the baseline and a 'Regression' flag.
+    """
+    base = {(r['stage'], r['bars']): r for r in baseline['results'] if r.get('error') is None}
+    rows = []
+    for r in results['results']:
+        b = base.get((r['stage'], r['bars']))
+        if b is None or r.get('error') is not None:
+            continue
+        time_ratio = r['wall_s'] / b['wall_s'] if b['wall_s'] else float('nan')
+        mem_ratio = (r['peak_mb'] / b['peak_mb']
+                     if r.get('peak_mb') is not None and b.get('peak_mb') else float('nan'))
+        slower = time_ratio > 1 + tolerance and r['wall_s'] - b['wall_s'] > MIN_REGRESSION_S
+        bigger = mem_ratio > 1 + tolerance
+        rows.append({
+            'Stage': r['stage'],
+            'Bars': r['bars'],
+            'Wall_s': r['wall_s'],
+            'Baseline_s': b['wall_s'],
+            'Time_Ratio': time_ratio,
+            'Peak_MB': r.get('peak_mb'),
+            'Baseline_MB': b.get('peak_mb'),
+            'Mem_Ratio': mem_ratio,
+            'Regression': bool(slower or bigger)
+        })
+    return pd.DataFrame(rows)
+
+
+def _write_json(path: str, payload: dict):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+if __name__ == "__main__":
+    from src.analysis.indicators import BACKENDS
+    from src.engine.backtester import ENGINES
+    from src.optimization.optimizer import OPTIMIZER_ENGINES
+
+    parser = argparse.ArgumentParser(description="Trinity Pipeline Benchmarks (synthetic data, offline)")
+    parser.add_argument("--sizes", type=str, default="10k,100k", help="Comma-separated bar counts, e.g. 10k,100k,1m,10m (default: 10k,100k)")
+    parser.add_argument("--interval", type=str, default="5m", help="Bar interval of the synthetic data (default: 5m)")
+    parser.add_argument("--stages", type=str, default=",".join(STAGES), help=f"Comma-separated stages (default: all of {','.join(STAGES)})")
+    parser.add_argument("--engine", type=str, default="array", choices=ENGINES, help="Backtester engine (default: array)")
+    parser.add_argument("--optimizer-engine", type=str, default="batch", choices=OPTIMIZER_ENGINES, help="Optimizer engine (default: batch)")
+    parser.add_argument("--indicators", type=str, default="pandas_ta", choices=BACKENDS, help="Indicator Backend (default: pandas_ta)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions per stage, best is kept (default: 3)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory run")
+    parser.add_argument("--no-limits", action="store_true", help="Run every stage at every size")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed (default: 0)")
+    parser.add_argument("--output", type=str, default="benchmarks/results.json", help="Results JSON (default: benchmarks/results.json)")
+    parser.add_argument("--baseline", type=str, default="benchmarks/baseline.json", help="Baseline JSON to compare against (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown / memory growth vs baseline (default: 0.25)")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_S, help=f"Allowed `import main` time in seconds (default: {IMPORT_BUDGET_S})")
+    parser.add_argument("--no-import-check", action="store_true", help="Skip the -X importtime startup check")
+    args = parser.parse_args()
+
+    suite = BenchmarkSuite(
+        sizes=[parse_size(s) for s in args.sizes.split(",")],
+        interval=args.interval,
+        stages=[s.strip() for s in args.stages.split(",")],
+        engine=args.engine,
+        optimizer_engine=args.optimizer_engine,
+        indicator_backend=args.indicators,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+        limits=not args.no_limits,
+        seed=args.seed
+    )
+    report = suite.run()
+    failed = False
+    if not args.no_import_check:
+        imports = import_profile("main")
+        report['imports'] = imports
+        print(f"\n--- Startup: import main {imports['import_s']:.3f}s (budget {args.import_budget:.3f}s) ---")
+        for name, sec in imports['slowest']:
+            print(f"  {name:<32} {sec:8.3f} s")
+        problems = check_imports(imports, args.import_budget)
+        for problem in problems:
+            print(f"  FAIL: {problem}")
+        failed = bool(problems)
+    _write_json(args.output, report)
+    print(f"\nResults saved to {args.output}")
+
+    if args.save_baseline:
+        _write_json(args.baseline, report)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        comparison = compare(report, baseline, tolerance=args.tolerance)
+        print(f"\n--- Comparison with {args.baseline} ---")
+        print(comparison.to_string(index=False) if not comparison.empty else "No overlapping results.")
+        if not comparison.empty and comparison['Regression'].any():
+            print(f"\n{int(comparison['Regression'].sum())} regression(s) beyond {args.tolerance:.0%}")
+            failed = True
+    else:
+        print(f"No baseline at {args.baseline} (create one with --save-baseline)")
+    if failed:
+        sys.exit(1)
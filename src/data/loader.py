@@ -1,51 +1,116 @@
 import os
 import pandas as pd
-import yfinance as yf
+from src.data.resample import ResampleCache, is_intraday, resample_bars
+from src.data.store import BarStore
+from src.data.sessions import interval_minutes
+from src.data.sync import YFinanceProvider, period_start, sync_ticker
+from src.utils.profiling import profiled
 
-def fetch_data(ticker: str, interval: str = "5m", period: str = "1mo", data_dir: str = "data") -> pd.DataFrame:
+# Base resolutions coarser intraday intervals are resampled from, finest first,
+# with how far back yfinance serves each of them
+BASE_INTERVALS = {
+    '1m': pd.Timedelta(days=7),
+    '5m': pd.Timedelta(days=60),
+    '1h': pd.Timedelta(days=730),
+}
+
+# Resampled frames, stored next to their base bars and keyed by the base coverage
+_RESAMPLED = ResampleCache()
+
+
+@profiled("fetch_data", rows_arg=None)
+def fetch_data(ticker: str, interval: str = "5m", period: str = "1mo", data_dir: str = "data",
+               base_interval: str = None, download: bool = True) -> pd.DataFrame:
     """
     Fetches OHLCV data for a given ticker.
-    Checks local cache first; if not found, downloads from yfinance and caches it.
+    Checks the local bar store first; if the requested period has not been downloaded,
+    downloads only the missing bars from yfinance and merges them into the store.
+
+    Intraday intervals are built from the finest stored (or downloadable) base
+    resolution, e.g. 15m and 1h bars come from the 5m store, so each ticker is
+    downloaded and stored once. Resampled frames are kept next to the base
+    bars and reused until the base coverage changes.
 
     Args:
         ticker: The stock symbol (e.g., 'NVDA').
         interval: Data granularity (default '5m').
         period: Data lookback period (default '1mo').
-        data_dir: Directory to store cached CSVs.
+        data_dir: Directory holding the bar store (under data_dir/bars).
+        base_interval: Resolution to store and resample from (default: chosen by `base_interval_for`).
+        download: If False, only read the store and return an empty frame on a miss
+                  (universe workers, after `DataSync` has synced the universe).
 
     Returns:
         pd.DataFrame: Cleaned DataFrame with OHLCV data.
     """
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
+    store = BarStore(os.path.join(data_dir, "bars"))
+    base = base_interval or base_interval_for(store, ticker, interval, period)
+    if base == interval:
+        return _fetch_bars(store, ticker, interval, period, download)
+
+    base_path = store.path(ticker, base)
+    df = _RESAMPLED.get(base_path, interval, period, store.coverage(ticker, base))
+    if df is not None:
+        print(f"Using cached {interval} bars resampled from {base}")
+        return df
+
+    df = _fetch_bars(store, ticker, base, period, download)
+    if df.empty:
+        return df
+    print(f"Resampling {base} bars to {interval}")
+    df = resample_bars(df, interval)
+    _RESAMPLED.put(base_path, interval, period, store.coverage(ticker, base), df)
+    return df
+
+def base_interval_for(store: BarStore, ticker: str, interval: str, period: str) -> str:
+    """
+    Picks the resolution `interval` bars are derived from.
+
+    The finest base interval dividing `interval` is used if the store already
+    covers `period` at it, else the finest one yfinance serves that far back.
+    Daily and longer intervals are always downloaded as is: yfinance's daily
+    bars include auctions and adjustments that regular-session intraday bars lack.
+    """
+    if not is_intraday(interval):
+        return interval
+    minutes = interval_minutes(interval)
+    candidates = [b for b in BASE_INTERVALS if minutes % interval_minutes(b) == 0 and b != interval] + [interval]
+
+    for base in candidates:
+        if _covers(store.coverage(ticker, base), period):
+            return base
+
+    now = pd.Timestamp.now(tz='UTC')
+    start = period_start(now, period)
+    for base in candidates[:-1]:
+        if start is not None and now - start <= BASE_INTERVALS[base]:
+            return base
+    return interval
 
-    # Sanitize inputs for filename
-    safe_ticker = ticker.replace("^", "").replace("/", "-")
-    cache_path = os.path.join(data_dir, f"{safe_ticker}_{interval}_{period}.csv")
+def _fetch_bars(store: BarStore, ticker: str, interval: str, period: str, download: bool = True) -> pd.DataFrame:
+    """Loads (downloading what is missing, if allowed) and cleans `period` of `interval` bars."""
+    df = _load_cached(store, ticker, interval, period)
 
-    if os.path.exists(cache_path):
-        print(f"Loading data from cache: {cache_path}")
-        df = pd.read_csv(cache_path, index_col=0, parse_dates=True)
+    if df is not None:
+        print(f"Loading data from store: {store.path(ticker, interval)}")
+    elif not download:
+        print(f"No stored {interval} data for {ticker}")
+        return pd.DataFrame()
     else:
         print(f"Downloading data for {ticker}...")
+        now = pd.Timestamp.now(tz='UTC')
         try:
-            df = yf.download(ticker, interval=interval, period=period, progress=False)
-            
-            # Handle MultiIndex columns (yfinance structure: Price, Ticker)
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-                
+            # Only the bars missing from the store are requested, then merged into it
+            result = sync_ticker(store, YFinanceProvider(), ticker, interval, period, now)
         except Exception as e:
             print(f"Error downloading data: {e}")
             return pd.DataFrame()
 
-        if df.empty:
+        df = store.load(ticker, interval, start=period_start(now, period))
+        if result['Status'] == 'no data' or df.empty:
             print(f"No data found for {ticker}")
             return pd.DataFrame()
-
-        # Cache the raw data
-        df.to_csv(cache_path)
-        print(f"Data cached to {cache_path}")
+        print(f"Data cached to {store.path(ticker, interval)} ({result['Rows']} bars downloaded)")
 
     # Data Cleaning
     # 1. Drop NaNs
@@ -63,6 +128,28 @@ def fetch_data(ticker: str, interval: str = "5m", period: str = "1mo", data_dir:
 
     return df
 
+def _load_cached(store: BarStore, ticker: str, interval: str, period: str):
+    """
+    Returns the stored bars for `period` if that whole window was downloaded before, else None.
+
+    Like the old per-period CSV cache, a hit does not refresh: the window is
+    anchored at the end of the last download rather than at the current time.
+    """
+    coverage = store.coverage(ticker, interval)
+    if not _covers(coverage, period):
+        return None
+
+    df = store.load(ticker, interval, start=period_start(coverage[1], period))
+    return df if not df.empty else None
+
+def _covers(coverage, period: str) -> bool:
+    """True if a stored range covers `period` ending at its last download."""
+    if coverage is None:
+        return False
+    covered_start, covered_end = coverage
+    start = period_start(covered_end, period)
+    return covered_start is None or (start is not None and covered_start <= start)
+
 if __name__ == "__main__":
     # Test execution
     data = fetch_data("NVDA")
@@ -0,0 +1,155 @@
+import os
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from src.data.sessions import SESSION_MINUTES, SESSION_OPEN, interval_minutes
+
+# Columns aggregated by something other than "last value of the bin"
+FIRST_COLUMNS = ('Open',)
+MAX_COLUMNS = ('High',)
+MIN_COLUMNS = ('Low',)
+SUM_COLUMNS = ('Volume',)
+
+# Schema metadata key holding the base coverage a persisted frame was built from
+_COVERAGE_KEY = b"trinity.coverage"
+
+def is_intraday(interval: str) -> bool:
+    """True for intervals shorter than a session ('1m', '5m', '1h', ...)."""
+    try:
+        return interval_minutes(interval) < SESSION_MINUTES
+    except ValueError:
+        return False
+
+
+def bin_starts(index: pd.DatetimeIndex, interval: str) -> np.ndarray:
+    """
+    Start of the `interval` bin each bar falls in, as int64 ticks of the index's unit on its own clock.
+
+    Bins are laid out in local (exchange) time on a grid anchored at each
+    session open (09:30), so a '1h' bar starts at 09:30, 10:30, ... as
+    yfinance's do. Bins are clipped at midnight, so a bin never spans two
+    days: for bars before 09:30 (e.g. a market trading around the clock) the
+    first bin of the day runs from 00:00 to the next grid point (00:30 for
+    '1h'). Daily and longer bins start at midnight.
+    """
+    # Ticks of the index's own unit, so bars past 2262 (second resolution) work too
+    tick = pd.Timedelta(1, unit=index.unit)
+    local = index.tz_localize(None) if index.tz is not None else index
+    local_ticks = local.asi8
+    day_ticks = pd.Timedelta(days=1) // tick
+    day = local_ticks - local_ticks % day_ticks
+
+    step = pd.Timedelta(minutes=interval_minutes(interval)) // tick
+    if interval_minutes(interval) >= SESSION_MINUTES:
+        local_bins = day
+    else:
+        anchor = day + SESSION_OPEN // tick
+        local_bins = anchor + (local_ticks - anchor) // step * step
+        np.maximum(local_bins, day, out=local_bins)  # Bars before the open: no bin from the previous day
+
+    # Back to the index's clock: same offset from the bar as on the local clock (DST-safe)
+    return index.asi8 - (local_ticks - local_bins)
+
+
+def resample_bars(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregates OHLCV bars into a coarser `interval`.
+
+    Open is the first bar's open, High/Low the extremes, Close (and any other
+    price column) the last bar's value and Volume the sum. Bins respect
+    session boundaries (see `bin_starts`) and are labelled by their start;
+    empty bins produce no row. Runs in a few NumPy passes (`reduceat` over
+    bin boundaries), so it needs a sorted index.
+
+    Args:
+        df: Bars on a sorted DatetimeIndex, at a resolution dividing `interval`.
+        interval: Target interval ('15m', '1h', '1d', ...).
+
+    Returns:
+        pd.DataFrame: Resampled bars with the same columns and dtypes.
+    """
+    if df.empty:
+        return df.copy()
+    bins = bin_starts(df.index, interval)
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    ends = np.r_[starts[1:], len(df)] - 1
+
+    out = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if col in FIRST_COLUMNS:
+            out[col] = values[starts]
+        elif col in MAX_COLUMNS:
+            out[col] = np.maximum.reduceat(values, starts)
+        elif col in MIN_COLUMNS:
+            out[col] = np.minimum.reduceat(values, starts)
+        elif col in SUM_COLUMNS:
+            out[col] = np.add.reduceat(values, starts).astype(values.dtype)
+        else:
+            out[col] = values[ends]
+
+    index = pd.DatetimeIndex(bins[starts].view(f'datetime64[{df.index.unit}]'), name=df.index.name)
+    if df.index.tz is not None:
+        index = index.tz_localize('UTC').tz_convert(df.index.tz)
+    return pd.DataFrame(out, index=index)
+
+
+class ResampleCache:
+    """
+    Resampled frames persisted next to the base bars they were built from.
+
+    Each (interval, period) derived from a base store directory has one
+    uncompressed Feather file in its `resampled/` folder, tagged with the base
+    coverage it was built from. Later runs and other processes reuse it for as
+    long as the base coverage is unchanged; a rebuild overwrites it. Writes go
+    through a per-writer temporary file and an atomic rename.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, base_path: str, interval: str, period: str) -> str:
+        return os.path.join(base_path, "resampled", f"{interval}_{period}.feather")
+
+    def get(self, base_path: str, interval: str, period: str, coverage):
+        """Returns the frame resampled from `base_path` bars with `coverage`, or None."""
+        try:
+            table = feather.read_table(self.path(base_path, interval, period), memory_map=True)
+        except FileNotFoundError:
+            table = None
+        if table is None or (table.schema.metadata or {}).get(_COVERAGE_KEY) != _coverage_tag(coverage):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return table.to_pandas()
+
+    def put(self, base_path: str, interval: str, period: str, coverage, df: pd.DataFrame):
+        path = self.path(base_path, interval, period)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), _COVERAGE_KEY: _coverage_tag(coverage)})
+        tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        feather.write_feather(table, tmp, compression='uncompressed')
+        os.replace(tmp, path)
+
+
+def _coverage_tag(coverage) -> bytes:
+    """Schema metadata value identifying a `BarStore.coverage()` result."""
+    if coverage is None:
+        return b"none"
+    start, end = coverage
+    return f"{start.isoformat() if start is not None else 'max'}/{end.isoformat()}".encode()
+
+
+if __name__ == "__main__":
+    import time
+    from src.data.synthetic import synthetic_bars
+
+    df = synthetic_bars(1_000_000, interval="1m")
+    for interval in ("5m", "15m", "1h", "1d"):
+        start = time.perf_counter()
+        out = resample_bars(df, interval)
+        print(f"1m -> {interval}: {len(out):,} bars in {time.perf_counter() - start:.3f}s")
+    print(out.tail())
@@ -0,0 +1,13 @@
+import pandas as pd
+
+# Regular US equity session, which is what yfinance returns for intraday intervals
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_MINUTES = 390
+
+def interval_minutes(interval: str) -> int:
+    """Bar length in minutes for yfinance-style intervals ('1m', '5m', '1h', '1d', ...)."""
+    units = {'m': 1, 'h': 60, 'd': SESSION_MINUTES}
+    unit = interval[-1]
+    if unit not in units or not interval[:-1].isdigit():
+        raise ValueError(f"Unsupported interval '{interval}'")
+    return int(interval[:-1]) * units[unit]
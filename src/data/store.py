@@ -0,0 +1,162 @@
+import os
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close']
+
+class BarStore:
+    """
+    Columnar on-disk store for OHLCV bars.
+
+    Layout: {root}/{ticker}/{interval}/{YYYY-MM}.parquet, one compressed Parquet
+    file per calendar month, plus a small _meta.json recording which time range
+    has been downloaded. New downloads are merged into the existing history, so
+    overlapping periods are never stored twice.
+    """
+    def __init__(self, root: str = "data/bars", compression: str = "zstd", price_dtype: str = "float64"):
+        self.root = root
+        self.compression = compression
+        self.price_dtype = price_dtype
+
+    def path(self, ticker: str, interval: str) -> str:
+        safe_ticker = ticker.replace("^", "").replace("/", "-")
+        return os.path.join(self.root, safe_ticker, interval)
+
+    def partitions(self, ticker: str, interval: str) -> list:
+        """Returns the sorted (month, file path) pairs stored for a ticker/interval."""
+        base = self.path(ticker, interval)
+        if not os.path.isdir(base):
+            return []
+        names = sorted(f for f in os.listdir(base) if f.endswith(".parquet"))
+        return [(f[:-len(".parquet")], os.path.join(base, f)) for f in names]
+
+    def load(self, ticker: str, interval: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Loads bars in [start, end] (both optional, inclusive).
+
+        Only the monthly partitions overlapping the range are read. Files are
+        memory-mapped and decoded straight into the DataFrame's column blocks.
+
+        Returns:
+            pd.DataFrame: Bars indexed by timestamp, or an empty DataFrame.
+        """
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        # Partitions are by local month; pad a day so a UTC bound never skips one
+        first = (start - pd.Timedelta(days=1)).strftime("%Y-%m") if start is not None else None
+        last = (end + pd.Timedelta(days=1)).strftime("%Y-%m") if end is not None else None
+
+        paths = [p for month, p in self.partitions(ticker, interval)
+                 if (first is None or month >= first) and (last is None or month <= last)]
+        if not paths:
+            return pd.DataFrame()
+
+        table = pa.concat_tables([pq.read_table(p, memory_map=True) for p in paths])
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+
+        # Partitions are sorted and non-overlapping, so the index is already ordered
+        if start is not None or end is not None:
+            lo = df.index.searchsorted(_align_tz(start, df.index), side='left') if start is not None else 0
+            hi = df.index.searchsorted(_align_tz(end, df.index), side='right') if end is not None else len(df)
+            df = df.iloc[lo:hi]
+        return df
+
+    def append(self, ticker: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Merges new bars into the store.
+
+        Bars are grouped by month; each touched partition is rewritten with the
+        union of old and new rows (new rows win on duplicate timestamps).
+
+        Returns:
+            int: Number of rows written across the touched partitions.
+        """
+        if df.empty:
+            return 0
+        df = self._typed(df)
+        base = self.path(ticker, interval)
+        os.makedirs(base, exist_ok=True)
+
+        written = 0
+        months = df.index.strftime("%Y-%m")
+        for month, chunk in df.groupby(months, sort=True):
+            target = os.path.join(base, f"{month}.parquet")
+            if os.path.exists(target):
+                existing = pq.read_table(target).to_pandas()
+                chunk = pd.concat([existing, chunk])
+                chunk = chunk[~chunk.index.duplicated(keep='last')]
+            chunk = chunk.sort_index()
+
+            # Write then rename so a crash never leaves a half-written partition
+            tmp = target + ".tmp"
+            pq.write_table(pa.Table.from_pandas(chunk, preserve_index=True), tmp, compression=self.compression)
+            os.replace(tmp, target)
+            written += len(chunk)
+        return written
+
+    def coverage(self, ticker: str, interval: str):
+        """
+        Returns the downloaded time range as (start, end) UTC Timestamps, or None.
+        A start of None means the full available history was downloaded.
+        """
+        meta_path = os.path.join(self.path(ticker, interval), "_meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        start = pd.Timestamp(meta['start']) if meta.get('start') else None
+        return start, pd.Timestamp(meta['end'])
+
+    def mark_covered(self, ticker: str, interval: str, start, end) -> bool:
+        """
+        Records [start, end] as downloaded.
+
+        Coverage is a single gap-free range. A range that overlaps or touches
+        the recorded one extends it; a disjoint range replaces it, since the
+        union would claim the bars in between were downloaded. Bars outside
+        the new range stay in the store but no longer count as covered.
+
+        Returns:
+            bool: True if the range was merged, False if it replaced a disjoint one.
+        """
+        start = _utc(start) if start is not None else None
+        end = _utc(end)
+        merged = True
+        current = self.coverage(ticker, interval)
+        if current is not None:
+            cur_start, cur_end = current
+            disjoint = (start is not None and start > cur_end) or (cur_start is not None and end < cur_start)
+            if disjoint:
+                merged = False
+            else:
+                start = None if start is None or cur_start is None else min(start, cur_start)
+                end = max(end, cur_end)
+
+        base = self.path(ticker, interval)
+        os.makedirs(base, exist_ok=True)
+        with open(os.path.join(base, "_meta.json"), "w") as f:
+            json.dump({'start': start.isoformat() if start is not None else None,
+                       'end': end.isoformat()}, f)
+        return merged
+
+    def _typed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Casts price columns to the store's price dtype and Volume to int64."""
+        dtypes = {c: self.price_dtype for c in PRICE_COLUMNS if c in df.columns}
+        if 'Volume' in df.columns:
+            dtypes['Volume'] = 'int64'
+        df = df.dropna(subset=list(dtypes)) if dtypes else df
+        return df.astype(dtypes)
+
+
+def _align_tz(ts: pd.Timestamp, index: pd.DatetimeIndex) -> pd.Timestamp:
+    """Makes a query timestamp comparable with the stored index."""
+    if index.tz is not None:
+        return ts.tz_localize(index.tz) if ts.tz is None else ts.tz_convert(index.tz)
+    return ts.tz_convert(None) if ts.tz is not None else ts
+
+
+def _utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tz is None else ts.tz_convert('UTC')
@@ -0,0 +1,319 @@
+import os
+import time
+import zlib
+import argparse
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.data.store import BarStore
+from src.data.sessions import SESSION_MINUTES, interval_minutes
+from src.data.synthetic import synthetic_bars
+
+# yfinance period strings -> lookback offsets ('max' means full history)
+PERIODS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+def period_start(end: pd.Timestamp, period: str):
+    """
+    Start of a yfinance-style `period` ending at `end`.
+    Returns None for 'max' (no lower bound).
+    """
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return end.normalize().replace(month=1, day=1)
+    if period not in PERIODS:
+        raise ValueError(f"Unsupported period '{period}'. Expected one of {list(PERIODS) + ['ytd', 'max']}")
+    return end - PERIODS[period]
+
+
+def missing_ranges(coverage, start, end: pd.Timestamp, min_gap: pd.Timedelta = pd.Timedelta(0)) -> list:
+    """
+    Download ranges needed for the store to cover [start, end].
+
+    Only history older than the covered range and bars newer than it are
+    requested. The newer range restarts at the beginning of the last covered
+    (UTC) day, so a session that was downloaded while still trading gets
+    completed, and it is always joined to the covered range so the store's
+    coverage never spans a hole.
+
+    Args:
+        coverage: `BarStore.coverage()` result, or None if nothing is stored.
+        start: Earliest bar wanted (None for the full history).
+        end: Latest bar wanted (usually now).
+        min_gap: Skip the newer range when the covered range ends less than this before `end`.
+
+    Returns:
+        list: (start, end) pairs to download; a start of None means "from the first available bar".
+    """
+    if coverage is None:
+        return [(start, end)]
+    covered_start, covered_end = coverage
+
+    ranges = []
+    if covered_start is not None and (start is None or start < covered_start):
+        ranges.append((start, covered_start))
+    if end - covered_end > min_gap:
+        ranges.append((covered_end.normalize(), end))
+    return ranges
+
+
+class RateLimiter:
+    """
+    Token bucket shared by the download workers.
+
+    Allows `rate` requests per second on average, with bursts of up to
+    `burst` back-to-back requests. A rate of None or 0 disables limiting.
+    """
+    def __init__(self, rate: float = None, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class YFinanceProvider:
+    """Bars from Yahoo Finance. yfinance is imported on first use."""
+
+    def download(self, ticker: str, interval: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Downloads bars in [start, end).
+
+        Args:
+            ticker: The stock symbol.
+            interval: Data granularity (e.g. '5m').
+            start: First bar wanted, or None for the full available history.
+            end: End of the range (exclusive).
+
+        Returns:
+            pd.DataFrame: Raw OHLCV bars (may be empty).
+        """
+        import yfinance as yf
+
+        # Ticker.history keeps its state per object, so concurrent downloads don't share buffers
+        window = {'start': start, 'end': end} if start is not None else {'period': 'max'}
+        df = yf.Ticker(ticker).history(interval=interval, actions=False, **window)
+
+        # Handle MultiIndex columns (yfinance structure: Price, Ticker)
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        return df
+
+
+class StubProvider:
+    """
+    Offline provider for tests and benchmarks: serves slices of in-memory frames.
+
+    Tickers without a frame get deterministic synthetic bars (seeded by the
+    ticker) from `start` up to the time of the request. Every request is
+    recorded in `calls` as (ticker, interval, start, end).
+
+    Args:
+        frames: Optional {ticker: DataFrame} of bars to serve.
+        start: First session of the synthetic history.
+        latency: Seconds each request sleeps, to emulate network round trips.
+    """
+    def __init__(self, frames: dict = None, start: str = "2020-01-02", latency: float = 0.0):
+        self.frames = dict(frames or {})
+        self.start = start
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def download(self, ticker: str, interval: str, start=None, end=None) -> pd.DataFrame:
+        with self._lock:
+            self.calls.append((ticker, interval, start, end))
+            df = self.frames.get(ticker)
+        if df is None:
+            df = self._synthetic(ticker, interval)
+            with self._lock:
+                df = self.frames.setdefault(ticker, df)
+        if self.latency:
+            time.sleep(self.latency)
+
+        lo = df.index.searchsorted(_as_index_tz(start, df.index), side='left') if start is not None else 0
+        hi = df.index.searchsorted(_as_index_tz(end, df.index), side='left') if end is not None else len(df)
+        return df.iloc[lo:hi].copy()
+
+    def _synthetic(self, ticker: str, interval: str) -> pd.DataFrame:
+        now = pd.Timestamp.now(tz='America/New_York')
+        days = len(pd.bdate_range(self.start, now.tz_localize(None).normalize()))
+        per_day = max(1, SESSION_MINUTES // interval_minutes(interval))
+        df = synthetic_bars(days * per_day, interval=interval, seed=zlib.crc32(ticker.encode()), start=self.start)
+        return df[df.index <= now]
+
+
+def sync_ticker(store: BarStore, provider, ticker: str, interval: str = "5m", period: str = "1mo",
+                now: pd.Timestamp = None, limiter: RateLimiter = None, min_gap: pd.Timedelta = None,
+                retries: int = 2) -> dict:
+    """
+    Brings one ticker/interval in the store up to date for `period` ending `now`.
+
+    Downloads only the ranges reported by `missing_ranges`, merges them into
+    the store and extends its recorded coverage.
+
+    Args:
+        store: Target bar store.
+        provider: Object with `download(ticker, interval, start, end)`.
+        ticker: The stock symbol.
+        interval: Data granularity (default '5m').
+        period: Lookback period that should be covered (default '1mo').
+        now: End of the wanted range (default: current time).
+        limiter: Optional RateLimiter shared across workers.
+        min_gap: Skip fetching newer bars if the store is fresher than this (default: one bar).
+        retries: Extra attempts per request after a failure.
+
+    Returns:
+        dict: Ticker, Requests, Rows (bars downloaded) and Status ('updated',
+              'up to date' or 'no data').
+
+    Raises:
+        Exception: The provider's last error once retries are exhausted.
+    """
+    now = now if now is not None else pd.Timestamp.now(tz='UTC')
+    if min_gap is None:
+        min_gap = pd.Timedelta(minutes=interval_minutes(interval))
+    coverage = store.coverage(ticker, interval)
+    ranges = missing_ranges(coverage, period_start(now, period), now, min_gap)
+
+    result = {'Ticker': ticker, 'Requests': 0, 'Rows': 0, 'Status': 'up to date'}
+    for start, end in ranges:
+        df = _download(provider, ticker, interval, start, end, limiter, retries)
+        result['Requests'] += 1
+        if df.empty and coverage is None:
+            # Nothing stored and nothing returned (unknown symbol): don't record coverage
+            result['Status'] = 'no data'
+            continue
+        result['Rows'] += len(df)
+        store.append(ticker, interval, df)
+        store.mark_covered(ticker, interval, start, end)
+        result['Status'] = 'updated'
+    return result
+
+
+def _download(provider, ticker, interval, start, end, limiter, retries) -> pd.DataFrame:
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return provider.download(ticker, interval, start, end)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+
+
+class DataSync:
+    """
+    Bulk, incremental downloader for a universe of tickers.
+
+    Tickers are synced concurrently on a bounded thread pool (downloads are
+    I/O bound), with a shared token-bucket rate limit on provider requests.
+    Each ticker only requests the bars missing from the local store, so a
+    nightly refresh downloads one day per symbol instead of the whole period.
+    """
+    def __init__(self, provider=None, data_dir: str = "data", max_workers: int = 8,
+                 rate_limit: float = 2.0, burst: int = 4, retries: int = 2):
+        """
+        Args:
+            provider: Bar provider (default: YFinanceProvider).
+            data_dir: Directory holding the bar store (under data_dir/bars).
+            max_workers: Concurrent downloads.
+            rate_limit: Provider requests per second across all workers (None or 0 for no limit).
+            burst: Requests allowed back-to-back before the rate limit applies.
+            retries: Extra attempts per request after a failure.
+        """
+        self.provider = provider if provider is not None else YFinanceProvider()
+        self.store = BarStore(os.path.join(data_dir, "bars"))
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate_limit, burst)
+        self.retries = retries
+
+    def sync(self, tickers, interval: str = "5m", period: str = "1mo", verbose: bool = True) -> pd.DataFrame:
+        """
+        Syncs every ticker for `period` ending now.
+
+        Returns:
+            pd.DataFrame: One row per ticker (Ticker, Requests, Rows, Status, Error, Seconds).
+        """
+        now = pd.Timestamp.now(tz='UTC')
+        started = time.perf_counter()
+        rows = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._sync_one, t, interval, period, now): t for t in tickers}
+            for future in as_completed(futures):
+                row = future.result()
+                rows.append(row)
+                if verbose:
+                    detail = row['Error'] or f"{row['Rows']:,} bars, {row['Requests']} requests"
+                    print(f"[{len(rows)}/{len(futures)}] {row['Ticker']}: {row['Status']} ({detail})")
+
+        summary = pd.DataFrame(rows, columns=['Ticker', 'Requests', 'Rows', 'Status', 'Error', 'Seconds'])
+        if verbose:
+            elapsed = time.perf_counter() - started
+            print(f"Synced {len(summary)} tickers in {elapsed:.1f}s: "
+                  f"{summary['Rows'].sum():,} bars over {summary['Requests'].sum()} requests, "
+                  f"{(summary['Status'] == 'error').sum()} errors")
+        return summary
+
+    def _sync_one(self, ticker, interval, period, now) -> dict:
+        started = time.perf_counter()
+        try:
+            row = sync_ticker(self.store, self.provider, ticker, interval, period, now,
+                              self.limiter, retries=self.retries)
+            row['Error'] = None
+        except Exception as e:
+            row = {'Ticker': ticker, 'Requests': 0, 'Rows': 0, 'Status': 'error', 'Error': str(e)}
+        row['Seconds'] = time.perf_counter() - started
+        return row
+
+
+def _as_index_tz(ts, index: pd.DatetimeIndex) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    if index.tz is not None:
+        return ts.tz_localize(index.tz) if ts.tz is None else ts.tz_convert(index.tz)
+    return ts.tz_convert(None) if ts.tz is not None else ts
+
+
+if __name__ == "__main__":
+    from src.engine.universe import load_universe
+
+    parser = argparse.ArgumentParser(description="Trinity Data Sync: incremental bulk download into the bar store")
+    parser.add_argument("--tickers", type=str, required=True, help="Comma-separated tickers or a file with one per line")
+    parser.add_argument("--interval", type=str, default="5m", help="Data Interval (default: 5m)")
+    parser.add_argument("--period", type=str, default="1mo", help="Period that should be covered (default: 1mo)")
+    parser.add_argument("--jobs", type=int, default=8, help="Concurrent downloads (default: 8)")
+    parser.add_argument("--rate", type=float, default=2.0, help="Provider requests per second, 0 for no limit (default: 2)")
+    parser.add_argument("--data-dir", type=str, default="data", help="Data directory (default: data)")
+    parser.add_argument("--stub", action="store_true", help="Use the offline synthetic provider instead of yfinance")
+    args = parser.parse_args()
+
+    provider = StubProvider() if args.stub else YFinanceProvider()
+    syncer = DataSync(provider, data_dir=args.data_dir, max_workers=args.jobs, rate_limit=args.rate)
+    summary = syncer.sync(load_universe(args.tickers), interval=args.interval, period=args.period)
+    print(summary.to_string(index=False))
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from src.data.sessions import SESSION_MINUTES, SESSION_OPEN, interval_minutes
+
+
+def synthetic_bars(n_bars: int, interval: str = "5m", seed: int = 0, start: str = "2000-01-03",
+                   price: float = 100.0, annual_vol: float = 0.3, tz: str = "America/New_York") -> pd.DataFrame:
+    """
+    Generates deterministic OHLCV bars shaped like `fetch_data` output.
+
+    Closes follow a geometric random walk; bars fall on weekday sessions
+    (09:30-16:00 for intraday intervals, one bar per day for '1d'), so the
+    end-of-day logic of the backtester behaves as it does on real data.
+
+    The index is in nanoseconds when it fits (up to 2262) and in seconds
+    beyond that, e.g. 10M 5m bars from 2000 run into the 26th century. The
+    last session must fall before the year 10000, the limit of timezone and
+    calendar-date handling, which caps '1d' bars from 2000 at about 2M.
+
+    Args:
+        n_bars: Number of bars.
+        interval: Bar interval (default '5m').
+        seed: Random seed. The same arguments always produce the same frame.
+        start: First session date.
+        price: Starting price.
+        annual_vol: Annualized volatility of the closes.
+        tz: Timezone of the index (None for naive timestamps).
+
+    Returns:
+        pd.DataFrame: Open/High/Low/Close (float64) and Volume (int64) on a DatetimeIndex.
+
+    Raises:
+        ValueError: If the bars would run past the year 9999.
+    """
+    rng = np.random.default_rng(seed)
+    minutes = interval_minutes(interval)
+    daily = minutes >= SESSION_MINUTES
+    per_day = 1 if daily else SESSION_MINUTES // minutes
+
+    # Timestamps: session dates x intraday offsets, built on int64 seconds
+    n_days = -(-n_bars // per_day)
+    days = _weekdays(start, n_days)
+    if n_days and days[-1] > np.datetime64('9999-12-31'):
+        raise ValueError(f"{n_bars:,} {interval} bars from {start} run past the year 9999")
+    offsets = np.arange(per_day, dtype=np.int64) * (minutes * 60)
+    if not daily:
+        offsets += int(SESSION_OPEN.total_seconds())
+    stamps = (days.astype('datetime64[s]').view(np.int64)[:, None] + offsets[None, :]).ravel()[:n_bars]
+    index = pd.DatetimeIndex(stamps.view('datetime64[s]'))
+    if n_days == 0 or days[-1] < np.datetime64(pd.Timestamp.max.date(), 'D'):
+        index = index.as_unit('ns')
+    if tz is not None:
+        index = index.tz_localize(tz)
+
+    # Prices: log-normal closes, opens gapping slightly from the previous close
+    sigma = annual_vol / np.sqrt(252 * per_day)
+    close = price * np.exp(np.cumsum(rng.normal(0.0, sigma, n_bars)))
+    open_ = np.empty(n_bars)
+    open_[0] = price
+    open_[1:] = close[:-1]
+    open_ *= np.exp(rng.normal(0.0, sigma / 4, n_bars))
+    wick = np.abs(rng.normal(0.0, sigma / 2, (2, n_bars)))
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+    volume = rng.lognormal(10.0, 1.0, n_bars).astype(np.int64) + 1
+
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
+
+
+def _weekdays(start: str, n_days: int) -> np.ndarray:
+    """The first `n_days` weekdays on or after `start`, as datetime64[D] (like `pd.bdate_range`)."""
+    first = np.busday_offset(np.datetime64(pd.Timestamp(start).date(), 'D'), 0, roll='forward')
+    monday = first - (first.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    k = np.arange(n_days, dtype=np.int64) + (first - monday).astype(np.int64)
+    return monday + (k // 5) * 7 + k % 5
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Synthetic OHLCV bars")
+    parser.add_argument("--check-range", action="store_true",
+                        help="Generate 10M bars at every intraday interval (2M daily) and check the index")
+    args = parser.parse_args()
+
+    if not args.check_range:
+        df = synthetic_bars(1000)
+        print(df.head())
+        print(df.tail())
+        print(f"Total Rows: {len(df)}")
+    else:
+        for interval, n_bars in [('1m', 10_000_000), ('5m', 10_000_000), ('15m', 10_000_000),
+                                 ('30m', 10_000_000), ('1h', 10_000_000), ('1d', 2_000_000)]:
+            index = synthetic_bars(n_bars, interval=interval).index
+            ok = len(index) == n_bars and index.is_monotonic_increasing and index.is_unique
+            print(f"{interval:>3}: {n_bars:>10,} bars to {index[-1]} ({index.dtype}) {'OK' if ok else 'FAILED'}")
@@ -1,16 +1,37 @@
 import pandas as pd
-from datetime import time
+from src.engine.kernels import Reason, eod_mask, simulate_trades
+from src.engine.tradelog import Position, TradeLog
+from src.utils.profiling import profiled
+
+# Execution engines:
+#   'loop'  - reference implementation, walks the DataFrame bar by bar.
+#   'array' - same state machine over NumPy arrays (numba-compiled if available).
+ENGINES = ('loop', 'array')
 
 class Backtester:
-    def __init__(self, atr_multiplier_sl=2.0, atr_multiplier_tp=3.0):
+    def __init__(self, atr_multiplier_sl=2.0, atr_multiplier_tp=3.0, engine="loop"):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Expected one of {ENGINES}")
         self.atr_multiplier_sl = atr_multiplier_sl
         self.atr_multiplier_tp = atr_multiplier_tp
-        self.trades = []
+        self.engine = engine
+        self.log = TradeLog()
+        self.index = None
+        
+    @property
+    def trades(self) -> list:
+        """Trade log rows of the last run, as dicts (materialized on access)."""
+        if self.index is None:
+            return []
+        return self.log.to_frame(self.index).to_dict('records')
         
+    @profiled("Backtester.run", rows_arg=1)
     def run(self, df: pd.DataFrame, verbose: bool = False) -> pd.DataFrame:
         """
         Runs the backtest simulation.
         
+        Both engines produce the same trade log; 'array' is much faster on long histories.
+        
         Args:
             df: DataFrame with 'Signal' and OHLCV data.
             verbose: If True, prints trade details to console.
@@ -18,8 +39,24 @@ class Backtester:
         Returns:
             pd.DataFrame: Trade log.
         """
-        self.trades = []
-        position = None # {'entry_time': ..., 'entry_price': ..., 'tp': ..., 'sl': ...}
+        return self.simulate(df, verbose).to_frame(df.index)
+
+    def simulate(self, df: pd.DataFrame, verbose: bool = False) -> TradeLog:
+        """
+        Runs the backtest and returns the raw `TradeLog` (bar positions, prices,
+        reason codes, PnL) without building the DataFrame. Used by sweeps that
+        only need metrics.
+        """
+        self.index = df.index
+        if self.engine == 'array':
+            self.log = self._run_array(df, verbose)
+        else:
+            self.log = self._run_loop(df, verbose)
+        return self.log
+
+    def _run_loop(self, df: pd.DataFrame, verbose: bool = False) -> TradeLog:
+        log = TradeLog()
+        position = None
         
         # We iterate until len(df) - 1 because we need i+1 for entry
         for i in range(len(df) - 1):
@@ -34,26 +71,27 @@ class Backtester:
                 # Let's adjust logic. 
                 # If we are in position, we monitor price.
                 
+                # Plain floats: float32 scalars would pull the SL/TP comparisons down to float32
                 row = df.iloc[i]
-                high = row['High']
-                low = row['Low']
-                close = row['Close']
+                high = float(row['High'])
+                low = float(row['Low'])
+                close = float(row['Close'])
                 timestamp = df.index[i]
                 
                 exit_reason = None
                 exit_price = None
                 
                 # Check SL first (Conservative)
-                if low <= position['sl']:
-                    exit_reason = 'Stop Loss'
-                    exit_price = position['sl'] # Assuming fill at SL
+                if low <= position.sl:
+                    exit_reason = Reason.STOP_LOSS
+                    exit_price = position.sl # Assuming fill at SL
                     # Realistically, it might gap, but for MVP we use SL level.
                     # Or use Close if Open < SL? Let's stick to SL level.
                 
                 # Check TP
-                elif high >= position['tp']:
-                    exit_reason = 'Take Profit'
-                    exit_price = position['tp']
+                elif high >= position.tp:
+                    exit_reason = Reason.TAKE_PROFIT
+                    exit_price = position.tp
                     
                 # Check EOD (Time Stop)
                 # We close if the current bar is the last bar of the trading day.
@@ -71,13 +109,13 @@ class Backtester:
                     is_eod = True # Last bar of dataset
                     
                 if is_eod:
-                    exit_reason = 'EOD'
+                    exit_reason = Reason.EOD
                     exit_price = close
                 
-                if exit_reason:
+                if exit_reason is not None:
                     if verbose:
-                        print(f"[EXIT] {timestamp} @ {exit_price:.2f} ({exit_reason}) | PnL: {(exit_price - position['entry_price'])/position['entry_price']*100:.2f}%")
-                    self._close_trade(position, timestamp, exit_price, exit_reason)
+                        print(f"[EXIT] {timestamp} @ {exit_price:.2f} ({exit_reason.label}) | PnL: {(exit_price - position.entry_price)/position.entry_price*100:.2f}%")
+                    log.append(position.entry_idx, i, position.entry_price, exit_price, exit_reason)
                     position = None
                     continue # Trade closed, move to next bar (we can't re-enter same bar)
             
@@ -90,9 +128,9 @@ class Backtester:
                 
                 if df['Signal'].iloc[i] == 1:
                     # Execute entry at Next Open
-                    next_open = df['Open'].iloc[i+1]
+                    next_open = float(df['Open'].iloc[i+1])
                     next_time = df.index[i+1]
-                    atr_val = df['ATR'].iloc[i]  # Use ATR from signal generation time (current bar i)
+                    atr_val = float(df['ATR'].iloc[i])  # Use ATR from signal generation time (current bar i)
                     
                     # Define Position with ATR-based SL/TP
                     # Long only for now
@@ -109,41 +147,65 @@ class Backtester:
                     if verbose:
                         print(f"[ENTRY] {next_time} ({sig_type}) @ {next_open:.2f} | SL: {sl_price:.2f} | TP: {tp_price:.2f} | ATR: {atr_val:.4f}")
                     
-                    position = {
-                        'entry_time': next_time,
-                        'entry_price': next_open,
-                        'tp': tp_price,
-                        'sl': sl_price,
-                        'signal_index': i # For debug
-                    }
+                    position = Position(i + 1, next_time, next_open, sl_price, tp_price)
                     
                     # Note: We don't verify exit for 'i+1' here. 
                     # The loop will increment to 'i+1', and the "Check Exit" block will run for that bar.
                     # This correctly models entering at Open of i+1 and then checking High/Low of i+1 for exit.
         
-        return pd.DataFrame(self.trades)
+        return log
+
+    def _run_array(self, df: pd.DataFrame, verbose: bool = False) -> TradeLog:
+        if len(df) < 2:
+            return TradeLog()
+
+        # Pull everything the state machine needs into contiguous arrays once
+        open_ = df['Open'].to_numpy(dtype='float64')
+        atr = df['ATR'].to_numpy(dtype='float64')
+        entry_idx, exit_idx, exit_price, reason = simulate_trades(
+            open_,
+            df['High'].to_numpy(dtype='float64'),
+            df['Low'].to_numpy(dtype='float64'),
+            df['Close'].to_numpy(dtype='float64'),
+            atr,
+            df['Signal'].to_numpy(),
+            eod_mask(df.index),
+            self.atr_multiplier_sl,
+            self.atr_multiplier_tp
+        )
+        log = TradeLog.from_arrays(entry_idx, exit_idx, open_[entry_idx], exit_price, reason)
+        if verbose and len(log):
+            self._print_trades(df, log.to_frame(df.index), entry_idx, atr)
+        return log
+
+    def _print_trades(self, df, trades, entry_idx, atr):
+        """Replays the [ENTRY]/[EXIT] console lines of the loop engine from a finished trade log."""
+        has_mr = 'Signal_MeanRev' in df.columns
+        has_bo = 'Signal_Breakout' in df.columns
+        for k, trade in enumerate(trades.itertuples(index=False)):
+            i = entry_idx[k] - 1
+            atr_val = atr[i]
+            next_open = trade[1]
+            sl_price = next_open - (self.atr_multiplier_sl * atr_val)
+            tp_price = next_open + (self.atr_multiplier_tp * atr_val)
+
+            sig_type = "Unknown"
+            if has_mr and df['Signal_MeanRev'].iloc[i] == 1:
+                sig_type = "Mean Reversion"
+            elif has_bo and df['Signal_Breakout'].iloc[i] == 1:
+                sig_type = "Breakout"
 
-    def _close_trade(self, position, exit_time, exit_price, reason):
-        pnl = (exit_price - position['entry_price']) / position['entry_price']
-        trade = {
-            'Entry Time': position['entry_time'],
-            'Entry Price': position['entry_price'],
-            'Exit Time': exit_time,
-            'Exit Price': exit_price,
-            'Reason': reason,
-            'PnL': pnl,
-            'Return %': pnl * 100
-        }
-        self.trades.append(trade)
+            print(f"[ENTRY] {trade[0]} ({sig_type}) @ {next_open:.2f} | SL: {sl_price:.2f} | TP: {tp_price:.2f} | ATR: {atr_val:.4f}")
+            print(f"[EXIT] {trade[2]} @ {trade[3]:.2f} ({trade[4]}) | PnL: {trade[5]*100:.2f}%")
 
 if __name__ == "__main__":
     from src.data.loader import fetch_data
-    from src.analysis.indicators import add_indicators
+    from src.analysis.cache import cached_indicators
     from src.analysis.signals import generate_signals
     
     # Setup Data
     df = fetch_data("NVDA")
-    df = add_indicators(df)
+    df = cached_indicators(df)
     
     # Use median bandwidth for test signals
     median_bw = df['Bandwidth'].median()
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+from src.engine.kernels import eod_mask, simulate_batch
+from src.engine.metrics import compute_metrics
+from src.engine.tradelog import TradeLog
+from src.utils.profiling import profiled
+
+class BatchBacktester:
+    """
+    Backtests one signal set against many (SL, TP) ATR multiplier pairs in a single pass.
+
+    Produces the same trades as running `Backtester(engine='array')` once per pair,
+    but the bars are walked once for the whole batch.
+    """
+    def __init__(self, atr_multipliers_sl, atr_multipliers_tp):
+        self.atr_multipliers_sl = np.asarray(atr_multipliers_sl, dtype=np.float64)
+        self.atr_multipliers_tp = np.asarray(atr_multipliers_tp, dtype=np.float64)
+        if self.atr_multipliers_sl.shape != self.atr_multipliers_tp.shape:
+            raise ValueError("SL and TP multiplier vectors must have the same length")
+        self.index = None
+        self.close = None
+        self.entry_price = None
+        self.raw = None
+
+    @profiled("BatchBacktester.run", rows_arg=1)
+    def run(self, df: pd.DataFrame, signal=None) -> pd.DataFrame:
+        """
+        Runs the batched simulation.
+
+        Args:
+            df: DataFrame with 'Signal', 'ATR' and OHLC data.
+            signal: Optional entry signal array used instead of df['Signal'],
+                    so one indicator frame can be reused for many signal sets.
+
+        Returns:
+            pd.DataFrame: One metrics row per parameter set
+                          (ATR_SL, ATR_TP, Trades, Win_Rate, Total_PnL, Avg_PnL).
+        """
+        open_ = df['Open'].to_numpy(dtype='float64')
+        self.index = df.index
+        self.close = df['Close'].to_numpy(dtype='float64')
+
+        if len(df) < 2:
+            empty = np.empty(0, dtype=np.int64)
+            self.raw = (empty, empty, empty, np.empty(0), np.empty(0, dtype=np.int8))
+        else:
+            self.raw = simulate_batch(
+                open_,
+                df['High'].to_numpy(dtype='float64'),
+                df['Low'].to_numpy(dtype='float64'),
+                self.close,
+                df['ATR'].to_numpy(dtype='float64'),
+                df['Signal'].to_numpy() if signal is None else signal,
+                eod_mask(df.index),
+                self.atr_multipliers_sl,
+                self.atr_multipliers_tp
+            )
+
+        param_idx, entry_idx, _, exit_price, _ = self.raw
+        self.entry_price = open_[entry_idx]
+        pnl = (exit_price - self.entry_price) / self.entry_price
+
+        # Per-parameter-set aggregates in one pass each
+        p = len(self.atr_multipliers_sl)
+        trade_count = np.bincount(param_idx, minlength=p)
+        wins = np.bincount(param_idx, weights=(pnl > 0), minlength=p)
+        total_pnl = np.bincount(param_idx, weights=pnl, minlength=p)
+        has_trades = trade_count > 0
+        denom = np.where(has_trades, trade_count, 1)
+
+        return pd.DataFrame({
+            'ATR_SL': self.atr_multipliers_sl,
+            'ATR_TP': self.atr_multipliers_tp,
+            'Trades': trade_count,
+            'Win_Rate': np.where(has_trades, wins / denom, 0.0),
+            'Total_PnL': np.where(has_trades, total_pnl, 0.0),
+            'Avg_PnL': np.where(has_trades, total_pnl / denom, 0.0)
+        })
+
+    def metrics(self, periods_per_year: float = None) -> pd.DataFrame:
+        """
+        Full trade and equity metrics (`src/engine/metrics.py`) of every parameter
+        set from the last run, computed in one vectorized pass over all trades.
+
+        Returns:
+            pd.DataFrame: ATR_SL, ATR_TP and the METRICS columns, one row per parameter set.
+        """
+        if self.raw is None:
+            raise RuntimeError("Call run() before requesting metrics.")
+        param_idx, entry_idx, exit_idx, exit_price, _ = self.raw
+        result = compute_metrics(self.close, entry_idx, exit_idx, self.entry_price, exit_price,
+                                 group=param_idx, n_groups=len(self.atr_multipliers_sl),
+                                 periods_per_year=periods_per_year)
+        result.insert(0, 'ATR_TP', self.atr_multipliers_tp)
+        result.insert(0, 'ATR_SL', self.atr_multipliers_sl)
+        return result
+
+    def trade_log(self, k: int) -> pd.DataFrame:
+        """
+        Returns the trade log of parameter set `k` from the last run,
+        in the same format as `Backtester.run`.
+        """
+        if self.raw is None:
+            raise RuntimeError("Call run() before requesting trade logs.")
+        param_idx, entry_idx, exit_idx, exit_price, reason = self.raw
+        mask = param_idx == k
+        log = TradeLog.from_arrays(entry_idx[mask], exit_idx[mask], self.entry_price[mask],
+                                   exit_price[mask], reason[mask])
+        return log.to_frame(self.index)
+
+    def trade_logs(self) -> list:
+        """Returns one trade log DataFrame per parameter set from the last run."""
+        return [self.trade_log(k) for k in range(len(self.atr_multipliers_sl))]
@@ -0,0 +1,267 @@
+from enum import IntEnum
+import numpy as np
+import pandas as pd
+from src.utils.jit import HAS_NUMBA, jit, kernel_input
+
+class Reason(IntEnum):
+    """Exit reason codes stored in trade logs. `label` is the text shown in the trade log DataFrame."""
+    STOP_LOSS = 0
+    TAKE_PROFIT = 1
+    EOD = 2
+
+    @property
+    def label(self) -> str:
+        return REASONS[self]
+
+
+# Plain ints for the array kernels, and the labels indexed by code
+REASON_SL = int(Reason.STOP_LOSS)
+REASON_TP = int(Reason.TAKE_PROFIT)
+REASON_EOD = int(Reason.EOD)
+REASONS = ('Stop Loss', 'Take Profit', 'EOD')
+
+
+def eod_mask(index) -> np.ndarray:
+    """
+    Marks the last bar of each trading day.
+
+    eod[i] is True when bar i+1 falls on a later calendar date than bar i,
+    matching the `df.index[i+1].date() > df.index[i].date()` check of the loop engine.
+    The last bar of the dataset is never marked (the loop never reaches it).
+    """
+    dates = pd.DatetimeIndex(index).normalize().asi8
+    eod = np.zeros(len(dates), dtype=np.bool_)
+    if len(dates) > 1:
+        eod[:-1] = dates[1:] > dates[:-1]
+    return eod
+
+
+@jit
+def _simulate(open_, high, low, close, atr, signal, eod, sl_mult, tp_mult,
+              entry_idx, exit_idx, exit_price, reason):
+    # Same state machine as Backtester._run_loop, one position at a time:
+    #   - exit checks on bar i (SL before TP, EOD overrides both at the close)
+    #   - a bar that closed a trade cannot open one
+    #   - Signal at i enters at Open of i+1 with SL/TP from ATR at i
+    n = len(open_)
+    count = 0
+    in_pos = False
+    entry_at = 0
+    sl = 0.0
+    tp = 0.0
+
+    for i in range(n - 1):
+        if in_pos:
+            code = -1
+            px = 0.0
+            if low[i] <= sl:
+                code = 0
+                px = sl
+            elif high[i] >= tp:
+                code = 1
+                px = tp
+            if eod[i]:
+                code = 2
+                px = close[i]
+
+            if code >= 0:
+                entry_idx[count] = entry_at
+                exit_idx[count] = i
+                exit_price[count] = px
+                reason[count] = code
+                count += 1
+                in_pos = False
+        elif signal[i] == 1:
+            entry_at = i + 1
+            next_open = open_[i + 1]
+            sl = next_open - (sl_mult * atr[i])
+            tp = next_open + (tp_mult * atr[i])
+            in_pos = True
+
+    return count
+
+
+def simulate_trades(open_, high, low, close, atr, signal, eod, sl_mult, tp_mult):
+    """
+    Runs the entry/SL/TP/EOD state machine over raw arrays.
+
+    Args:
+        open_, high, low, close, atr: Price and ATR arrays of equal length.
+        signal: Entry signal array (1 = Buy).
+        eod: End-of-day mask from `eod_mask`.
+        sl_mult: ATR Stop Loss multiplier.
+        tp_mult: ATR Take Profit multiplier.
+
+    Returns:
+        tuple: (entry_idx, exit_idx, exit_price, reason) arrays, one row per closed trade.
+               Entry price is open_[entry_idx]; the signal bar is entry_idx - 1.
+    """
+    n = len(open_)
+    # Every trade needs a signal bar and at least one more bar before the next signal
+    max_trades = n // 2 + 1
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    exit_price = np.empty(max_trades, dtype=np.float64)
+    reason = np.empty(max_trades, dtype=np.int8)
+
+    count = _simulate(
+        kernel_input(open_), kernel_input(high), kernel_input(low),
+        kernel_input(close), kernel_input(atr),
+        kernel_input(signal, dtype=np.int64), kernel_input(eod, dtype=np.bool_),
+        float(sl_mult), float(tp_mult),
+        entry_idx, exit_idx, exit_price, reason
+    )
+    return entry_idx[:count], exit_idx[:count], exit_price[:count], reason[:count]
+
+
+@jit
+def _simulate_batch(open_, high, low, close, atr, signal, eod, sl_mults, tp_mults,
+                    param_idx, entry_idx, exit_idx, exit_price, reason):
+    # 2-D version of _simulate: one position slot per parameter set, all advanced
+    # together bar by bar. Trades are written to flat arrays tagged with param_idx.
+    n = len(open_)
+    p = len(sl_mults)
+    in_pos = np.zeros(p, dtype=np.bool_)
+    entry_at = np.zeros(p, dtype=np.int64)
+    sl = np.zeros(p, dtype=np.float64)
+    tp = np.zeros(p, dtype=np.float64)
+    count = 0
+    n_open = 0
+
+    for i in range(n - 1):
+        enter = signal[i] == 1
+        if n_open == 0 and not enter:
+            continue
+        for k in range(p):
+            if in_pos[k]:
+                code = -1
+                px = 0.0
+                if low[i] <= sl[k]:
+                    code = 0
+                    px = sl[k]
+                elif high[i] >= tp[k]:
+                    code = 1
+                    px = tp[k]
+                if eod[i]:
+                    code = 2
+                    px = close[i]
+
+                if code >= 0:
+                    param_idx[count] = k
+                    entry_idx[count] = entry_at[k]
+                    exit_idx[count] = i
+                    exit_price[count] = px
+                    reason[count] = code
+                    count += 1
+                    in_pos[k] = False
+                    n_open -= 1
+            elif enter:
+                entry_at[k] = i + 1
+                next_open = open_[i + 1]
+                sl[k] = next_open - (sl_mults[k] * atr[i])
+                tp[k] = next_open + (tp_mults[k] * atr[i])
+                in_pos[k] = True
+                n_open += 1
+
+    return count
+
+
+def _simulate_batch_numpy(open_, high, low, close, atr, signal, eod, sl_mults, tp_mults,
+                          param_idx, entry_idx, exit_idx, exit_price, reason):
+    # Without numba, vectorize across parameter sets instead: each bar is a few
+    # array operations over the (param_sets,) state vectors.
+    n = len(open_)
+    p = len(sl_mults)
+    in_pos = np.zeros(p, dtype=np.bool_)
+    entry_at = np.zeros(p, dtype=np.int64)
+    sl = np.zeros(p, dtype=np.float64)
+    tp = np.zeros(p, dtype=np.float64)
+    code = np.empty(p, dtype=np.int8)
+    px = np.empty(p, dtype=np.float64)
+    count = 0
+    n_open = 0
+
+    # Only bars with a signal or an open position can change state
+    signal = np.asarray(signal) == 1
+    for i in range(n - 1):
+        enter = signal[i]
+        if n_open == 0 and not enter:
+            continue
+
+        was_open = in_pos.copy()
+        if n_open:
+            code.fill(-1)
+            hit_tp = was_open & (high[i] >= tp)
+            code[hit_tp] = 1
+            px[hit_tp] = tp[hit_tp]
+            hit_sl = was_open & (low[i] <= sl)
+            code[hit_sl] = 0
+            px[hit_sl] = sl[hit_sl]
+            if eod[i]:
+                code[was_open] = 2
+                px[was_open] = close[i]
+
+            closed = np.flatnonzero(code >= 0)
+            m = len(closed)
+            if m:
+                param_idx[count:count + m] = closed
+                entry_idx[count:count + m] = entry_at[closed]
+                exit_idx[count:count + m] = i
+                exit_price[count:count + m] = px[closed]
+                reason[count:count + m] = code[closed]
+                count += m
+                in_pos[closed] = False
+                n_open -= m
+
+        if enter:
+            new = ~was_open
+            next_open = open_[i + 1]
+            entry_at[new] = i + 1
+            sl[new] = next_open - (sl_mults[new] * atr[i])
+            tp[new] = next_open + (tp_mults[new] * atr[i])
+            in_pos[new] = True
+            n_open += int(new.sum())
+
+    return count
+
+
+def simulate_batch(open_, high, low, close, atr, signal, eod, sl_mults, tp_mults):
+    """
+    Runs the state machine for many (SL, TP) multiplier pairs over one signal array.
+
+    Equivalent to calling `simulate_trades` once per pair, but all parameter sets
+    advance through the bars together, so the bars are walked only once.
+
+    Args:
+        open_, high, low, close, atr, signal, eod: As for `simulate_trades`.
+        sl_mults: Array of ATR Stop Loss multipliers, one per parameter set.
+        tp_mults: Array of ATR Take Profit multipliers, same length as sl_mults.
+
+    Returns:
+        tuple: (param_idx, entry_idx, exit_idx, exit_price, reason) flat arrays,
+               one row per closed trade, ordered by exit bar.
+    """
+    sl_mults = np.ascontiguousarray(sl_mults, dtype=np.float64)
+    tp_mults = np.ascontiguousarray(tp_mults, dtype=np.float64)
+    if sl_mults.shape != tp_mults.shape or sl_mults.ndim != 1:
+        raise ValueError("sl_mults and tp_mults must be 1-D arrays of equal length")
+
+    n = len(open_)
+    p = len(sl_mults)
+    signal = np.ascontiguousarray(signal, dtype=np.int64)
+    # Each trade consumes a signal bar, so no parameter set can trade more often than that
+    max_trades = p * min(int((signal == 1).sum()), n // 2 + 1)
+    param_idx = np.empty(max_trades, dtype=np.int64)
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    exit_price = np.empty(max_trades, dtype=np.float64)
+    reason = np.empty(max_trades, dtype=np.int8)
+    out = (param_idx, entry_idx, exit_idx, exit_price, reason)
+
+    arrays = [np.ascontiguousarray(a, dtype=np.float64) for a in (open_, high, low, close, atr)]
+    eod = np.ascontiguousarray(eod, dtype=np.bool_)
+    if HAS_NUMBA:
+        count = _simulate_batch(*arrays, signal, eod, sl_mults, tp_mults, *out)
+    else:
+        count = _simulate_batch_numpy(*arrays, signal, eod, sl_mults, tp_mults, *out)
+    return tuple(a[:count] for a in out)
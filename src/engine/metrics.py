@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+
+# Metrics returned by `compute_metrics`. Higher is better for every column
+# (Max_Drawdown is negative), so any of them can rank an optimizer sweep.
+TRADE_METRICS = ['Trades', 'Win_Rate', 'Total_PnL', 'Total_Return', 'Expectancy', 'Avg_Win', 'Avg_Loss', 'Profit_Factor']
+EQUITY_METRICS = ['Max_Drawdown', 'Max_DD_Bars', 'Sharpe', 'Sortino', 'Exposure']
+METRICS = TRADE_METRICS + EQUITY_METRICS
+
+# Risk-adjusted subset carried in optimizer result rows
+RANKING_METRICS = ['Total_Return', 'Max_Drawdown', 'Sharpe', 'Sortino', 'Profit_Factor']
+
+# Signal type of a trade, taken from the signal bar (Mean Reversion wins ties, as in the trade printout)
+SIGNAL_TYPES = ('Mean Reversion', 'Breakout', 'Unknown')
+
+# In-position bars expanded at once when computing equity metrics
+EQUITY_CHUNK = 1 << 22
+
+def periods_per_year(index) -> float:
+    """Bars per year for annualizing bar-return ratios: 252 sessions x the average bars per session."""
+    index = pd.DatetimeIndex(index)
+    if len(index) == 0:
+        return 252.0
+    # Local calendar day of each bar; the index is sorted, so sessions are runs of equal days
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    days = index.asi8 // (pd.Timedelta(days=1) // pd.Timedelta(1, unit=index.unit))
+    sessions = 1 + np.count_nonzero(days[1:] != days[:-1])
+    return 252.0 * len(index) / sessions
+
+
+def position_array(n: int, entry_idx, exit_idx) -> np.ndarray:
+    """Per-bar position (1 from the entry bar through the exit bar, else 0) of one trade log."""
+    steps = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(steps, np.asarray(entry_idx, dtype=np.int64), 1)
+    np.add.at(steps, np.asarray(exit_idx, dtype=np.int64) + 1, -1)
+    return np.cumsum(steps[:-1]).astype(np.uint8)
+
+
+def _bar_returns(close, entry_idx, exit_idx, entry_price, exit_price):
+    """
+    Expands trades into their in-position bars.
+
+    Bar returns mark the position to the close: the entry bar is measured from
+    the entry price, the exit bar to the exit price, so a trade's bar returns
+    compound to exactly exit_price / entry_price.
+
+    Returns:
+        tuple: (trade number, bar position, log return) of every in-position bar.
+    """
+    length = exit_idx - entry_idx + 1
+    trade = np.repeat(np.arange(len(entry_idx)), length)
+    first = np.cumsum(length) - length
+    bar = entry_idx[trade] + (np.arange(len(trade)) - first[trade])
+
+    mark = close[bar]
+    last = first + length - 1
+    mark[last] = exit_price
+    ref = np.empty_like(mark)
+    ref[1:] = close[bar[:-1]]
+    ref[first] = entry_price
+    return trade, bar, np.log(mark / ref)
+
+
+def _equity_metrics(close, entry_idx, exit_idx, entry_price, exit_price, group, n_groups, out, ann):
+    """Drawdown, duration and bar-return ratios for trades sorted by (group, entry), one group range at a time."""
+    n = len(close)
+    length = exit_idx - entry_idx + 1
+    bounds = np.searchsorted(group, np.arange(n_groups + 1))
+    bars_before = np.concatenate([[0], np.cumsum(length)])[bounds]
+
+    lo = 0
+    while lo < n_groups:
+        # Whole groups per chunk, at least one, so each group's path stays together
+        hi = max(lo + 1, int(np.searchsorted(bars_before, bars_before[lo] + EQUITY_CHUNK, side='right')) - 1)
+        hi = min(hi, n_groups)
+        t0, t1 = bounds[lo], bounds[hi]
+        lo_g, hi_g = lo, hi
+        lo = hi
+        if t0 == t1:
+            continue
+
+        trade, bar, log_ret = _bar_returns(close, entry_idx[t0:t1], exit_idx[t0:t1],
+                                           entry_price[t0:t1], exit_price[t0:t1])
+        g = group[t0:t1][trade] - lo_g
+        k = hi_g - lo_g
+        ret = np.expm1(log_ret)
+
+        # Bar-return moments over all n bars (flat bars contribute zero returns)
+        mean = np.bincount(g, weights=ret, minlength=k) / n
+        var = np.maximum(np.bincount(g, weights=ret * ret, minlength=k) / n - mean * mean, 0.0)
+        down = np.bincount(g, weights=np.minimum(ret, 0.0) ** 2, minlength=k) / n
+        std, down_std = np.sqrt(var), np.sqrt(down)
+        sl = slice(lo_g, hi_g)
+        out['Sharpe'][sl] = np.where(std > 0, mean / np.where(std > 0, std, 1.0) * ann, 0.0)
+        out['Sortino'][sl] = np.where(down_std > 0, mean / np.where(down_std > 0, down_std, 1.0) * ann, 0.0)
+        out['Exposure'][sl] = np.bincount(g, minlength=k) / n
+
+        # Compounded log-equity per group, starting at 0 (equity 1)
+        csum = np.cumsum(log_ret)
+        starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+        offset = np.concatenate([[0.0], csum])[starts]
+        counts = np.diff(np.r_[starts, len(g)])
+        equity = csum - np.repeat(offset, counts)
+
+        # Running peak per group: shift each group above the previous one so one accumulate suffices
+        span = 2.0 * np.abs(equity).max() + 1.0
+        shifted = equity + g * span
+        running = np.maximum.accumulate(shifted)
+        peak = np.maximum(running - g * span, 0.0)
+        drawdown = np.minimum(np.expm1(equity - peak), 0.0)
+        gids = g[starts]
+        out['Max_Drawdown'][lo_g + gids] = np.minimum.reduceat(drawdown, starts)
+
+        # Longest time under water: from the bar of the last peak to the bar of the next (or the last bar)
+        at_peak = (shifted >= running) & (equity >= 0.0)
+        first_bar = np.repeat(bar[starts] - 1, counts)
+        key = g * (n + 1)
+        last_peak = np.maximum.accumulate(np.where(at_peak, bar, first_bar) + key) - key
+        next_peak = np.minimum.accumulate((np.where(at_peak, bar, n - 1) + key)[::-1])[::-1] - key
+        duration = np.where(at_peak, 0, next_peak - last_peak)
+        out['Max_DD_Bars'][lo_g + gids] = np.maximum.reduceat(duration, starts)
+
+
+def compute_metrics(close, entry_idx, exit_idx, entry_price, exit_price, group=None, n_groups: int = None,
+                    periods_per_year: float = None) -> pd.DataFrame:
+    """
+    Trade and equity metrics of one or many trade logs in single vectorized passes.
+
+    Trade logs of a sweep are passed as one flat set of arrays tagged with
+    `group`, as `BatchBacktester` produces them, so ranking thousands of
+    parameter sets needs no per-set Python loop. Equity compounds each trade's
+    return (full position per trade); Sharpe and Sortino use per-bar returns
+    with the position marked to the close, and flat bars count as zero.
+
+    Args:
+        close: Close prices of the bars the trades were simulated on.
+        entry_idx, exit_idx: Entry and exit bar of each trade.
+        entry_price, exit_price: Fill prices of each trade.
+        group: Trade log number of each trade (default: a single log).
+        n_groups: Number of trade logs (default: max(group) + 1).
+        periods_per_year: Annualization factor for Sharpe/Sortino (see
+                          `periods_per_year()`); None leaves them per bar.
+
+    Returns:
+        pd.DataFrame: One row per trade log with the METRICS columns.
+                      Max_Drawdown is a negative fraction of peak equity,
+                      Max_DD_Bars the longest time under water in bars.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    entry_idx = np.asarray(entry_idx, dtype=np.int64)
+    exit_idx = np.asarray(exit_idx, dtype=np.int64)
+    entry_price = np.asarray(entry_price, dtype=np.float64)
+    exit_price = np.asarray(exit_price, dtype=np.float64)
+    group = np.zeros(len(entry_idx), dtype=np.int64) if group is None else np.asarray(group, dtype=np.int64)
+    if n_groups is None:
+        n_groups = int(group.max()) + 1 if len(group) else 1
+
+    order = np.lexsort((entry_idx, group))
+    group, entry_idx, exit_idx = group[order], entry_idx[order], exit_idx[order]
+    entry_price, exit_price = entry_price[order], exit_price[order]
+    pnl = (exit_price - entry_price) / entry_price
+
+    # Trade statistics: one bincount per aggregate
+    trades = np.bincount(group, minlength=n_groups)
+    wins = pnl > 0
+    n_wins = np.bincount(group, weights=wins, minlength=n_groups)
+    n_losses = trades - n_wins
+    total = np.bincount(group, weights=pnl, minlength=n_groups)
+    gross_win = np.bincount(group, weights=np.where(wins, pnl, 0.0), minlength=n_groups)
+    gross_loss = -np.bincount(group, weights=np.where(wins, 0.0, pnl), minlength=n_groups)
+    log_growth = np.bincount(group, weights=np.log1p(pnl), minlength=n_groups)
+
+    def ratio(num, den):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), 0.0)
+
+    out = {
+        'Trades': trades,
+        'Win_Rate': ratio(n_wins, trades),
+        'Total_PnL': total,
+        'Total_Return': np.expm1(log_growth),
+        'Expectancy': ratio(total, trades),
+        'Avg_Win': ratio(gross_win, n_wins),
+        'Avg_Loss': -ratio(gross_loss, n_losses),
+        'Profit_Factor': np.where(gross_loss > 0, ratio(gross_win, gross_loss), np.where(gross_win > 0, np.inf, 0.0))
+    }
+    for col in EQUITY_METRICS:
+        out[col] = np.zeros(n_groups, dtype=np.int64 if col == 'Max_DD_Bars' else np.float64)
+
+    if len(pnl):
+        ann = np.sqrt(periods_per_year) if periods_per_year else 1.0
+        _equity_metrics(close, entry_idx, exit_idx, entry_price, exit_price, group, n_groups, out, ann)
+    return pd.DataFrame(out, columns=METRICS)
+
+
+def trade_indices(df: pd.DataFrame, trades: pd.DataFrame):
+    """
+    Bar positions of a `Backtester` trade log.
+
+    Returns:
+        tuple: (entry_idx, exit_idx) arrays into df.
+    """
+    if trades.empty:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    return df.index.get_indexer(trades['Entry Time']), df.index.get_indexer(trades['Exit Time'])
+
+
+def signal_types(df: pd.DataFrame, entry_idx) -> np.ndarray:
+    """Index into SIGNAL_TYPES of each trade, from the signal columns of its signal bar (entry - 1)."""
+    bar = np.asarray(entry_idx, dtype=np.int64) - 1
+    codes = np.full(len(bar), 2, dtype=np.int64)
+    if 'Signal_Breakout' in df.columns:
+        codes[df['Signal_Breakout'].to_numpy()[bar] == 1] = 1
+    if 'Signal_MeanRev' in df.columns:
+        codes[df['Signal_MeanRev'].to_numpy()[bar] == 1] = 0
+    return codes
+
+
+def trade_log_metrics(df: pd.DataFrame, trades: pd.DataFrame, by_signal: bool = False) -> pd.DataFrame:
+    """
+    Metrics of a `Backtester` trade log on the frame it was run on.
+
+    Args:
+        df: The backtested frame (Close, plus the signal columns for `by_signal`).
+        trades: Trade log from `Backtester.run`.
+        by_signal: One row per signal type (Mean Reversion, Breakout) instead of
+                   one overall row. Each type's trades form their own equity path.
+
+    Returns:
+        pd.DataFrame: METRICS columns, indexed by signal type when `by_signal`.
+    """
+    entry_idx, exit_idx = trade_indices(df, trades)
+    entry_price = trades['Entry Price'].to_numpy() if not trades.empty else np.empty(0)
+    exit_price = trades['Exit Price'].to_numpy() if not trades.empty else np.empty(0)
+    group, n_groups = None, 1
+    if by_signal:
+        group, n_groups = signal_types(df, entry_idx), len(SIGNAL_TYPES)
+
+    result = compute_metrics(df['Close'].to_numpy(), entry_idx, exit_idx, entry_price, exit_price,
+                             group=group, n_groups=n_groups, periods_per_year=periods_per_year(df.index))
+    if by_signal:
+        result.index = pd.Index(SIGNAL_TYPES, name='Signal')
+        result = result[result['Trades'] > 0]
+    return result
+
+
+def equity_curve(df: pd.DataFrame, trades: pd.DataFrame) -> pd.Series:
+    """Per-bar compounded equity (starting at 1) of a trade log, marked to the close while in a position."""
+    equity = np.zeros(len(df))
+    if not trades.empty:
+        entry_idx, exit_idx = trade_indices(df, trades)
+        order = np.argsort(entry_idx, kind='stable')
+        _, bar, log_ret = _bar_returns(df['Close'].to_numpy(dtype=np.float64), entry_idx[order], exit_idx[order],
+                                       trades['Entry Price'].to_numpy()[order], trades['Exit Price'].to_numpy()[order])
+        equity[bar] = log_ret
+    return pd.Series(np.exp(np.cumsum(equity)), index=df.index, name='Equity')
+
+
+if __name__ == "__main__":
+    from src.data.synthetic import synthetic_bars
+    from src.analysis.indicators import add_indicators
+    from src.analysis.signals import generate_signals
+    from src.engine.backtester import Backtester
+
+    df = add_indicators(synthetic_bars(20_000), backend="native")
+    df = generate_signals(df, bandwidth_threshold=df['Bandwidth'].median())
+    trades = Backtester(engine="array").run(df)
+    print(trade_log_metrics(df, trades).T)
+    print(trade_log_metrics(df, trades, by_signal=True).T)
@@ -0,0 +1,75 @@
+from src.engine.kernels import Reason
+from src.engine.tradelog import Position
+
+
+class TradeStateMachine:
+    """
+    Bar-by-bar form of the Backtester trade lifecycle, for streaming use.
+
+    Applies exactly the rules of `Backtester.run`: exits are checked on each
+    bar (SL before TP, EOD overrides both at the close), a bar that closes a
+    trade cannot open one, and a Signal on bar i enters at the Open of bar i+1.
+    Because EOD and entries depend on the following bar, bar i is processed
+    once bar i+1 is known.
+    """
+    def __init__(self, atr_multiplier_sl=2.0, atr_multiplier_tp=3.0):
+        self.atr_multiplier_sl = atr_multiplier_sl
+        self.atr_multiplier_tp = atr_multiplier_tp
+        self.position = None
+        self.trades = []
+        self.bars = 0  # Index of the next bar `step` processes
+
+    def step(self, bar: dict, next_bar: dict):
+        """
+        Processes one completed bar.
+
+        Args:
+            bar: Bar i with 'Time', 'High', 'Low', 'Close', 'ATR' and 'Signal'.
+            next_bar: Bar i+1 with at least 'Time' and 'Open'.
+
+        Returns:
+            dict: The closed trade (Backtester trade log row), or None.
+        """
+        i = self.bars
+        self.bars += 1
+        position = self.position
+        if position is not None:
+            exit_reason = None
+            exit_price = None
+
+            # Check SL first (Conservative)
+            if bar['Low'] <= position.sl:
+                exit_reason = Reason.STOP_LOSS
+                exit_price = position.sl
+            elif bar['High'] >= position.tp:
+                exit_reason = Reason.TAKE_PROFIT
+                exit_price = position.tp
+
+            # Time Stop: last bar of the trading day
+            if next_bar['Time'].date() > bar['Time'].date():
+                exit_reason = Reason.EOD
+                exit_price = bar['Close']
+
+            if exit_reason is not None:
+                pnl = (exit_price - position.entry_price) / position.entry_price
+                trade = {
+                    'Entry Time': position.entry_time,
+                    'Entry Price': position.entry_price,
+                    'Exit Time': bar['Time'],
+                    'Exit Price': exit_price,
+                    'Reason': exit_reason.label,
+                    'PnL': pnl,
+                    'Return %': pnl * 100
+                }
+                self.trades.append(trade)
+                self.position = None
+                return trade
+            return None
+
+        if bar['Signal'] == 1:
+            next_open = next_bar['Open']
+            atr_val = bar['ATR']
+            self.position = Position(i + 1, next_bar['Time'], next_open,
+                                     next_open - (self.atr_multiplier_sl * atr_val),
+                                     next_open + (self.atr_multiplier_tp * atr_val))
+        return None
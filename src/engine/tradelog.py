@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from src.engine.kernels import REASONS
+
+# One closed trade: 41 bytes, against roughly a kilobyte for a dict of Timestamps and floats
+TRADE_DTYPE = np.dtype([
+    ('entry_idx', np.int64),
+    ('exit_idx', np.int64),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('reason', np.int8),
+    ('pnl', np.float64)
+])
+
+
+class Position:
+    """Open position of the trade state machines."""
+    __slots__ = ('entry_idx', 'entry_time', 'entry_price', 'sl', 'tp')
+
+    def __init__(self, entry_idx, entry_time, entry_price, sl, tp):
+        self.entry_idx = entry_idx
+        self.entry_time = entry_time
+        self.entry_price = entry_price
+        self.sl = sl
+        self.tp = tp
+
+
+class TradeLog:
+    """
+    Closed trades in a growable, preallocated NumPy structured array (TRADE_DTYPE).
+
+    Trades are recorded by bar position and reason code (`Reason`); timestamps
+    and labels are only attached when the log is turned into a DataFrame with
+    `to_frame`, so recording a trade allocates no Python objects.
+    """
+    def __init__(self, capacity: int = 256):
+        self._data = np.empty(max(1, capacity), dtype=TRADE_DTYPE)
+        self._n = 0
+
+    @classmethod
+    def from_arrays(cls, entry_idx, exit_idx, entry_price, exit_price, reason) -> "TradeLog":
+        """Builds a log from the output arrays of the simulation kernels."""
+        log = cls(len(entry_idx))
+        data = log._data[:len(entry_idx)]
+        data['entry_idx'] = entry_idx
+        data['exit_idx'] = exit_idx
+        data['entry_price'] = entry_price
+        data['exit_price'] = exit_price
+        data['reason'] = reason
+        data['pnl'] = (data['exit_price'] - data['entry_price']) / data['entry_price']
+        log._n = len(entry_idx)
+        return log
+
+    def append(self, entry_idx: int, exit_idx: int, entry_price: float, exit_price: float, reason: int):
+        if self._n == len(self._data):
+            grown = np.empty(2 * len(self._data), dtype=TRADE_DTYPE)
+            grown[:self._n] = self._data
+            self._data = grown
+        self._data[self._n] = (entry_idx, exit_idx, entry_price, exit_price, reason,
+                               (exit_price - entry_price) / entry_price)
+        self._n += 1
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def data(self) -> np.ndarray:
+        """The recorded trades (a view, no copy)."""
+        return self._data[:self._n]
+
+    @property
+    def nbytes(self) -> int:
+        return self._n * TRADE_DTYPE.itemsize
+
+    def to_frame(self, index) -> pd.DataFrame:
+        """
+        Materializes the Backtester trade log DataFrame.
+
+        Args:
+            index: DatetimeIndex of the bars the trades were recorded on.
+        """
+        if self._n == 0:
+            return pd.DataFrame()
+        data = self.data
+        return pd.DataFrame({
+            'Entry Time': index[data['entry_idx']],
+            'Entry Price': data['entry_price'],
+            'Exit Time': index[data['exit_idx']],
+            'Exit Price': data['exit_price'],
+            'Reason': np.array(REASONS, dtype=object)[data['reason']],
+            'PnL': data['pnl'],
+            'Return %': data['pnl'] * 100
+        })
@@ -0,0 +1,200 @@
+import os
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.data.loader import base_interval_for, fetch_data
+from src.data.store import BarStore
+from src.data.sync import DataSync
+from src.analysis.cache import cached_indicators
+from src.analysis.signals import generate_signals, squeeze_threshold
+from src.engine.backtester import Backtester
+
+def load_universe(source) -> list:
+    """
+    Parses a ticker universe.
+
+    Args:
+        source: List of tickers, a comma-separated string, or a path to a file with
+                one ticker per line (blank lines and '#' comments are ignored).
+
+    Returns:
+        list: Unique tickers in their original order.
+    """
+    if isinstance(source, str):
+        if os.path.isfile(source):
+            with open(source) as f:
+                lines = [line.split('#', 1)[0] for line in f]
+            tickers = [t for line in lines for t in line.replace(',', ' ').split()]
+        else:
+            tickers = source.split(',')
+    else:
+        tickers = list(source)
+
+    tickers = [t.strip().upper() for t in tickers if t.strip()]
+    return list(dict.fromkeys(tickers))
+
+
+def backtest_symbol(task: dict) -> dict:
+    """
+    Full single-ticker pipeline: load bars, add indicators, generate signals, backtest.
+
+    Module-level so it can run inside universe worker processes.
+
+    Returns:
+        dict: 'summary' (one result row) and 'trades' (trade log with a Ticker column).
+    """
+    ticker = task['ticker']
+    summary = {'Ticker': ticker, 'Bars': 0, 'Signals': 0, 'Trades': 0,
+               'Win_Rate': 0.0, 'Total_PnL': 0.0, 'Avg_PnL': 0.0, 'Error': None}
+    try:
+        # The universe was synced up front; workers never download
+        df = fetch_data(ticker, interval=task['interval'], period=task['period'], data_dir=task['data_dir'],
+                        download=False)
+        if df.empty:
+            summary['Error'] = task.get('sync_error') or 'No data'
+            return {'summary': summary, 'trades': pd.DataFrame()}
+
+        df = cached_indicators(df, data_dir=task['data_dir'], backend=task['indicator_backend'])
+        bw_threshold = task['bandwidth']
+        if bw_threshold is None:
+            bw_threshold = squeeze_threshold(df['Bandwidth'], task.get('bw_quantile', 0.5), task.get('bw_window', 0))
+        df = generate_signals(df, bandwidth_threshold=bw_threshold)
+
+        engine = Backtester(atr_multiplier_sl=task['sl'], atr_multiplier_tp=task['tp'], engine='array')
+        trades = engine.run(df)
+    except Exception as e:
+        summary['Error'] = str(e)
+        return {'summary': summary, 'trades': pd.DataFrame()}
+
+    summary['Bars'] = len(df)
+    summary['Signals'] = int(df['Signal'].sum())
+    if not trades.empty:
+        summary['Trades'] = len(trades)
+        summary['Win_Rate'] = (trades['PnL'] > 0).mean()
+        summary['Total_PnL'] = trades['PnL'].sum()
+        summary['Avg_PnL'] = trades['PnL'].mean()
+        trades.insert(0, 'Ticker', ticker)
+    return {'summary': summary, 'trades': trades}
+
+
+class UniverseBacktester:
+    """
+    Runs the Trinity backtest across a universe of tickers on a process pool.
+
+    The universe is first brought up to date in the bar store by `DataSync`
+    (bounded concurrency behind a shared rate limit), so the workers only read
+    the store and never hit the provider themselves. Bars are not shipped
+    between processes. Indicators go through the indicator cache.
+    """
+    def __init__(self, tickers, interval="5m", period="1mo", atr_multiplier_sl=2.0, atr_multiplier_tp=2.0,
+                 bandwidth_threshold=None, indicator_backend="pandas_ta", n_jobs=None, data_dir="data",
+                 bw_quantile=0.5, bw_window=0, provider=None, rate_limit=2.0):
+        self.tickers = load_universe(tickers)
+        self.interval = interval
+        self.period = period
+        self.atr_multiplier_sl = atr_multiplier_sl
+        self.atr_multiplier_tp = atr_multiplier_tp
+        self.bandwidth_threshold = bandwidth_threshold
+        self.bw_quantile = bw_quantile
+        self.bw_window = bw_window
+        self.indicator_backend = indicator_backend
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.data_dir = data_dir
+        self.provider = provider
+        self.rate_limit = rate_limit
+        self.sync_report = pd.DataFrame()
+        self.results = pd.DataFrame()
+        self.trades = pd.DataFrame()
+        self.elapsed = 0.0
+
+    def sync(self) -> pd.DataFrame:
+        """
+        Downloads the bars missing from the store for every ticker.
+
+        Tickers are synced at the base interval `fetch_data` will read them
+        from (e.g. 5m bars for a 15m run).
+
+        Returns:
+            pd.DataFrame: `DataSync.sync` rows for every ticker.
+        """
+        store = BarStore(os.path.join(self.data_dir, "bars"))
+        groups = {}
+        for ticker in self.tickers:
+            base = base_interval_for(store, ticker, self.interval, self.period)
+            groups.setdefault(base, []).append(ticker)
+
+        syncer = DataSync(self.provider, data_dir=self.data_dir, rate_limit=self.rate_limit)
+        reports = [syncer.sync(tickers, interval=base, period=self.period) for base, tickers in groups.items()]
+        self.sync_report = pd.concat(reports, ignore_index=True) if reports else pd.DataFrame()
+        return self.sync_report
+
+    def run(self) -> pd.DataFrame:
+        """
+        Syncs the universe into the store, then backtests every ticker.
+
+        Returns:
+            pd.DataFrame: One row per ticker, in universe order.
+        """
+        report = self.sync()
+        sync_errors = ({t: e for t, e in zip(report['Ticker'], report['Error']) if isinstance(e, str)}
+                       if not report.empty else {})
+
+        tasks = [{
+            'ticker': ticker,
+            'interval': self.interval,
+            'period': self.period,
+            'data_dir': self.data_dir,
+            'sl': self.atr_multiplier_sl,
+            'tp': self.atr_multiplier_tp,
+            'bandwidth': self.bandwidth_threshold,
+            'bw_quantile': self.bw_quantile,
+            'bw_window': self.bw_window,
+            'indicator_backend': self.indicator_backend,
+            'sync_error': sync_errors.get(ticker)
+        } for ticker in self.tickers]
+
+        start = time.perf_counter()
+        outputs = {}
+        if self.n_jobs == 1:
+            for task in tasks:
+                outputs[task['ticker']] = backtest_symbol(task)
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.n_jobs, max(len(tasks), 1))) as pool:
+                futures = {pool.submit(backtest_symbol, task): task['ticker'] for task in tasks}
+                for future in as_completed(futures):
+                    outputs[futures[future]] = future.result()
+                    print(f"  {len(outputs)}/{len(tasks)} symbols done")
+        self.elapsed = time.perf_counter() - start
+
+        ordered = [outputs[t] for t in self.tickers]
+        self.results = pd.DataFrame([o['summary'] for o in ordered])
+        frames = [o['trades'] for o in ordered if not o['trades'].empty]
+        self.trades = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return self.results
+
+    def portfolio_summary(self) -> dict:
+        """
+        Portfolio-level result, assuming equal capital per symbol.
+
+        Total_PnL is the average of the per-symbol total PnL; trade statistics
+        are pooled across all symbols.
+        """
+        ok = self.results[self.results['Error'].isna()] if not self.results.empty else self.results
+        trades = self.trades
+        return {
+            'Symbols': len(self.results),
+            'Symbols_Loaded': len(ok),
+            'Symbols_Traded': int((ok['Trades'] > 0).sum()) if not ok.empty else 0,
+            'Trades': len(trades),
+            'Win_Rate': (trades['PnL'] > 0).mean() if not trades.empty else 0.0,
+            'Total_PnL': ok['Total_PnL'].mean() if not ok.empty else 0.0,
+            'Avg_PnL': trades['PnL'].mean() if not trades.empty else 0.0,
+            'Symbols_Per_Sec': len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
+        }
+
+
+if __name__ == "__main__":
+    universe = UniverseBacktester(["NVDA", "AAPL", "MSFT", "GOOGL", "AMZN"])
+    results = universe.run()
+    print(results.to_string(index=False))
+    print(universe.portfolio_summary())
@@ -0,0 +1,64 @@
+import os
+import asyncio
+import pandas as pd
+from src.data.store import BarStore
+
+BAR_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+class BarFeed:
+    """
+    Base class for bar sources consumed by the trading runtime.
+
+    A feed is an async iterator of completed bars. Each bar is a dict with
+    'Time' (Timestamp) and the OHLCV fields. Subclasses implement `__aiter__`.
+    """
+    def __aiter__(self):
+        raise NotImplementedError
+
+
+class ReplayFeed(BarFeed):
+    """
+    Replays historical bars as if they were arriving live.
+
+    Args:
+        df: DataFrame with OHLCV columns and a DatetimeIndex.
+        delay: Seconds to wait between bars (0 = as fast as possible).
+    """
+    def __init__(self, df: pd.DataFrame, delay: float = 0.0):
+        self.df = df
+        self.delay = delay
+
+    @classmethod
+    def from_store(cls, ticker: str, interval: str = "5m", start=None, end=None,
+                   data_dir: str = "data", delay: float = 0.0):
+        """Replays bars from the local bar store (no network access)."""
+        df = BarStore(os.path.join(data_dir, "bars")).load(ticker, interval, start=start, end=end)
+        return cls(df, delay=delay)
+
+    async def __aiter__(self):
+        fields = [c for c in BAR_FIELDS if c in self.df.columns]
+        columns = [self.df[c].to_numpy() for c in fields]
+        for i, ts in enumerate(self.df.index):
+            bar = {'Time': ts}
+            for name, values in zip(fields, columns):
+                bar[name] = float(values[i])
+            yield bar
+            # Yield control to the loop even without a delay
+            await asyncio.sleep(self.delay)
+
+
+class QueueFeed(BarFeed):
+    """
+    Feed backed by an asyncio.Queue, for plugging in live sources.
+
+    A producer task puts bar dicts on the queue and `None` to end the stream.
+    """
+    def __init__(self, queue: asyncio.Queue = None):
+        self.queue = queue or asyncio.Queue()
+
+    async def __aiter__(self):
+        while True:
+            bar = await self.queue.get()
+            if bar is None:
+                return
+            yield bar
@@ -0,0 +1,162 @@
+import asyncio
+import time
+import pandas as pd
+from src.analysis.streaming import StreamingIndicators, StreamingSignals
+from src.engine.state import TradeStateMachine
+from src.live.feeds import ReplayFeed
+
+STAGES = ('indicators', 'signals', 'execution', 'total')
+
+class LatencyHistogram:
+    """
+    Log2-bucketed latency histogram in nanoseconds.
+
+    Bucket k counts samples in [2^k, 2^(k+1)) ns. Recording is a bit_length()
+    and a list increment, so it can stay on in the hot path.
+    """
+    def __init__(self):
+        self.buckets = [0] * 48
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int):
+        self.buckets[min(max(ns, 1).bit_length() - 1, 47)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (ns) of the bucket holding the q-th percentile (0-100)."""
+        if self.count == 0:
+            return 0.0
+        target = q / 100 * self.count
+        seen = 0
+        for k, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return float(2 ** (k + 1))
+        return float(self.max_ns)
+
+    def summary(self) -> dict:
+        """Count plus mean/p50/p90/p99/max latency in microseconds."""
+        mean = self.total_ns / self.count if self.count else 0.0
+        return {
+            'count': self.count,
+            'mean_us': mean / 1e3,
+            'p50_us': self.percentile(50) / 1e3,
+            'p90_us': self.percentile(90) / 1e3,
+            'p99_us': self.percentile(99) / 1e3,
+            'max_us': self.max_ns / 1e3
+        }
+
+
+class TradingRuntime:
+    """
+    Event-driven paper trading loop.
+
+    Consumes bars from a feed, updates indicators and Trinity signals
+    incrementally and drives the Backtester trade rules bar by bar through
+    `TradeStateMachine`. Per-stage decision latency is recorded for every bar.
+
+    Because EOD exits and next-open entries depend on the following bar, each
+    bar's execution step runs when its successor arrives. On the same data the
+    trade log therefore matches `Backtester.run` exactly.
+    """
+    def __init__(self, feed, bandwidth_threshold: float = 0.02, adx_threshold: float = 25.0,
+                 rsi_lower_thresh: float = 30.0, rsi_upper_thresh: float = 70.0,
+                 atr_multiplier_sl: float = 2.0, atr_multiplier_tp: float = 3.0,
+                 indicator_params: dict = None, verbose: bool = False):
+        self.feed = feed
+        self.indicators = StreamingIndicators(**(indicator_params or {}))
+        self.signals = StreamingSignals(
+            bandwidth_threshold=bandwidth_threshold,
+            adx_threshold=adx_threshold,
+            rsi_lower_thresh=rsi_lower_thresh,
+            rsi_upper_thresh=rsi_upper_thresh
+        )
+        self.executor = TradeStateMachine(atr_multiplier_sl=atr_multiplier_sl, atr_multiplier_tp=atr_multiplier_tp)
+        self.latency = {stage: LatencyHistogram() for stage in STAGES}
+        self.verbose = verbose
+        self._pending = None  # Last bar, waiting for its successor
+
+    def on_bar(self, bar: dict):
+        """
+        Handles one incoming bar synchronously.
+
+        Returns:
+            dict: A trade closed by this update, or None.
+        """
+        clock = time.perf_counter_ns
+        t0 = clock()
+        ind = self.indicators.update(bar)
+        t1 = clock()
+        sig = self.signals.update(bar['Close'], ind)
+        t2 = clock()
+
+        trade = None
+        if self._pending is not None:
+            trade = self.executor.step(self._pending, bar)
+        t3 = clock()
+
+        pending = dict(bar)
+        pending['ATR'] = ind['ATR']
+        pending['Signal'] = sig['Signal']
+        self._pending = pending
+
+        self.latency['indicators'].record(t1 - t0)
+        self.latency['signals'].record(t2 - t1)
+        self.latency['execution'].record(t3 - t2)
+        self.latency['total'].record(t3 - t0)
+
+        if self.verbose and trade is not None:
+            print(f"[EXIT] {trade['Exit Time']} @ {trade['Exit Price']:.2f} ({trade['Reason']}) | PnL: {trade['PnL']*100:.2f}%")
+        return trade
+
+    async def run(self) -> pd.DataFrame:
+        """
+        Runs until the feed is exhausted.
+
+        Returns:
+            pd.DataFrame: Trade log in the Backtester format.
+        """
+        async for bar in self.feed:
+            self.on_bar(bar)
+        return self.trade_log()
+
+    def trade_log(self) -> pd.DataFrame:
+        return pd.DataFrame(self.executor.trades)
+
+    def latency_report(self) -> pd.DataFrame:
+        """Per-stage latency summary (microseconds), one row per stage."""
+        return pd.DataFrame({stage: h.summary() for stage, h in self.latency.items()}).T
+
+
+def replay(df: pd.DataFrame, **kwargs) -> TradingRuntime:
+    """Runs a TradingRuntime over a DataFrame of bars and returns the finished runtime."""
+    runtime = TradingRuntime(ReplayFeed(df), **kwargs)
+    asyncio.run(runtime.run())
+    return runtime
+
+
+if __name__ == "__main__":
+    # Replay cached data and compare with the batch backtest
+    from src.data.loader import fetch_data
+    from src.analysis.cache import cached_indicators
+    from src.analysis.signals import generate_signals
+    from src.engine.backtester import Backtester
+
+    df = fetch_data("NVDA")
+    df_ind = cached_indicators(df)
+    median_bw = df_ind['Bandwidth'].median()
+
+    runtime = replay(df, bandwidth_threshold=median_bw, atr_multiplier_sl=2.0, atr_multiplier_tp=3.0)
+    live_trades = runtime.trade_log()
+
+    batch_trades = Backtester(atr_multiplier_sl=2.0, atr_multiplier_tp=3.0).run(
+        generate_signals(df_ind, bandwidth_threshold=median_bw))
+
+    print(runtime.latency_report().to_string())
+    print(f"\nLive trades: {len(live_trades)} | Batch trades: {len(batch_trades)}")
+    print("Trade logs match:", live_trades.equals(batch_trades))
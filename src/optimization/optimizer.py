@@ -1,16 +1,149 @@
 import argparse
+import json
+import hashlib
+import numpy as np
 import pandas as pd
 import itertools
 from src.data.loader import fetch_data
-from src.analysis.indicators import add_indicators
-from src.analysis.signals import generate_signals
-from src.engine.backtester import Backtester
+from src.analysis.cache import INDICATOR_VERSION, cached_indicators, data_fingerprint
+from src.analysis.indicators import BACKENDS, INDICATOR_PARAMS
+from src.analysis.rolling import RollingQuantile
+from src.analysis.signals import SignalBitsets, dynamic_squeeze, squeeze_threshold, unpack_signal
+from src.engine.backtester import Backtester, ENGINES
+from src.engine.batch import BatchBacktester
+from src.engine.metrics import RANKING_METRICS, compute_metrics, periods_per_year
+from src.optimization.parallel import default_workers, map_shared
+from src.optimization.results import METRIC_COLUMNS, ResultsStore, param_key
+from src.optimization.search import STRATEGIES, ParameterSearch
+from src.utils.profiling import profiler, stage
+
+# 'batch' evaluates all SL/TP pairs of a signal set in one pass with BatchBacktester
+OPTIMIZER_ENGINES = ENGINES + ('batch',)
+
+# Parameter Grid
+# RSI Lower Thresholds (Upper will be 100 - Lower implicitly or explicitly set)
+# Note: In our current signal logic we use explicit upper/lower.
+# But commonly if we set lower=30, upper is 70.
+# Let's vary them symmetrically for now as per plan [20, 25, 30]
+# which means pairs (20, 80), (25, 75), (30, 70).
+PARAM_GRID = {
+    'rsi_low': [20, 25, 30],
+    'adx_thresh': [20, 25, 30],
+    'atr_sl': [1.5, 2.0, 2.5],
+    'atr_tp': [2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0],
+    # Squeeze filter: Bandwidth below this quantile of the last bw_window bars
+    # (0 = the whole period, i.e. the full-period median by default)
+    'bw_quantile': [0.5],
+    'bw_window': [0]
+}
+
+# Columns the single-run engines read besides the signal
+EXECUTION_COLUMNS = ['Open', 'High', 'Low', 'Close', 'ATR']
+
+def evaluate_signal_set(df, task):
+    """
+    Backtests one signal set for a list of SL/TP pairs.
+    
+    Module-level so it can run inside optimizer worker processes.
+    
+    Args:
+        df: Indicator DataFrame.
+        task: Dict with 'rsi_low', 'adx_thresh', 'signal_bits' (packed signal
+              from `SignalBitsets`), 'exec_params' (list of (sl, tp) pairs) and 'engine'.
+              Optional 'bw_quantile' / 'bw_window' / 'bw_threshold' label the
+              bandwidth filter the signal set was built with (full-period median
+              by default), and
+              'periods_per_year' saves re-deriving the annualization factor.
+              
+    Returns:
+        list: One result row per SL/TP pair, in the order of 'exec_params'.
+    """
+    rsi_low = task['rsi_low']
+    rsi_high = 100 - rsi_low
+    adx_thresh = task['adx_thresh']
+    exec_params = task['exec_params']
+    
+    # 1. Expand the precomputed signal set
+    signal = unpack_signal(task['signal_bits'], len(df))
+    
+    # 2. Run Backtests & 3. Calculate Metrics
+    ppy = task.get('periods_per_year') or periods_per_year(df.index)
+    if task['engine'] != 'batch':
+        df_sig = _execution_frame(df, signal)
+        metrics = [_run_single(df_sig, sl_mult, tp_mult, task['engine'], ppy) for sl_mult, tp_mult in exec_params]
+    else:
+        sl_vec, tp_vec = zip(*exec_params)
+        engine = BatchBacktester(sl_vec, tp_vec)
+        summary = engine.run(df, signal=signal)
+        summary[RANKING_METRICS] = engine.metrics(ppy)[RANKING_METRICS]
+        metrics = summary.to_dict('records')
+        
+    rows = []
+    for m in metrics:
+        rows.append({
+            'RSI_Low': rsi_low,
+            'RSI_High': rsi_high,
+            'ADX_Thresh': adx_thresh,
+            'BW_Quantile': task.get('bw_quantile', 0.5),
+            'BW_Window': task.get('bw_window', 0),
+            'BW_Threshold': task.get('bw_threshold'),
+            'ATR_SL': m['ATR_SL'],
+            'ATR_TP': m['ATR_TP'],
+            'Trades': m['Trades'],
+            'Win_Rate': m['Win_Rate'],
+            'Total_PnL': m['Total_PnL'],
+            'Avg_PnL': m['Avg_PnL'],
+            **{col: m[col] for col in RANKING_METRICS}
+        })
+    return rows
+
+def _execution_frame(df, signal):
+    """Narrow frame with the price/ATR columns and `signal`, sharing the indicator arrays."""
+    columns = {c: df[c].to_numpy() for c in EXECUTION_COLUMNS}
+    columns['Signal'] = signal
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+def _run_single(df_sig, sl_mult, tp_mult, engine_name, ppy=None):
+    """Backtests one SL/TP pair with a single-run engine, straight from its TradeLog."""
+    engine = Backtester(atr_multiplier_sl=sl_mult, atr_multiplier_tp=tp_mult, engine=engine_name)
+    trades = engine.simulate(df_sig).data
+    
+    trade_count = len(trades)
+    if trade_count > 0:
+        pnl = trades['pnl']
+        total_pnl = pnl.sum()
+        win_rate = np.count_nonzero(pnl > 0) / trade_count
+        avg_pnl = pnl.mean()
+    else:
+        total_pnl = 0.0
+        win_rate = 0.0
+        avg_pnl = 0.0
+    risk = compute_metrics(df_sig['Close'].to_numpy(), trades['entry_idx'], trades['exit_idx'],
+                           trades['entry_price'], trades['exit_price'], periods_per_year=ppy).iloc[0]
+        
+    return {
+        'ATR_SL': sl_mult,
+        'ATR_TP': tp_mult,
+        'Trades': trade_count,
+        'Win_Rate': win_rate,
+        'Total_PnL': total_pnl,
+        'Avg_PnL': avg_pnl,
+        **{col: risk[col] for col in RANKING_METRICS}
+    }
 
 class Optimizer:
-    def __init__(self, ticker="NVDA", interval="5m", period="1mo"):
+    def __init__(self, ticker="NVDA", interval="5m", period="1mo", engine="batch", n_jobs=1,
+                 indicator_backend="pandas_ta", results_path=None):
+        if engine not in OPTIMIZER_ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Expected one of {OPTIMIZER_ENGINES}")
         self.ticker = ticker
         self.interval = interval
         self.period = period
+        self.engine = engine
+        self.n_jobs = n_jobs or default_workers()
+        self.indicator_backend = indicator_backend
+        self.store = ResultsStore(results_path) if results_path else None
+        self.fingerprint = None
         self.df = None
         self.results = []
 
@@ -22,76 +155,243 @@ class Optimizer:
             raise ValueError("No data fetched.")
         
         print("Calculating indicators...")
-        self.df = add_indicators(df)
+        self.df = cached_indicators(df, backend=self.indicator_backend)
         
-    def run_grid_search(self):
+    def _open_store(self):
         """
-        Runs grid search over parameter combinations.
+        Loads data if needed and fingerprints it for the results store.
+        
+        The fingerprint covers the bars, the indicator backend and parameters,
+        so stored results are only reused when they would be reproduced exactly.
         """
         if self.df is None:
             self.load_data()
+        if self.store is not None and self.fingerprint is None:
+            payload = json.dumps({
+                'data': data_fingerprint(self.df),
+                'backend': self.indicator_backend,
+                'indicators': INDICATOR_PARAMS,
+                'version': INDICATOR_VERSION
+            }, sort_keys=True)
+            self.fingerprint = hashlib.sha256(payload.encode()).hexdigest()[:32]
+        
+    def _save(self, rows):
+        if self.store is not None:
+            self.store.add(self.ticker, self.interval, self.fingerprint, rows)
+        
+    def run_grid_search(self, bw_windows=None, bw_quantiles=None):
+        """
+        Runs grid search over parameter combinations.
+        
+        With a results store, combinations already evaluated on the same data
+        are skipped and new results are saved as each task finishes, so an
+        interrupted sweep continues where it stopped.
+        
+        Args:
+            bw_windows: Rolling windows (bars) of the bandwidth threshold, 0 = whole period
+                        (default: PARAM_GRID['bw_window']).
+            bw_quantiles: Bandwidth quantiles used as squeeze threshold
+                          (default: PARAM_GRID['bw_quantile']).
+        """
+        self._open_store()
             
         # Parameter Grid
-        # RSI Lower Thresholds (Upper will be 100 - Lower implicitly or explicitly set)
-        # Note: In our current signal logic we use explicit upper/lower.
-        # But commonly if we set lower=30, upper is 70.
-        # Let's vary them symmetrically for now as per plan [20, 25, 30]
-        # which means pairs (20, 80), (25, 75), (30, 70).
-        rsi_params = [20, 25, 30]
-        
-        adx_params = [20, 25, 30]
-        atr_sl_multipliers = [1.5, 2.0, 2.5]
-        atr_tp_multipliers = [2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0]
+        rsi_params = PARAM_GRID['rsi_low']
+        adx_params = PARAM_GRID['adx_thresh']
+        atr_sl_multipliers = PARAM_GRID['atr_sl']
+        atr_tp_multipliers = PARAM_GRID['atr_tp']
+        bw_filters = list(itertools.product(bw_windows or PARAM_GRID['bw_window'],
+                                            bw_quantiles or PARAM_GRID['bw_quantile']))
         
         # Calculate total combinations
-        combinations = list(itertools.product(rsi_params, adx_params, atr_sl_multipliers, atr_tp_multipliers))
+        combinations = list(itertools.product(bw_filters, rsi_params, adx_params, atr_sl_multipliers,
+                                              atr_tp_multipliers))
         print(f"Starting grid search with {len(combinations)} combinations...")
         
-        for rsi_low, adx_thresh, sl_mult, tp_mult in combinations:
-            rsi_high = 100 - rsi_low
+        def row_key(bw_filter, rsi_low, adx_thresh, sl, tp):
+            return param_key({'RSI_Low': rsi_low, 'RSI_High': 100 - rsi_low, 'ADX_Thresh': adx_thresh,
+                              'BW_Quantile': bw_filter[1], 'BW_Window': bw_filter[0], 'ATR_SL': sl, 'ATR_TP': tp})
+        
+        stored = {}
+        if self.store is not None:
+            stored = self.store.load(self.ticker, self.interval, self.fingerprint).to_dict('index')
+        exec_params = list(itertools.product(atr_sl_multipliers, atr_tp_multipliers))
+        signal_params, pending = [], []
+        for bw_filter, rsi_low, adx_thresh in itertools.product(bw_filters, rsi_params, adx_params):
+            todo = [(sl, tp) for sl, tp in exec_params if row_key(bw_filter, rsi_low, adx_thresh, sl, tp) not in stored]
+            if todo:
+                signal_params.append((bw_filter, rsi_low, adx_thresh))
+                pending.append(todo)
+        skipped = len(combinations) - sum(len(todo) for todo in pending)
+        if skipped:
+            print(f"Skipping {skipped} combinations already in the results store")
+        
+        # Parameter stages: indicators -> signals -> execution. Each stage only
+        # depends on its own parameters and the stages upstream, so:
+        #   - indicators are computed once (load_data),
+        #   - each bandwidth threshold is computed once (rolling ones per window, see `_bandwidth_thresholds`),
+        #   - each (bandwidth, RSI, ADX) signal set is computed once, as a packed bitset,
+        #   - every SL/TP pair reuses its signal set ('batch' runs them in one pass).
+        signals = SignalBitsets(self.df)
+        signal_sets = {}
+        with stage("optimizer.signals", rows=len(signal_params)):
+            thresholds = self._bandwidth_thresholds(list(dict.fromkeys(f for f, _, _ in signal_params)))
+            for bw_filter, threshold in thresholds.items():
+                params = [p for p in signal_params if p[0] == bw_filter]
+                rsi_lows, adx_threshs = (np.array(v, dtype=np.float64) for v in list(zip(*params))[1:])
+                if np.ndim(threshold) == 0:
+                    bits = signals.get_many(threshold, adx_threshs, rsi_lows, 100 - rsi_lows)
+                else:
+                    # Rolling threshold: compare Bandwidth - threshold against 0
+                    rolling = SignalBitsets(self.df, conditions=dynamic_squeeze(signals.conditions, threshold))
+                    bits = rolling.get_many(0.0, adx_threshs, rsi_lows, 100 - rsi_lows)
+                    signals.computed += rolling.computed
+                signal_sets.update(zip(params, bits))
+        
+        tasks = []
+        ppy = periods_per_year(self.df.index)
+        for (bw_filter, rsi_low, adx_thresh), todo in zip(signal_params, pending):
+            bw_window, bw_quantile = bw_filter
+            threshold = thresholds[bw_filter]
+            signal_bits = signal_sets[(bw_filter, rsi_low, adx_thresh)]
+            for chunk in self._chunk_exec_params(todo):
+                tasks.append({
+                    'rsi_low': rsi_low,
+                    'adx_thresh': adx_thresh,
+                    'bw_quantile': bw_quantile,
+                    'bw_window': bw_window,
+                    'bw_threshold': threshold if np.ndim(threshold) == 0 else None,
+                    'periods_per_year': ppy,
+                    'signal_bits': signal_bits,
+                    'exec_params': chunk,
+                    'engine': self.engine
+                })
+        print(f"Signal sets computed: {signals.computed}")
+        
+        new_rows = {}
+        if self.n_jobs == 1:
+            for task in tasks:
+                # Rows are combinations here
+                with stage("optimizer.evaluate", rows=len(task['exec_params'])):
+                    rows = evaluate_signal_set(self.df, task)
+                with stage("optimizer.store", rows=len(rows)):
+                    self._save(rows)
+                new_rows.update((param_key(r), r) for r in rows)
+        elif tasks:
+            done = skipped
+            with stage("optimizer.evaluate", rows=len(combinations) - skipped):
+                for _, rows in map_shared(self.df, evaluate_signal_set, tasks, n_jobs=self.n_jobs):
+                    self._save(rows)
+                    new_rows.update((param_key(r), r) for r in rows)
+                    done += len(rows)
+                    print(f"  {done}/{len(combinations)} combinations evaluated")
+        
+        # Assemble in grid order, independent of completion order and of what was resumed
+        for bw_filter, rsi_low, adx_thresh, sl, tp in combinations:
+            key = row_key(bw_filter, rsi_low, adx_thresh, sl, tp)
+            self.results.append(new_rows[key] if key in new_rows else stored[key])
             
-            # 1. Generate Signals
-            # We use the median bandwidth as a baseline for all tests to isolate other variables
-            # Or we could optimize bandwidth too, but let's stick to the plan.
-            bw_threshold = self.df['Bandwidth'].median()
+    def _bandwidth_thresholds(self, bw_filters):
+        """
+        Squeeze threshold of each (window, quantile) bandwidth filter.
+        
+        Window 0 gives the full-period quantile (a scalar). Rolling windows give
+        one threshold per bar; Bandwidth is ranked once, and each window is one
+        pass of `RollingQuantile` covering all of its quantiles.
+        """
+        bandwidth = self.df['Bandwidth']
+        thresholds = {}
+        rolling = None
+        for window in dict.fromkeys(w for w, _ in bw_filters):
+            quantiles = [q for w, q in bw_filters if w == window]
+            if not window:
+                thresholds.update(((window, q), squeeze_threshold(bandwidth, q)) for q in quantiles)
+                continue
+            if rolling is None:
+                rolling = RollingQuantile(bandwidth.to_numpy())
+            thresholds.update(zip(((window, q) for q in quantiles), rolling.quantiles(window, quantiles)))
+        return thresholds
             
-            df_sig = generate_signals(
-                self.df, 
-                bandwidth_threshold=bw_threshold, 
-                adx_threshold=adx_thresh,
-                rsi_lower_thresh=rsi_low,
-                rsi_upper_thresh=rsi_high
-            )
+    def run_interval_sweep(self, intervals, **grid):
+        """
+        Runs the grid search once per bar interval.
+        
+        Coarser intervals are resampled from the same stored base bars (see
+        `fetch_data`), so sweeping them costs no extra downloads. Rows get an
+        'Interval' column and are ranked together by `get_top_results`.
+        
+        Args:
+            intervals: Bar intervals to test, e.g. ['5m', '15m', '1h'].
+            **grid: Passed on to `run_grid_search` (bw_windows, bw_quantiles).
+        """
+        results = []
+        for interval in intervals:
+            print(f"\n--- Interval {interval} ---")
+            self.interval = interval
+            self.df = None
+            self.fingerprint = None
+            self.results = []
+            self.run_grid_search(**grid)
+            results.extend({**row, 'Interval': interval} for row in self.results)
+        self.results = results
+        # The results span several data sets, so rank them in memory
+        self.fingerprint = None
             
-            # 2. Run Backtest
-            engine = Backtester(atr_multiplier_sl=sl_mult, atr_multiplier_tp=tp_mult)
-            trades = engine.run(df_sig)
+    def _chunk_exec_params(self, exec_params):
+        """
+        Splits the SL/TP pairs of a signal set into chunks.
+        
+        Serial runs keep them together. Parallel runs split them so there are
+        enough tasks to keep every worker busy even on small grids.
+        """
+        if self.n_jobs == 1:
+            return [exec_params]
+        n_chunks = min(len(exec_params), max(1, self.n_jobs // 4))
+        size = -(-len(exec_params) // n_chunks)
+        return [exec_params[i:i + size] for i in range(0, len(exec_params), size)]
             
-            # 3. Calculate Metrics
-            trade_count = len(trades)
-            if trade_count > 0:
-                total_pnl = trades['PnL'].sum()
-                win_rate = len(trades[trades['PnL'] > 0]) / trade_count
-                avg_pnl = trades['PnL'].mean()
-            else:
-                total_pnl = 0.0
-                win_rate = 0.0
-                avg_pnl = 0.0
-                
-            self.results.append({
-                'RSI_Low': rsi_low,
-                'RSI_High': rsi_high,
-                'ADX_Thresh': adx_thresh,
-                'ATR_SL': sl_mult,
-                'ATR_TP': tp_mult,
-                'Trades': trade_count,
-                'Win_Rate': win_rate,
-                'Total_PnL': total_pnl,
-                'Avg_PnL': avg_pnl
-            })
+    def run_search(self, strategy, max_evals=None, time_budget=None, patience=None, state_path=None,
+                   sort_by='Total_PnL'):
+        """
+        Searches continuous parameter ranges with a strategy from `src/optimization/search.py`
+        instead of the fixed grid.
+        
+        Args:
+            strategy: A SearchStrategy instance (RandomSearch, SuccessiveHalving, Hyperband, TPESearch).
+            max_evals: Budget in full-history backtests.
+            time_budget: Budget in seconds.
+            patience: Stop after this many full-history trials without improvement.
+                      Random and TPE searches need at least one of these three limits.
+            state_path: JSON file to checkpoint to and resume from.
+            sort_by: Metric the search maximizes (any result metric, e.g. 'Sharpe').
+            
+        Returns:
+            ParameterSearch: The finished search (all trials, including partial-history ones).
+        """
+        self._open_store()
+        
+        search = ParameterSearch(self.df, strategy, max_evals=max_evals, time_budget=time_budget,
+                                 patience=patience, state_path=state_path, sort_by=sort_by)
+        with stage("optimizer.search"):
+            search.run()
+        print(f"Search stopped ({search.stop_reason}) after {len(search.history)} trials, "
+              f"{search.cost:.1f} full-history evaluations")
+        
+        # Only full-history trials are comparable with grid results
+        rows = [h['metrics'] for h in search.history if h['fraction'] >= 1.0]
+        self._save(rows)
+        self.results.extend(rows)
+        return search
             
     def get_top_results(self, top_n=5, sort_by='Total_PnL'):
-        """Returns the top N results sorted by metric."""
+        """
+        Returns the top N results sorted by metric.
+        
+        With a results store this queries every result stored for the current
+        data (grid and search runs alike), using the metric's index.
+        """
+        if self.store is not None and self.fingerprint is not None:
+            return self.store.top(self.ticker, self.interval, self.fingerprint, top_n=top_n, sort_by=sort_by)
         results_df = pd.DataFrame(self.results)
         if results_df.empty:
             return results_df
@@ -101,12 +401,53 @@ class Optimizer:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Trinity Strategy Optimizer")
     parser.add_argument("--ticker", type=str, default="NVDA", help="Ticker to optimize (default: NVDA)")
+    parser.add_argument("--interval", type=str, default="5m", help="Data Interval (default: 5m)")
+    parser.add_argument("--intervals", type=str, default=None, help="Comma-separated intervals to sweep with the grid search, e.g. 5m,15m,1h")
+    parser.add_argument("--bw-windows", type=str, default=None, help="Comma-separated rolling windows (bars) of the bandwidth threshold to sweep, 0 = whole period (default: 0)")
+    parser.add_argument("--bw-quantiles", type=str, default=None, help="Comma-separated bandwidth quantiles to sweep as squeeze threshold (default: 0.5)")
+    parser.add_argument("--engine", type=str, default="batch", choices=OPTIMIZER_ENGINES, help="Execution Engine (default: batch)")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes, 0 = all cores (default: 1)")
+    parser.add_argument("--indicators", type=str, default="pandas_ta", choices=BACKENDS, help="Indicator Backend (default: pandas_ta)")
+    parser.add_argument("--search", type=str, default="grid", choices=('grid',) + tuple(STRATEGIES), help="Search Strategy (default: grid)")
+    parser.add_argument("--evals", type=float, default=None, help="Search budget in full-history backtests (default: none)")
+    parser.add_argument("--time-budget", type=float, default=None, help="Search budget in seconds (default: none)")
+    parser.add_argument("--patience", type=int, default=None, help="Stop after N full-history trials without improvement")
+    parser.add_argument("--state", type=str, default=None, help="Checkpoint file to save and resume the search")
+    parser.add_argument("--seed", type=int, default=0, help="Search seed (default: 0)")
+    parser.add_argument("--sort-by", type=str, default="Total_PnL", choices=METRIC_COLUMNS, help="Ranking metric (default: Total_PnL)")
+    parser.add_argument("--profile", type=str, nargs="?", const="profile.json", default=None, help="Record per-stage timings and write them to this JSON file (default: profile.json)")
+    parser.add_argument("--cprofile", type=str, default=None, help="Also write a cProfile/pstats dump to this file")
+    parser.add_argument("--no-profile-memory", action="store_true", help="Skip tracemalloc peak memory while profiling (it slows allocation-heavy stages)")
+    parser.add_argument("--results", type=str, default="data/results.sqlite", help="Results store, 'none' to disable (default: data/results.sqlite)")
     args = parser.parse_args()
+    if (args.intervals or args.bw_windows or args.bw_quantiles) and args.search != 'grid':
+        parser.error("--intervals, --bw-windows and --bw-quantiles require the grid search")
     
-    optimizer = Optimizer(ticker=args.ticker)
-    optimizer.run_grid_search()
+    if args.profile or args.cprofile:
+        profiler.enable(memory=not args.no_profile_memory, cprofile=bool(args.cprofile))
+    
+    results_path = None if args.results.lower() == 'none' else args.results
+    optimizer = Optimizer(ticker=args.ticker, interval=args.interval, engine=args.engine, n_jobs=args.jobs, indicator_backend=args.indicators,
+                          results_path=results_path)
+    grid = {
+        'bw_windows': [int(w) for w in args.bw_windows.split(',') if w.strip()] if args.bw_windows else None,
+        'bw_quantiles': [float(q) for q in args.bw_quantiles.split(',') if q.strip()] if args.bw_quantiles else None
+    }
+    if args.intervals:
+        optimizer.run_interval_sweep([i.strip() for i in args.intervals.split(',') if i.strip()], **grid)
+    elif args.search == 'grid':
+        optimizer.run_grid_search(**grid)
+    else:
+        strategy = STRATEGIES[args.search]
+        if args.evals is None and args.time_budget is None and not strategy.bounded:
+            args.evals = 100
+        optimizer.run_search(strategy(seed=args.seed), max_evals=args.evals,
+                             time_budget=args.time_budget, patience=args.patience, state_path=args.state,
+                             sort_by=args.sort_by)
     
     print(f"\n--- Top 10 Optimization Results for {args.ticker} ---")
-    top_results = optimizer.get_top_results(top_n=10)
+    top_results = optimizer.get_top_results(top_n=10, sort_by=args.sort_by)
     print(top_results.to_string(index=False))
-
+    
+    if profiler.enabled:
+        profiler.finish(args.profile, args.cprofile)
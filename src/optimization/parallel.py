@@ -0,0 +1,120 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+class SharedFrame:
+    """
+    Publishes the numeric columns of a DataFrame in one shared memory block.
+
+    Workers attach by name and get a DataFrame whose values are a zero-copy view
+    of the block, so the market data is never pickled per task. All columns are
+    stored as float64 in a single (columns x rows) buffer.
+    """
+    def __init__(self, df: pd.DataFrame):
+        self.columns = list(df.columns)
+        self.length = len(df)
+        values = np.empty((len(self.columns), self.length), dtype=np.float64)
+        for k, col in enumerate(self.columns):
+            values[k] = df[col].to_numpy(dtype=np.float64)
+
+        index = pd.DatetimeIndex(df.index)
+        self.tz = str(index.tz) if index.tz is not None else None
+        self.unit = index.unit
+        stamps = index.asi8  # int64 ticks of `unit` (bars past 2262 are not representable in ns)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes + stamps.nbytes, 1))
+        self.name = self._shm.name
+        buf = np.ndarray(values.size + self.length, dtype=np.int64, buffer=self._shm.buf)
+        buf[:self.length] = stamps
+        buf[self.length:] = values.reshape(-1).view(np.int64)
+
+    def spec(self) -> dict:
+        """Small picklable description workers pass to `attach_frame`."""
+        return {'name': self.name, 'columns': self.columns, 'length': self.length, 'tz': self.tz, 'unit': self.unit}
+
+    def close(self):
+        """Releases and unlinks the block. Call once, from the publishing process."""
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_frame(spec: dict):
+    """
+    Attaches to a block published by SharedFrame.
+
+    Returns:
+        tuple: (DataFrame view over the shared block, SharedMemory handle).
+               Keep the handle alive for as long as the DataFrame is used.
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=spec['name'], track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        shm = shared_memory.SharedMemory(name=spec['name'])
+
+    n = spec['length']
+    k = len(spec['columns'])
+    stamps = np.ndarray(n, dtype=np.int64, buffer=shm.buf)
+    values = np.ndarray((k, n), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+    values.flags.writeable = False
+
+    index = pd.DatetimeIndex(stamps.view(f"datetime64[{spec['unit']}]"))
+    if spec['tz'] is not None:
+        index = index.tz_localize('UTC').tz_convert(spec['tz'])
+
+    # Transposed view keeps a single (columns x rows) block, so pandas does not copy
+    df = pd.DataFrame(values.T, index=index, columns=spec['columns'], copy=False)
+    return df, shm
+
+
+# Per-worker state set up by the pool initializer
+_worker_df = None
+_worker_shm = None
+_worker_func = None
+
+def _init_worker(spec, func):
+    global _worker_df, _worker_shm, _worker_func
+    _worker_df, _worker_shm = attach_frame(spec)
+    _worker_func = func
+
+def _run_task(task_id, task):
+    return task_id, _worker_func(_worker_df, task)
+
+
+def default_workers() -> int:
+    """Number of worker processes to use when none is given."""
+    return os.cpu_count() or 1
+
+
+def map_shared(df: pd.DataFrame, func, tasks, n_jobs: int = None):
+    """
+    Runs func(df, task) for every task on a process pool, sharing df via shared memory.
+
+    Results are yielded as soon as each task finishes, so the order is not
+    deterministic; callers should reorder by the task id.
+
+    Args:
+        df: DataFrame to publish once for all workers.
+        func: Module-level function taking (df, task). Must be picklable.
+        tasks: Iterable of picklable task descriptions.
+        n_jobs: Worker processes (default: all cores).
+
+    Yields:
+        tuple: (task_id, result), where task_id is the task's position in `tasks`.
+    """
+    tasks = list(tasks)
+    n_jobs = min(n_jobs or default_workers(), max(len(tasks), 1))
+
+    with SharedFrame(df) as shared:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(shared.spec(), func)) as pool:
+            futures = [pool.submit(_run_task, i, task) for i, task in enumerate(tasks)]
+            for future in as_completed(futures):
+                yield future.result()
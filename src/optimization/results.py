@@ -0,0 +1,115 @@
+import os
+import json
+import sqlite3
+import pandas as pd
+from src.engine.metrics import RANKING_METRICS
+
+# Columns that identify a parameter set, and the metrics stored for it
+PARAM_COLUMNS = ['RSI_Low', 'RSI_High', 'ADX_Thresh', 'BW_Quantile', 'BW_Window', 'ATR_SL', 'ATR_TP']
+METRIC_COLUMNS = ['Trades', 'Win_Rate', 'Total_PnL', 'Avg_PnL'] + RANKING_METRICS
+# Stored row layout, in optimizer result order (BW_Threshold is derived, not part of the key;
+# it is NULL for rolling thresholds, BW_Window > 0)
+RESULT_COLUMNS = ['RSI_Low', 'RSI_High', 'ADX_Thresh', 'BW_Quantile', 'BW_Window', 'BW_Threshold', 'ATR_SL',
+                  'ATR_TP'] + METRIC_COLUMNS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    Ticker TEXT NOT NULL,
+    Interval TEXT NOT NULL,
+    Fingerprint TEXT NOT NULL,
+    Param_Key TEXT NOT NULL,
+    RSI_Low REAL, RSI_High REAL, ADX_Thresh REAL, BW_Quantile REAL, ATR_SL REAL, ATR_TP REAL,
+    BW_Window REAL, BW_Threshold REAL,
+    Trades INTEGER, Win_Rate REAL, Total_PnL REAL, Avg_PnL REAL,
+    Total_Return REAL, Max_Drawdown REAL, Sharpe REAL, Sortino REAL, Profit_Factor REAL,
+    Created TEXT,
+    PRIMARY KEY (Ticker, Interval, Fingerprint, Param_Key)
+)
+"""
+
+# Rows written before a metric column existed are treated as not evaluated
+_COMPLETE = " AND ".join(f"{c} IS NOT NULL" for c in METRIC_COLUMNS)
+
+def param_key(row: dict) -> str:
+    """Canonical key of the full parameter tuple of a result row."""
+    return json.dumps([round(float(row[c]), 10) for c in PARAM_COLUMNS])
+
+
+class ResultsStore:
+    """
+    Persistent optimization results in SQLite.
+
+    Rows are keyed by (ticker, interval, data fingerprint, parameter tuple), so
+    results are only reused for exactly the same bars and indicator settings.
+    Every metric column is indexed per (ticker, interval, fingerprint) for
+    top-N queries.
+    """
+    def __init__(self, path: str = "data/results.sqlite"):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as con:
+            con.execute(_SCHEMA)
+            existing = {row[1] for row in con.execute("PRAGMA table_info(results)")}
+            for col in ['BW_Window'] + METRIC_COLUMNS:
+                if col not in existing:
+                    con.execute(f"ALTER TABLE results ADD COLUMN {col} REAL")
+            for col in METRIC_COLUMNS:
+                con.execute(f"CREATE INDEX IF NOT EXISTS idx_results_{col.lower()} "
+                            f"ON results (Ticker, Interval, Fingerprint, {col})")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def add(self, ticker: str, interval: str, fingerprint: str, rows: list) -> int:
+        """
+        Writes result rows in one transaction, replacing stored rows with the same key.
+
+        Returns:
+            int: Number of rows written.
+        """
+        if not rows:
+            return 0
+        created = pd.Timestamp.now(tz='UTC').isoformat()
+        records = [(ticker, interval, fingerprint, param_key(r),
+                    *(_plain(r.get(c)) for c in RESULT_COLUMNS), created) for r in rows]
+        columns = ['Ticker', 'Interval', 'Fingerprint', 'Param_Key'] + RESULT_COLUMNS + ['Created']
+        with self._connect() as con:
+            cur = con.executemany(
+                f"INSERT OR REPLACE INTO results ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                records)
+            return cur.rowcount
+
+    def load(self, ticker: str, interval: str, fingerprint: str) -> pd.DataFrame:
+        """All stored results for these bars, keyed by parameter key."""
+        with self._connect() as con:
+            return pd.read_sql_query(
+                f"SELECT Param_Key, {', '.join(RESULT_COLUMNS)} FROM results "
+                f"WHERE Ticker = ? AND Interval = ? AND Fingerprint = ? AND {_COMPLETE}",
+                con, params=(ticker, interval, fingerprint), index_col='Param_Key')
+
+    def top(self, ticker: str, interval: str, fingerprint: str = None, top_n: int = 5,
+            sort_by: str = 'Total_PnL') -> pd.DataFrame:
+        """
+        Best stored results by a metric column.
+
+        With a fingerprint the query is answered from the metric's index;
+        without one it ranks results across every stored data version.
+        """
+        if sort_by not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric '{sort_by}'. Expected one of {METRIC_COLUMNS}")
+        where = "Ticker = ? AND Interval = ?"
+        params = [ticker, interval]
+        if fingerprint is not None:
+            where += " AND Fingerprint = ?"
+            params.append(fingerprint)
+        with self._connect() as con:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(RESULT_COLUMNS)} FROM results WHERE {where} ORDER BY {sort_by} DESC LIMIT ?",
+                con, params=(*params, top_n))
+
+
+def _plain(value):
+    # NumPy scalars -> Python numbers for sqlite3
+    return value.item() if hasattr(value, 'item') else value
@@ -0,0 +1,384 @@
+import os
+import json
+import math
+import time
+import numpy as np
+import pandas as pd
+from src.analysis.signals import signal_conditions, signal_tensor, unpack_signal
+from src.engine.kernels import eod_mask, simulate_trades
+from src.engine.metrics import RANKING_METRICS, compute_metrics, periods_per_year
+
+# Continuous ranges searched by default. The bandwidth threshold is searched as
+# a quantile of the Bandwidth column (0.5 = the median the grid search uses).
+SEARCH_SPACE = {
+    'rsi_low': (15.0, 35.0),
+    'adx_thresh': (15.0, 35.0),
+    'bw_quantile': (0.2, 0.8),
+    'atr_sl': (1.0, 3.0),
+    'atr_tp': (1.5, 10.0)
+}
+
+def evaluate_trials(df: pd.DataFrame, trials: list, conditions: dict = None) -> list:
+    """
+    Backtests a list of trials on one indicator frame.
+
+    A trial is a dict with 'params' (a point of the search space) and
+    'fraction' (share of the history to use, counted back from the last bar).
+    All trials on the same slice get their signals from one `signal_tensor` call.
+
+    Args:
+        df: Indicator DataFrame.
+        trials: Trials to evaluate.
+        conditions: `signal_conditions(df)`, if already computed.
+
+    Returns:
+        list: One result row per trial, in input order, in the optimizer's row
+              format plus BW_Quantile, BW_Threshold, Fraction and Bars.
+    """
+    conditions = conditions if conditions is not None else signal_conditions(df)
+    n = len(df)
+    rows = [None] * len(trials)
+
+    by_fraction = {}
+    for k, trial in enumerate(trials):
+        by_fraction.setdefault(trial['fraction'], []).append(k)
+
+    for fraction, ks in by_fraction.items():
+        lo = n - max(2, int(math.ceil(fraction * n)))
+        lo = max(lo, 0)
+        cond = {c: v[lo:] for c, v in conditions.items()}
+        window = df.iloc[lo:]
+        arrays = [window[c].to_numpy(dtype=np.float64) for c in ('Open', 'High', 'Low', 'Close', 'ATR')]
+        eod = eod_mask(window.index)
+
+        params = [trials[k]['params'] for k in ks]
+        rsi_low = np.array([p['rsi_low'] for p in params])
+        adx = np.array([p['adx_thresh'] for p in params])
+        quantile = np.array([p['bw_quantile'] for p in params])
+        bw = np.nanquantile(cond['Bandwidth'], quantile)
+        tensor = signal_tensor(cond, bw, adx, rsi_low, 100 - rsi_low)
+
+        runs = []
+        for j, p in enumerate(params):
+            entry_idx, exit_idx, exit_price, _ = simulate_trades(
+                *arrays, unpack_signal(tensor[j], len(window)), eod, p['atr_sl'], p['atr_tp'])
+            runs.append((entry_idx, exit_idx, exit_price, np.full(len(entry_idx), j)))
+        entry_idx, exit_idx, exit_price, group = (np.concatenate(v) for v in zip(*runs))
+        risk = compute_metrics(arrays[3], entry_idx, exit_idx, arrays[0][entry_idx], exit_price, group=group,
+                               n_groups=len(params), periods_per_year=periods_per_year(window.index))
+        risk = risk[RANKING_METRICS].to_dict('records')
+
+        for j, k in enumerate(ks):
+            p = params[j]
+            entry_idx, _, exit_price, _ = runs[j]
+            entry_price = arrays[0][entry_idx]
+            pnl = (exit_price - entry_price) / entry_price
+            trades = len(pnl)
+            rows[k] = {
+                'RSI_Low': p['rsi_low'],
+                'RSI_High': 100 - p['rsi_low'],
+                'ADX_Thresh': p['adx_thresh'],
+                'BW_Quantile': p['bw_quantile'],
+                'BW_Window': 0,
+                'BW_Threshold': bw[j],
+                'ATR_SL': p['atr_sl'],
+                'ATR_TP': p['atr_tp'],
+                'Trades': trades,
+                'Win_Rate': (pnl > 0).mean() if trades else 0.0,
+                'Total_PnL': pnl.sum() if trades else 0.0,
+                'Avg_PnL': pnl.mean() if trades else 0.0,
+                **risk[j],
+                'Fraction': fraction,
+                'Bars': len(window)
+            }
+    return rows
+
+
+class SearchStrategy:
+    """
+    Base class for parameter search strategies.
+
+    Strategies are stateless apart from their settings: `ask(history)` derives
+    the next batch of trials from the evaluations so far (random draws are
+    seeded from the seed and the history length). A search restored from its
+    saved history therefore continues exactly where it stopped.
+
+    `bounded` strategies finish on their own; the others keep proposing
+    trials until a budget stops them.
+    """
+    name = None
+    bounded = False
+
+    def __init__(self, space: dict = None, seed: int = 0):
+        self.space = {**SEARCH_SPACE, **(space or {})}
+        self.seed = seed
+
+    def ask(self, history: list) -> list:
+        """Returns the next trials to evaluate, or [] when the strategy is finished."""
+        raise NotImplementedError
+
+    def sample(self, rng, n: int) -> list:
+        """`n` points drawn uniformly from the search space."""
+        units = rng.random((n, len(self.space)))
+        return [self._from_unit(u) for u in units]
+
+    def _from_unit(self, u) -> dict:
+        return {name: float(lo + x * (hi - lo)) for x, (name, (lo, hi)) in zip(u, self.space.items())}
+
+    def _to_unit(self, params: dict) -> np.ndarray:
+        return np.array([(params[name] - lo) / (hi - lo) for name, (lo, hi) in self.space.items()])
+
+
+class RandomSearch(SearchStrategy):
+    """Uniform random sampling over the search space, on the full history."""
+    name = 'random'
+
+    def __init__(self, space: dict = None, seed: int = 0, batch_size: int = 16):
+        super().__init__(space, seed)
+        self.batch_size = batch_size
+
+    def ask(self, history: list) -> list:
+        rng = np.random.default_rng([self.seed, len(history)])
+        return [{'params': p, 'fraction': 1.0} for p in self.sample(rng, self.batch_size)]
+
+
+class SuccessiveHalving(SearchStrategy):
+    """
+    Successive halving on growing slices of history.
+
+    Starts `n_configs` random configurations on the most recent `min_fraction`
+    of the bars, keeps the best 1/`eta` and re-evaluates them on `eta` times
+    more history, until the survivors run on the full history. Poor
+    configurations are dropped after a cheap evaluation.
+    """
+    name = 'halving'
+    bounded = True
+
+    def __init__(self, space: dict = None, seed: int = 0, n_configs: int = 27, eta: int = 3,
+                 min_fraction: float = 1 / 9):
+        super().__init__(space, seed)
+        self.eta = eta
+        self.brackets = [(n_configs, min_fraction)]
+
+    def ask(self, history: list) -> list:
+        for b, (n_configs, min_fraction) in enumerate(self.brackets):
+            configs = self.sample(np.random.default_rng([self.seed, b]), n_configs)
+            fraction = min_fraction
+            rung = 0
+            while True:
+                done = {_key(h['params']) for h in history if h['bracket'] == b and h['rung'] == rung}
+                pending = [c for c in configs if _key(c) not in done]
+                if pending:
+                    return [{'params': c, 'fraction': fraction, 'bracket': b, 'rung': rung} for c in pending]
+                if fraction >= 1.0:
+                    break
+                # Promote the best 1/eta of this rung to the next one
+                scored = sorted((h for h in history if h['bracket'] == b and h['rung'] == rung),
+                                key=lambda h: h['score'], reverse=True)
+                configs = [h['params'] for h in scored[:max(1, len(scored) // self.eta)]]
+                fraction = min(1.0, fraction * self.eta)
+                rung += 1
+        return []
+
+
+class Hyperband(SuccessiveHalving):
+    """
+    Hyperband: successive halving over several brackets, from many configurations
+    on short slices to a few configurations on the full history, which hedges
+    against slices too short to rank the configurations reliably.
+    """
+    name = 'hyperband'
+
+    def __init__(self, space: dict = None, seed: int = 0, eta: int = 3, min_fraction: float = 1 / 27):
+        super().__init__(space, seed, eta=eta)
+        s_max = int(round(math.log(1 / min_fraction, eta)))
+        self.brackets = [(int(math.ceil((s_max + 1) / (s + 1) * eta ** s)), eta ** -s)
+                         for s in range(s_max, -1, -1)]
+
+
+class TPESearch(SearchStrategy):
+    """
+    Tree-structured Parzen Estimator (Bayesian) sampler.
+
+    After `n_startup` random trials, the full-history results are split into
+    the best `gamma` share and the rest. Candidates are drawn around the good
+    points and the ones most likely under the good density relative to the
+    bad density are evaluated next.
+    """
+    name = 'tpe'
+
+    def __init__(self, space: dict = None, seed: int = 0, n_startup: int = 20, n_candidates: int = 64,
+                 gamma: float = 0.25, batch_size: int = 4):
+        super().__init__(space, seed)
+        self.n_startup = n_startup
+        self.n_candidates = n_candidates
+        self.gamma = gamma
+        self.batch_size = batch_size
+
+    def ask(self, history: list) -> list:
+        rng = np.random.default_rng([self.seed, len(history)])
+        observed = [h for h in history if h['fraction'] >= 1.0]
+        if len(observed) < self.n_startup:
+            return [{'params': p, 'fraction': 1.0} for p in self.sample(rng, self.batch_size)]
+
+        observed = sorted(observed, key=lambda h: h['score'], reverse=True)
+        n_good = max(1, int(math.ceil(self.gamma * len(observed))))
+        good = np.array([self._to_unit(h['params']) for h in observed[:n_good]])
+        bad = np.array([self._to_unit(h['params']) for h in observed[n_good:]])
+
+        # Candidates: good points perturbed with the good density's bandwidth
+        bw_good = _bandwidth(good)
+        centers = good[rng.integers(0, len(good), self.n_candidates)]
+        candidates = np.clip(centers + rng.normal(0.0, 1.0, centers.shape) * bw_good, 0.0, 1.0)
+
+        ratio = _log_density(candidates, good, bw_good) - _log_density(candidates, bad, _bandwidth(bad))
+        best = np.argsort(-ratio)[:self.batch_size]
+        return [{'params': self._from_unit(candidates[i]), 'fraction': 1.0} for i in best]
+
+
+def _bandwidth(points: np.ndarray) -> np.ndarray:
+    # Scott's rule per dimension, floored so a tight cluster still explores
+    if len(points) < 2:
+        return np.full(points.shape[1], 0.2)
+    return np.maximum(points.std(axis=0) * len(points) ** (-1 / (points.shape[1] + 4)), 0.05)
+
+
+def _log_density(x: np.ndarray, points: np.ndarray, bandwidth: np.ndarray) -> np.ndarray:
+    # Log of a Gaussian mixture centered on `points`, evaluated at each row of x
+    if len(points) == 0:
+        return np.zeros(len(x))
+    z = (x[:, None, :] - points[None, :, :]) / bandwidth
+    log_k = -0.5 * (z ** 2).sum(axis=2) - np.log(bandwidth).sum()
+    top = log_k.max(axis=1, keepdims=True)
+    return (top + np.log(np.exp(log_k - top).mean(axis=1, keepdims=True))).ravel()
+
+
+def _key(params: dict) -> tuple:
+    return tuple(sorted((k, round(v, 12)) for k, v in params.items()))
+
+
+STRATEGIES = {cls.name: cls for cls in (RandomSearch, SuccessiveHalving, Hyperband, TPESearch)}
+
+class ParameterSearch:
+    """
+    Runs a search strategy against an indicator frame.
+
+    Stops when the strategy is finished, the evaluation budget (`max_evals`,
+    counted in full-history equivalents, so a trial on a third of the bars
+    costs 1/3) or the `time_budget` (seconds) is used up, or when `patience`
+    consecutive full-history trials did not improve the best score. With
+    `state_path`, the history is saved after every batch and an interrupted
+    search resumes from it. Strategies that never finish (random, TPE) need
+    at least one of these limits.
+    """
+    def __init__(self, df: pd.DataFrame, strategy: SearchStrategy, max_evals: float = None,
+                 time_budget: float = None, patience: int = None, sort_by: str = 'Total_PnL',
+                 min_trades: int = 1, state_path: str = None):
+        if not strategy.bounded and max_evals is None and time_budget is None and patience is None:
+            raise ValueError(f"The '{strategy.name}' search never finishes on its own: "
+                             "set max_evals, time_budget or patience")
+        self.df = df
+        self.strategy = strategy
+        self.max_evals = max_evals
+        self.time_budget = time_budget
+        self.patience = patience
+        self.sort_by = sort_by
+        self.min_trades = min_trades
+        self.state_path = state_path
+        self.history = []
+        self.stop_reason = None
+        if state_path and os.path.exists(state_path):
+            self._load_state()
+
+    def run(self) -> pd.DataFrame:
+        """
+        Runs (or resumes) the search.
+
+        Returns:
+            pd.DataFrame: Every evaluated trial, in evaluation order.
+        """
+        conditions = signal_conditions(self.df)
+        start = time.perf_counter()
+        self.stop_reason = None
+        while True:
+            if self.max_evals is not None and self.cost >= self.max_evals:
+                self.stop_reason = 'budget'
+                break
+            if self.time_budget is not None and time.perf_counter() - start >= self.time_budget:
+                self.stop_reason = 'time'
+                break
+            if self._stalled():
+                self.stop_reason = 'early_stopping'
+                break
+
+            trials = self.strategy.ask(self.history)
+            if not trials:
+                self.stop_reason = 'finished'
+                break
+            if self.max_evals is not None:
+                trials = _within_budget(trials, self.max_evals - self.cost)
+
+            for trial, row in zip(trials, evaluate_trials(self.df, trials, conditions)):
+                score = row[self.sort_by] if row['Trades'] >= self.min_trades else -np.inf
+                self.history.append({**trial, 'metrics': row, 'score': float(score)})
+            self._save_state()
+        return self.trials()
+
+    @property
+    def cost(self) -> float:
+        return sum(h['fraction'] for h in self.history)
+
+    def trials(self) -> pd.DataFrame:
+        return pd.DataFrame([h['metrics'] for h in self.history])
+
+    def best(self, top_n: int = 1) -> pd.DataFrame:
+        """Best full-history trials by the objective."""
+        full = [h for h in self.history if h['fraction'] >= 1.0 and np.isfinite(h['score'])]
+        full = sorted(full, key=lambda h: h['score'], reverse=True)[:top_n]
+        return pd.DataFrame([h['metrics'] for h in full])
+
+    def _stalled(self) -> bool:
+        if not self.patience:
+            return False
+        scores = [h['score'] for h in self.history if h['fraction'] >= 1.0]
+        if len(scores) <= self.patience:
+            return False
+        return max(scores[-self.patience:]) <= max(scores[:-self.patience])
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        folder = os.path.dirname(self.state_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({'strategy': self.strategy.name, 'seed': self.strategy.seed,
+                       'history': self.history}, f, default=_json_default)
+        os.replace(tmp, self.state_path)
+
+    def _load_state(self):
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state['strategy'] != self.strategy.name or state['seed'] != self.strategy.seed:
+            raise ValueError(f"State file {self.state_path} belongs to a '{state['strategy']}' search "
+                             f"with seed {state['seed']}")
+        self.history = state['history']
+        print(f"Resuming search from {self.state_path} ({len(self.history)} trials done)")
+
+
+def _within_budget(trials: list, remaining: float) -> list:
+    """Leading trials whose total cost fits in `remaining` (at least one)."""
+    kept, cost = [], 0.0
+    for trial in trials:
+        if kept and cost + trial['fraction'] > remaining:
+            break
+        kept.append(trial)
+        cost += trial['fraction']
+    return kept
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
@@ -0,0 +1,247 @@
+import argparse
+import itertools
+import time
+import numpy as np
+import pandas as pd
+from src.data.loader import fetch_data
+from src.data.sync import PERIODS
+from src.analysis.cache import cached_indicators
+from src.analysis.indicators import BACKENDS
+from src.analysis.signals import SIGNAL_COLUMNS, signal_conditions, signal_tensor, unpack_signal
+from src.engine.batch import BatchBacktester
+from src.optimization.optimizer import EXECUTION_COLUMNS, PARAM_GRID, evaluate_signal_set
+from src.optimization.parallel import default_workers, map_shared
+from src.optimization.results import METRIC_COLUMNS
+
+def _offset(spec: str):
+    """Window length: a period string ('1mo', '3mo', '1y', ...) or a pandas Timedelta string ('10D')."""
+    return PERIODS[spec] if spec in PERIODS else pd.Timedelta(spec)
+
+
+def walk_forward_windows(index: pd.DatetimeIndex, train: str = "3mo", test: str = "1mo", anchored: bool = False) -> list:
+    """
+    Splits a time index into consecutive train/test windows.
+
+    Test windows tile the history after the first `train` span. Each train
+    window ends where its test window starts and covers the preceding `train`
+    span (rolling) or everything since the first bar (anchored).
+
+    Returns:
+        list: Dicts with positional bounds 'train_start', 'test_start', 'test_end'
+              (end exclusive), in chronological order.
+    """
+    train_off, test_off = _offset(train), _offset(test)
+    windows = []
+    if len(index) == 0:
+        return windows
+
+    test_start = index[0] + train_off
+    while test_start <= index[-1]:
+        test_end = test_start + test_off
+        lo = 0 if anchored else int(index.searchsorted(test_start - train_off))
+        mid = int(index.searchsorted(test_start))
+        hi = int(index.searchsorted(test_end))
+        if mid - lo >= 2 and hi - mid >= 2:
+            windows.append({'train_start': lo, 'test_start': mid, 'test_end': hi})
+        test_start = test_end
+    return windows
+
+
+def _window_conditions(df: pd.DataFrame, lo: int, hi: int) -> dict:
+    """`signal_conditions` for bars lo:hi, with the one-bar lookback taken from the full history."""
+    start = max(lo - 1, 0)
+    conditions = signal_conditions(df.iloc[start:hi])
+    if start < lo:
+        conditions = {k: v[1:] for k, v in conditions.items()}
+    return conditions
+
+
+def evaluate_window(df: pd.DataFrame, task: dict) -> dict:
+    """
+    Optimizes on one train window and trades the winner on the following test window.
+
+    Module-level so it can run inside worker processes. `df` is the full
+    indicator frame; windows are positional slices of it, never copies.
+
+    Returns:
+        dict: 'summary' (one row) and 'trades' (out-of-sample trade log).
+    """
+    lo, mid, hi = task['train_start'], task['test_start'], task['test_end']
+    grid = task['grid']
+    train, test = df.iloc[lo:mid], df.iloc[mid:hi]
+    conditions = _window_conditions(df, lo, hi)
+    train_cond = {k: v[:mid - lo] for k, v in conditions.items()}
+    test_cond = {k: v[mid - lo:] for k, v in conditions.items()}
+
+    summary = {
+        'Window': task['window'],
+        'Train_Start': train.index[0], 'Train_End': train.index[-1],
+        'Test_Start': test.index[0], 'Test_End': test.index[-1],
+        'RSI_Low': None, 'ADX_Thresh': None, 'ATR_SL': None, 'ATR_TP': None,
+        'Train_Trades': 0, 'Train_PnL': 0.0,
+        'Test_Trades': 0, 'Test_Win_Rate': 0.0, 'Test_PnL': 0.0
+    }
+
+    # 1. In-sample grid: every signal set in one broadcast, every SL/TP pair in one batch
+    bw_threshold = np.nanmedian(train_cond['Bandwidth'])
+    signal_params = list(itertools.product(grid['rsi_low'], grid['adx_thresh']))
+    rsi_lows, adx_threshs = (np.array(v, dtype=np.float64) for v in zip(*signal_params))
+    tensor = signal_tensor(train_cond, bw_threshold, adx_threshs, rsi_lows, 100 - rsi_lows)
+    exec_params = list(itertools.product(grid['atr_sl'], grid['atr_tp']))
+    rows = []
+    for (rsi_low, adx_thresh), bits in zip(signal_params, tensor):
+        rows.extend(evaluate_signal_set(train, {
+            'rsi_low': rsi_low,
+            'adx_thresh': adx_thresh,
+            'signal_bits': bits,
+            'exec_params': exec_params,
+            'engine': 'batch'
+        }))
+    results = pd.DataFrame(rows)
+    eligible = results[results['Trades'] >= task['min_trades']]
+    if eligible.empty:
+        return {'summary': summary, 'trades': pd.DataFrame()}
+    best = eligible.sort_values(by=task['sort_by'], ascending=False, kind='stable').iloc[0]
+
+    # 2. Out-of-sample: the winner on the test window, with the train-window bandwidth threshold
+    test_bits = signal_tensor(test_cond, bw_threshold, best['ADX_Thresh'], best['RSI_Low'], best['RSI_High'])[0]
+    engine = BatchBacktester([best['ATR_SL']], [best['ATR_TP']])
+    engine.run(test, signal=unpack_signal(test_bits, len(test)))
+    trades = engine.trade_log(0)
+
+    summary.update({
+        'RSI_Low': best['RSI_Low'], 'ADX_Thresh': best['ADX_Thresh'],
+        'ATR_SL': best['ATR_SL'], 'ATR_TP': best['ATR_TP'],
+        'Train_Trades': int(best['Trades']), 'Train_PnL': best['Total_PnL']
+    })
+    if not trades.empty:
+        summary.update({
+            'Test_Trades': len(trades),
+            'Test_Win_Rate': (trades['PnL'] > 0).mean(),
+            'Test_PnL': trades['PnL'].sum()
+        })
+        trades.insert(0, 'Window', task['window'])
+    return {'summary': summary, 'trades': trades}
+
+
+class WalkForward:
+    """
+    Walk-forward optimization of the Trinity parameters.
+
+    Indicators are computed once over the whole history. Each train window is
+    grid-searched (same grid and metrics as `Optimizer`), and the best
+    parameter set is traded on the following test window only. The test
+    windows' trades form the out-of-sample record. Windows are independent
+    and run on a process pool sharing the indicator frame.
+    """
+    def __init__(self, ticker="NVDA", interval="5m", period="1y", train="3mo", test="1mo", anchored=False,
+                 grid=None, sort_by="Total_PnL", min_trades=1, n_jobs=1, indicator_backend="pandas_ta"):
+        self.ticker = ticker
+        self.interval = interval
+        self.period = period
+        self.train = train
+        self.test = test
+        self.anchored = anchored
+        self.grid = {**PARAM_GRID, **(grid or {})}
+        self.sort_by = sort_by
+        self.min_trades = min_trades
+        self.n_jobs = n_jobs or default_workers()
+        self.indicator_backend = indicator_backend
+        self.df = None
+        self.results = pd.DataFrame()
+        self.trades = pd.DataFrame()
+        self.elapsed = 0.0
+
+    def load_data(self):
+        """Fetch data and compute indicators once for the whole history."""
+        print(f"Fetching data for {self.ticker}...")
+        df = fetch_data(self.ticker, interval=self.interval, period=self.period)
+        if df.empty:
+            raise ValueError("No data fetched.")
+
+        print("Calculating indicators...")
+        self.df = cached_indicators(df, backend=self.indicator_backend)
+
+    def run(self) -> pd.DataFrame:
+        """
+        Runs every window.
+
+        Returns:
+            pd.DataFrame: One row per window with the chosen parameters and the
+                          in-sample / out-of-sample results.
+        """
+        if self.df is None:
+            self.load_data()
+
+        windows = walk_forward_windows(self.df.index, self.train, self.test, self.anchored)
+        print(f"Walk-forward over {len(windows)} windows "
+              f"({'anchored' if self.anchored else 'rolling'} train {self.train}, test {self.test})...")
+        tasks = [{**w, 'window': k, 'grid': self.grid, 'sort_by': self.sort_by, 'min_trades': self.min_trades}
+                 for k, w in enumerate(windows)]
+
+        start = time.perf_counter()
+        if self.n_jobs == 1 or len(tasks) <= 1:
+            outputs = [evaluate_window(self.df, task) for task in tasks]
+        else:
+            # Workers only need the signal and execution columns
+            columns = list(dict.fromkeys(SIGNAL_COLUMNS + EXECUTION_COLUMNS))
+            outputs = [None] * len(tasks)
+            done = 0
+            for task_id, output in map_shared(self.df[columns], evaluate_window, tasks, n_jobs=self.n_jobs):
+                outputs[task_id] = output
+                done += 1
+                print(f"  {done}/{len(tasks)} windows done")
+        self.elapsed = time.perf_counter() - start
+
+        self.results = pd.DataFrame([o['summary'] for o in outputs])
+        frames = [o['trades'] for o in outputs if not o['trades'].empty]
+        self.trades = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return self.results
+
+    def equity_curve(self) -> pd.Series:
+        """Stitched out-of-sample equity (fixed stake: 1 + cumulative PnL), indexed by exit time."""
+        if self.trades.empty:
+            return pd.Series(dtype=np.float64, name='Equity')
+        return pd.Series(1 + self.trades['PnL'].cumsum().to_numpy(), index=self.trades['Exit Time'], name='Equity')
+
+    def summary(self) -> dict:
+        """Out-of-sample totals, plus the in-sample PnL of the chosen parameters for comparison."""
+        trades = self.trades
+        return {
+            'Windows': len(self.results),
+            'OOS_Trades': len(trades),
+            'OOS_Win_Rate': (trades['PnL'] > 0).mean() if not trades.empty else 0.0,
+            'OOS_Total_PnL': trades['PnL'].sum() if not trades.empty else 0.0,
+            'IS_Total_PnL': self.results['Train_PnL'].sum() if not self.results.empty else 0.0,
+            'Elapsed_Sec': self.elapsed
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trinity Walk-Forward Optimizer")
+    parser.add_argument("--ticker", type=str, default="NVDA", help="Ticker to optimize (default: NVDA)")
+    parser.add_argument("--interval", type=str, default="5m", help="Data Interval (default: 5m)")
+    parser.add_argument("--period", type=str, default="1y", help="Data Period (default: 1y)")
+    parser.add_argument("--train", type=str, default="3mo", help="Train window length (default: 3mo)")
+    parser.add_argument("--test", type=str, default="1mo", help="Test window length (default: 1mo)")
+    parser.add_argument("--anchored", action="store_true", help="Grow the train window from the first bar instead of rolling it")
+    parser.add_argument("--sort-by", type=str, default="Total_PnL", choices=METRIC_COLUMNS, help="In-sample ranking metric (default: Total_PnL)")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes, 0 = all cores (default: 1)")
+    parser.add_argument("--indicators", type=str, default="pandas_ta", choices=BACKENDS, help="Indicator Backend (default: pandas_ta)")
+    args = parser.parse_args()
+
+    wf = WalkForward(ticker=args.ticker, interval=args.interval, period=args.period, train=args.train,
+                     test=args.test, anchored=args.anchored, sort_by=args.sort_by, n_jobs=args.jobs,
+                     indicator_backend=args.indicators)
+    results = wf.run()
+
+    print(f"\n--- Walk-Forward Windows for {args.ticker} ---")
+    print(results.to_string(index=False))
+
+    summary = wf.summary()
+    print("\n--- Out-of-Sample Results ---")
+    print(f"Windows: {summary['Windows']}")
+    print(f"OOS Trades: {summary['OOS_Trades']}")
+    print(f"OOS Total PnL: {summary['OOS_Total_PnL']*100:.2f}% (in-sample: {summary['IS_Total_PnL']*100:.2f}%)")
+    print(f"OOS Win Rate: {summary['OOS_Win_Rate']*100:.1f}%")
+    print(f"Elapsed: {summary['Elapsed_Sec']:.1f}s")
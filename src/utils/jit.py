@@ -0,0 +1,49 @@
+import functools
+import threading
+import importlib.util
+import numpy as np
+
+# numba is optional. It is only imported when a kernel is first called:
+# importing it costs about as much as importing pandas, which short runs
+# that never reach a kernel (e.g. `--help`, cache-only paths) shouldn't pay.
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+_compile_lock = threading.Lock()
+
+def jit(func):
+    """
+    Compiles `func` with numba when it is installed, otherwise returns it unchanged.
+
+    Compilation (and the numba import) happens on the first call. Kernels
+    decorated with this must be written so they also run as plain Python
+    (simple loops over indexable sequences, no numba-only constructs), and
+    must not call other @jit kernels, which are plain Python wrappers.
+    """
+    if not HAS_NUMBA:
+        return func
+
+    compiled = None
+
+    @functools.wraps(func)
+    def dispatch(*args):
+        nonlocal compiled
+        if compiled is None:
+            with _compile_lock:
+                if compiled is None:
+                    from numba import njit
+                    compiled = njit(cache=True, nogil=True)(func)
+        return compiled(*args)
+    return dispatch
+
+
+def kernel_input(values, dtype=np.float64):
+    """
+    Prepares an array for a @jit kernel.
+
+    numba wants contiguous NumPy arrays. Plain Python is much faster indexing
+    lists than NumPy scalars, so without numba we hand the kernel a list.
+    """
+    arr = np.ascontiguousarray(values, dtype=dtype)
+    if HAS_NUMBA:
+        return arr
+    return arr.tolist()
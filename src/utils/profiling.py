@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import cProfile
+import functools
+import tracemalloc
+
+class _Stage:
+    """Context manager timing one pass through a pipeline stage."""
+    __slots__ = ('profiler', 'name', 'rows', 'wall', 'cpu', 'mem_start', 'peak', 'out_bytes')
+
+    def __init__(self, profiler, name, rows):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.out_bytes = None
+
+    def __enter__(self):
+        p = self.profiler
+        self.peak = 0
+        if p.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if p._stack:
+                parent = p._stack[-1]
+                parent.peak = max(parent.peak, peak - parent.mem_start)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+        p._stack.append(self)
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        p = self.profiler
+        p._stack.pop()
+        if p.memory and tracemalloc.is_tracing():
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1] - self.mem_start)
+            if p._stack:
+                parent = p._stack[-1]
+                parent.peak = max(parent.peak, self.peak + self.mem_start - parent.mem_start)
+        p._record(self.name, wall, cpu, self.rows, self.peak, self.out_bytes)
+        return False
+
+
+class _NullStage:
+    """Shared no-op stage used while profiling is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Profiler:
+    """
+    Opt-in per-stage instrumentation.
+
+    Records wall time, CPU time, rows processed, peak traced memory and the
+    size of the returned frame for each named stage, aggregated over calls.
+    While disabled, `stage()` returns a shared no-op context and `@profiled`
+    functions cost one attribute check, so the hooks can stay wired in
+    everywhere.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.stats = {}
+        self._stack = []
+        self._cprofile = None
+        self._started_tracing = False
+
+    def enable(self, memory: bool = True, cprofile: bool = False):
+        """
+        Starts recording.
+
+        Args:
+            memory: Track peak memory per stage with tracemalloc (slows allocation-heavy code).
+            cprofile: Also run cProfile over everything until `disable()`.
+        """
+        self.enabled = True
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def disable(self):
+        """Stops recording. Collected stats are kept until `reset()`."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.enabled = False
+
+    def reset(self):
+        self.stats = {}
+        self._stack = []
+        self._cprofile = None
+
+    def stage(self, name: str, rows: int = None):
+        """Context manager recording one pass through stage `name` (processing `rows` rows)."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def _record(self, name, wall, cpu, rows, peak, out_bytes=None):
+        s = self.stats.get(name)
+        if s is None:
+            s = self.stats[name] = {'Calls': 0, 'Wall_s': 0.0, 'CPU_s': 0.0, 'Rows': 0, 'Peak_MB': 0.0,
+                                    'Out_MB': None}
+        s['Calls'] += 1
+        s['Wall_s'] += wall
+        s['CPU_s'] += cpu
+        s['Rows'] += rows or 0
+        s['Peak_MB'] = max(s['Peak_MB'], peak / 1e6)
+        if out_bytes is not None:
+            s['Out_MB'] = max(s['Out_MB'] or 0.0, out_bytes / 1e6)
+
+    def report(self) -> dict:
+        """
+        Structured report of the stages recorded so far.
+
+        Returns:
+            dict: 'stages' (one dict per stage in first-seen order, with Calls,
+                  Wall_s, CPU_s, Rows, Rows_Per_s, Peak_MB and Out_MB, the
+                  largest DataFrame the stage returned) and 'memory' (whether
+                  Peak_MB was measured).
+        """
+        stages = []
+        for name, s in self.stats.items():
+            rate = s['Rows'] / s['Wall_s'] if s['Rows'] and s['Wall_s'] > 0 else None
+            stages.append({'Stage': name, **s, 'Rows_Per_s': rate})
+        return {'stages': stages, 'memory': self.memory}
+
+    def print_report(self):
+        """Console summary of `report()`."""
+        print("\n--- Profile ---")
+        print(f"{'Stage':<24}{'Calls':>7}{'Wall s':>10}{'CPU s':>10}{'Rows':>13}{'Rows/s':>13}{'Peak MB':>10}{'Out MB':>10}")
+        for s in self.report()['stages']:
+            rate = f"{s['Rows_Per_s']:,.0f}" if s['Rows_Per_s'] else '-'
+            peak = f"{s['Peak_MB']:.1f}" if self.memory else '-'
+            out = f"{s['Out_MB']:.1f}" if s['Out_MB'] is not None else '-'
+            print(f"{s['Stage']:<24}{s['Calls']:>7}{s['Wall_s']:>10.3f}{s['CPU_s']:>10.3f}"
+                  f"{s['Rows']:>13,}{rate:>13}{peak:>10}{out:>10}")
+
+    def save(self, path: str):
+        """Writes `report()` as JSON."""
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def finish(self, path: str = None, stats_path: str = None):
+        """Stops recording, prints the summary and writes the JSON report and cProfile dump if paths are given."""
+        self.disable()
+        self.print_report()
+        written = []
+        if path:
+            self.save(path)
+            written.append(path)
+        if stats_path:
+            self.dump_stats(stats_path)
+            written.append(stats_path)
+        if written:
+            print(f"Profile saved to {', '.join(written)}")
+
+    def dump_stats(self, path: str):
+        """Writes the cProfile data (pstats format, e.g. for `python -m pstats` or snakeviz)."""
+        if self._cprofile is None:
+            raise RuntimeError("cProfile was not enabled.")
+        self._cprofile.dump_stats(path)
+
+
+# Process-wide profiler used by the pipeline hooks
+profiler = Profiler()
+
+def stage(name: str, rows: int = None):
+    """`profiler.stage` shortcut for call sites."""
+    return profiler.stage(name, rows)
+
+
+def profiled(name: str, rows_arg: int = 0):
+    """
+    Decorator recording every call of a function as stage `name`.
+
+    Rows are the length of positional argument `rows_arg` (a DataFrame; 1 for
+    methods, after `self`), or of the return value when `rows_arg` is None.
+    DataFrame results are also measured (shallow `memory_usage`, shared
+    buffers counted in full).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            data = args[rows_arg] if rows_arg is not None and len(args) > rows_arg else None
+            with _Stage(profiler, name, len(data) if hasattr(data, '__len__') else None) as s:
+                result = func(*args, **kwargs)
+                if rows_arg is None and hasattr(result, '__len__'):
+                    s.rows = len(result)
+                if hasattr(result, 'memory_usage') and hasattr(result, 'columns'):
+                    s.out_bytes = int(result.memory_usage(index=True).sum())
+                return result
+        return wrapper
+    return decorator
@@ -1,8 +1,35 @@
+import os
+import json
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from src.utils.profiling import profiled
+from src.visualization.decimate import bucket_size, ohlc_buckets, extreme_buckets, minmax_indices, lttb_indices
 
-def create_dashboard(df: pd.DataFrame, trades: pd.DataFrame = None):
+# Above this many bars the dashboard switches to large-data mode by default
+LARGE_DATA_BARS = 20_000
+
+# Buckets per trace in large-data mode
+DEFAULT_MAX_POINTS = 2_000
+
+DECIMATION_METHODS = ('minmax', 'lttb')
+
+# Trace arrays moved to the binary sidecar by write_dashboard(sidecar=True)
+SIDECAR_ATTRS = ('x', 'y', 'open', 'high', 'low', 'close')
+
+def _wall_time(times) -> np.ndarray:
+    """
+    Timestamps as naive wall-clock datetime64 values.
+
+    Plotly displays wall time either way, but tz-aware values are serialized
+    one Timestamp object at a time, which dominates the export on long series.
+    """
+    index = pd.DatetimeIndex(times)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy()
+
+@profiled("create_dashboard")
+def create_dashboard(df: pd.DataFrame, trades: pd.DataFrame = None, max_points: int = None, method: str = "minmax"):
     """
     Creates an interactive Plotly dashboard for the Trinity Strategy.
     
@@ -11,13 +38,52 @@ def create_dashboard(df: pd.DataFrame, trades: pd.DataFrame = None):
     2. Subplot 1: RSI (14) with 30/70 levels.
     3. Subplot 2: MACD (Line, Signal, Hist).
     
+    Large-data mode (more bars than `max_points`) keeps the figure size
+    bounded: candles are aggregated into `max_points` OHLC buckets, the
+    MACD histogram keeps each bucket's largest bar, lines are decimated with
+    `method` (bars with trades are always kept) and lines/markers use WebGL.
+    
     Args:
         df: DataFrame with OHLCV and Indicators.
         trades: DataFrame with trade log (Entry/Exit).
+        max_points: Bucket budget per trace. None = DEFAULT_MAX_POINTS once the
+                    data exceeds LARGE_DATA_BARS, 0 = always plot every bar.
+        method: Line decimation, 'minmax' (keeps every bucket's extremes) or 'lttb'.
     
     Returns:
         plotly.graph_objects.Figure: The dashboard figure.
     """
+    if method not in DECIMATION_METHODS:
+        raise ValueError(f"Unknown decimation method '{method}'. Expected one of {DECIMATION_METHODS}")
+    # Plotly is slow to import, so runs without a dashboard never load it
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
+    n = len(df)
+    if max_points is None:
+        max_points = DEFAULT_MAX_POINTS if n > LARGE_DATA_BARS else 0
+    large = 0 < max_points < n
+    Scatter = go.Scattergl if large else go.Scatter
+    has_trades = trades is not None and not trades.empty
+    
+    x = _wall_time(df.index)
+    size = bucket_size(n, max_points) if large else 1
+    keep = None
+    if large and has_trades:
+        # Bars with entries/exits stay in every decimated line
+        keep = df.index.get_indexer(pd.concat([trades['Entry Time'], trades['Exit Time']]))
+        keep = keep[keep >= 0]
+    
+    def line(col):
+        y = df[col].to_numpy()
+        if not large:
+            return x, y
+        if method == 'lttb':
+            idx = lttb_indices(y, max_points, keep)
+        else:
+            idx = minmax_indices(y, size, keep)
+        return x[idx], y[idx]
+    
     # Create Subplots
     fig = make_subplots(
         rows=3, cols=1,
@@ -28,27 +94,35 @@ def create_dashboard(df: pd.DataFrame, trades: pd.DataFrame = None):
     )
     
     # --- Row 1: Price & BB ---
-    # Candlestick
+    # Candlestick (one candle per bucket in large-data mode)
+    open_, high, low, close = (df[c].to_numpy() for c in ('Open', 'High', 'Low', 'Close'))
+    if large:
+        pos, open_, high, low, close = ohlc_buckets(open_, high, low, close, size)
+        candle_x = x[pos]
+    else:
+        candle_x = x
     fig.add_trace(go.Candlestick(
-        x=df.index,
-        open=df['Open'],
-        high=df['High'],
-        low=df['Low'],
-        close=df['Close'],
+        x=candle_x,
+        open=open_,
+        high=high,
+        low=low,
+        close=close,
         name='OHLC'
     ), row=1, col=1)
     
     # Bollinger Bands
     # Upper (Gray dashed?)
-    fig.add_trace(go.Scatter(
-        x=df.index, y=df['BBU'],
+    line_x, line_y = line('BBU')
+    fig.add_trace(Scatter(
+        x=line_x, y=line_y,
         line=dict(color='gray', width=1, dash='dash'),
         name='Upper BB'
     ), row=1, col=1)
     
     # Lower
-    fig.add_trace(go.Scatter(
-        x=df.index, y=df['BBL'],
+    line_x, line_y = line('BBL')
+    fig.add_trace(Scatter(
+        x=line_x, y=line_y,
         line=dict(color='gray', width=1, dash='dash'),
         name='Lower BB',
         fill='tonexty', # Fill between Upper and Lower? 
@@ -58,17 +132,18 @@ def create_dashboard(df: pd.DataFrame, trades: pd.DataFrame = None):
     ), row=1, col=1)
     
     # Mid (Orange)
-    fig.add_trace(go.Scatter(
-        x=df.index, y=df['BBM'],
+    line_x, line_y = line('BBM')
+    fig.add_trace(Scatter(
+        x=line_x, y=line_y,
         line=dict(color='orange', width=1),
         name='Moving Avg (20)'
     ), row=1, col=1)
     
     # Trade Markers
-    if trades is not None and not trades.empty:
+    if has_trades:
         # Entries (Green Triangle Up)
-        fig.add_trace(go.Scatter(
-            x=trades['Entry Time'],
+        fig.add_trace(Scatter(
+            x=_wall_time(trades['Entry Time']),
             y=trades['Entry Price'],
             mode='markers',
             marker=dict(symbol='triangle-up', color='green', size=12),
@@ -78,8 +153,8 @@ def create_dashboard(df: pd.DataFrame, trades: pd.DataFrame = None):
         # Exits (Red Square or Triangle Down?)
         # Let's distinguish Profit vs Loss?
         # For MVP, just Red Square.
-        fig.add_trace(go.Scatter(
-            x=trades['Exit Time'],
+        fig.add_trace(Scatter(
+            x=_wall_time(trades['Exit Time']),
             y=trades['Exit Price'],
             mode='markers',
             marker=dict(symbol='square', color='red', size=10),
@@ -87,8 +162,9 @@ def create_dashboard(df: pd.DataFrame, trades: pd.DataFrame = None):
         ), row=1, col=1)
 
     # --- Row 2: RSI ---
-    fig.add_trace(go.Scatter(
-        x=df.index, y=df['RSI'],
+    line_x, line_y = line('RSI')
+    fig.add_trace(Scatter(
+        x=line_x, y=line_y,
         line=dict(color='purple', width=2),
         name='RSI'
     ), row=2, col=1)
@@ -98,31 +174,40 @@ def create_dashboard(df: pd.DataFrame, trades: pd.DataFrame = None):
     fig.add_hline(y=30, line_dash="dot", row=2, col=1, line_color="green")
     
     # --- Row 3: MACD ---
-    # Histogram
-    colors = ['green' if v >= 0 else 'red' for v in df['MACDh']]
+    # Histogram (largest bar per bucket in large-data mode)
+    hist_x, hist = x, df['MACDh'].to_numpy()
+    if large:
+        pos, hist = extreme_buckets(hist, size)
+        hist_x = x[pos]
+    colors = np.where(hist >= 0, 'green', 'red')
     fig.add_trace(go.Bar(
-        x=df.index, y=df['MACDh'],
+        x=hist_x, y=hist,
         marker_color=colors,
         name='MACD Hist'
     ), row=3, col=1)
     
     # MACD Line (Blue)
-    fig.add_trace(go.Scatter(
-        x=df.index, y=df['MACD'],
+    line_x, line_y = line('MACD')
+    fig.add_trace(Scatter(
+        x=line_x, y=line_y,
         line=dict(color='blue', width=1.5),
         name='MACD Line'
     ), row=3, col=1)
     
     # Signal Line (Orange)
-    fig.add_trace(go.Scatter(
-        x=df.index, y=df['MACDs'],
+    line_x, line_y = line('MACDs')
+    fig.add_trace(Scatter(
+        x=line_x, y=line_y,
         line=dict(color='orange', width=1.5),
         name='Signal Line'
     ), row=3, col=1)
     
     # Layout Updates
+    title = 'Trinity Strategy Backtest Analysis'
+    if large:
+        title += f" ({n:,} bars, {size} per candle)"
     fig.update_layout(
-        title='Trinity Strategy Backtest Analysis',
+        title=title,
         xaxis_rangeslider_visible=False,
         height=800,
         template='plotly_dark'
@@ -130,15 +215,93 @@ def create_dashboard(df: pd.DataFrame, trades: pd.DataFrame = None):
     
     return fig
 
+def write_dashboard(fig, path: str, sidecar: bool = False) -> list:
+    """
+    Saves a dashboard as HTML.
+    
+    With `sidecar`, the numeric trace arrays are written raw to a `.bin` file
+    next to the HTML instead of being inlined as JSON. The page fetches the
+    file on load and hands the arrays to Plotly as typed arrays, so it must be
+    served over HTTP (e.g. `python -m http.server`) rather than opened from disk.
+    
+    Returns:
+        list: Paths of the written files.
+    """
+    if not sidecar:
+        fig.write_html(path)
+        return [path]
+    
+    import plotly.graph_objects as go
+    from plotly.offline import get_plotlyjs
+    bin_path = os.path.splitext(path)[0] + ".bin"
+    stripped = go.Figure(fig)
+    manifest = []
+    has_dates = False
+    offset = 0
+    with open(bin_path, "wb") as f:
+        for i, trace in enumerate(fig.data):
+            for attr in SIDECAR_ATTRS:
+                values = getattr(trace, attr, None)
+                if values is None:
+                    continue
+                arr = np.asarray(values)
+                if arr.dtype.kind == 'M':
+                    # Date axes accept epoch milliseconds
+                    arr = arr.astype('datetime64[ms]').astype(np.float64)
+                    has_dates = True
+                elif arr.dtype.kind in 'iu' or arr.dtype == np.float64:
+                    arr = arr.astype(np.float64)
+                elif arr.dtype != np.float32:
+                    continue
+                data = np.ascontiguousarray(arr).tobytes()
+                f.write(data)
+                manifest.append({'trace': i, 'attr': attr, 'offset': offset, 'length': len(arr),
+                                 'type': 'Float32Array' if arr.dtype == np.float32 else 'Float64Array'})
+                stripped.data[i][attr] = None
+                # Keep every array 8-byte aligned for the typed-array views
+                pad = -len(data) % 8
+                f.write(b"\0" * pad)
+                offset += len(data) + pad
+    if has_dates:
+        stripped.update_xaxes(type='date')
+    
+    html = (_SIDECAR_TEMPLATE
+            .replace("{figure}", stripped.to_json())
+            .replace("{manifest}", json.dumps(manifest))
+            .replace("{sidecar}", json.dumps(os.path.basename(bin_path)))
+            .replace("{plotlyjs}", get_plotlyjs()))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return [path, bin_path]
+
+_SIDECAR_TEMPLATE = """<html>
+<head><meta charset="utf-8" /></head>
+<body>
+<script type="text/javascript">{plotlyjs}</script>
+<div id="dashboard" style="height:100vh;"></div>
+<script type="text/javascript">
+const fig = {figure};
+const manifest = {manifest};
+fetch({sidecar}).then(r => r.arrayBuffer()).then(buf => {
+    for (const m of manifest) {
+        fig.data[m.trace][m.attr] = new self[m.type](buf, m.offset, m.length);
+    }
+    Plotly.newPlot("dashboard", fig.data, fig.layout);
+});
+</script>
+</body>
+</html>
+"""
+
 if __name__ == "__main__":
     # Test execution (Generate a dummy chart HTML)
     from src.data.loader import fetch_data
-    from src.analysis.indicators import add_indicators
+    from src.analysis.cache import cached_indicators
     from src.analysis.signals import generate_signals
     from src.engine.backtester import Backtester
     
     df = fetch_data("NVDA")
-    df = add_indicators(df)
+    df = cached_indicators(df)
     median_bw = df['Bandwidth'].median()
     df = generate_signals(df, bandwidth_threshold=median_bw)
     
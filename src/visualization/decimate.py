@@ -0,0 +1,108 @@
+import numpy as np
+
+def bucket_size(n: int, n_buckets: int) -> int:
+    """Bars per bucket when `n` bars are split into at most `n_buckets` equal-count buckets."""
+    return max(1, -(-n // max(1, n_buckets)))
+
+
+def _buckets(values: np.ndarray, size: int, fill: float) -> np.ndarray:
+    """Reshapes `values` into rows of `size`, padding the last row with `fill`."""
+    n = len(values)
+    rows = -(-n // size)
+    padded = np.full(rows * size, fill, dtype=np.float64)
+    padded[:n] = values
+    return padded.reshape(rows, size)
+
+
+def ohlc_buckets(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, size: int):
+    """
+    Aggregates consecutive bars into candles of `size` bars.
+
+    Each bucket keeps its first open, highest high, lowest low and last close,
+    so the extremes of the full series survive the downsampling.
+
+    Returns:
+        tuple: (first bar position of each bucket, open, high, low, close)
+    """
+    starts = np.arange(0, len(close), size)
+    ends = np.minimum(starts + size, len(close)) - 1
+    return (starts, open_[starts], np.maximum.reduceat(high, starts),
+            np.minimum.reduceat(low, starts), close[ends])
+
+
+def extreme_buckets(values: np.ndarray, size: int):
+    """
+    Keeps the value with the largest magnitude from each bucket (sign preserved).
+
+    Used for histograms, where the tallest bar of a bucket is what matters.
+
+    Returns:
+        tuple: (bar position of each kept value, kept values)
+    """
+    magnitude = _buckets(np.abs(values), size, -np.inf)
+    magnitude[np.isnan(magnitude)] = -np.inf
+    pos = np.arange(0, len(values), size) + magnitude.argmax(axis=1)
+    pos = np.minimum(pos, len(values) - 1)
+    return pos, values[pos]
+
+
+def minmax_indices(values: np.ndarray, size: int, keep=None) -> np.ndarray:
+    """
+    Min/max (M4) decimation of a line series.
+
+    Keeps the first, last, minimum and maximum point of every bucket plus the
+    positions in `keep` (e.g. bars with trades), so peaks, troughs and marked
+    bars are always drawn.
+
+    Returns:
+        np.ndarray: Sorted, unique bar positions to plot.
+    """
+    n = len(values)
+    starts = np.arange(0, n, size)
+    lo = _buckets(values, size, np.inf)
+    hi = _buckets(values, size, -np.inf)
+    lo[np.isnan(lo)] = np.inf
+    hi[np.isnan(hi)] = -np.inf
+
+    parts = [starts, np.minimum(starts + size, n) - 1, starts + lo.argmin(axis=1), starts + hi.argmax(axis=1)]
+    if keep is not None:
+        parts.append(np.asarray(keep, dtype=np.int64))
+    idx = np.unique(np.concatenate(parts))
+    return idx[(idx >= 0) & (idx < n)]
+
+
+def lttb_indices(values: np.ndarray, n_out: int, keep=None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets decimation of a line series.
+
+    Picks, per bucket, the point forming the largest triangle with the point
+    kept from the previous bucket and the mean of the next bucket. Preserves
+    the visual shape better than min/max for smooth oscillators. Positions in
+    `keep` are always included.
+
+    Returns:
+        np.ndarray: Sorted, unique bar positions to plot.
+    """
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        idx = np.arange(n)
+    else:
+        y = np.where(np.isnan(values), 0.0, values)
+        edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+        idx = np.empty(n_out, dtype=np.int64)
+        idx[0], idx[-1] = 0, n - 1
+        prev = 0
+        for b in range(n_out - 2):
+            lo, hi = edges[b], max(edges[b + 1], edges[b] + 1)
+            nlo, nhi = hi, max(edges[b + 2] if b + 2 < len(edges) else n, hi + 1)
+            avg_x = (nlo + min(nhi, n) - 1) / 2
+            avg_y = y[nlo:nhi].mean() if nlo < n else y[-1]
+            x = np.arange(lo, hi)
+            area = np.abs((prev - avg_x) * (y[lo:hi] - y[prev]) - (prev - x) * (avg_y - y[prev]))
+            prev = lo + int(area.argmax())
+            idx[b + 1] = prev
+
+    if keep is not None:
+        idx = np.concatenate([idx, np.asarray(keep, dtype=np.int64)])
+    idx = np.unique(idx)
+    return idx[(idx >= 0) & (idx < n)]